@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
 from django.db.models.signals import post_save
 
 from config import settings
@@ -10,7 +11,11 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         from apps.core import signals
+        from apps.core.services.site_settings import SiteSettings
 
         post_save.connect(
             signals.send_activation_email, sender=settings.AUTH_USER_MODEL
         )
+
+        # drop the cached site settings when they may have changed
+        setting_changed.connect(SiteSettings.clear)
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.services.email.email_queue import EmailQueue
+
+
+class Command(BaseCommand):
+    help = "Send the emails waiting in the queue, in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of emails sent per SMTP connection.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new emails.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait before polling an empty queue again.",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = EmailQueue.send_batch(batch_size=options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed.")
+        )
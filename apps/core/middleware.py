@@ -0,0 +1,44 @@
+from django.conf import settings
+
+from apps.core.services.request_metrics import RequestMetrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the query count and the timings of a sample of the requests, per view
+    action, see `RequestMetrics`.
+
+    The sampled requests are checked against `REQUEST_QUERY_BUDGETS`, and get a
+    `Server-Timing` header when `REQUEST_METRICS_SERVER_TIMING` is set. Requests that
+    are not sampled only pay for one random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics.sample()
+        if metrics is None:
+            return self.get_response(request)
+
+        request.metrics = metrics
+        with metrics.capture():
+            response = self.get_response(request)
+        if metrics.endpoint is None:  # not resolved to a view
+            return response
+
+        metrics.record()
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing()
+        metrics.check_budget()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, "metrics"):
+            request.metrics.start_view(request, view_func)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook
+        if hasattr(request, "metrics"):
+            request.metrics.finish_view()
+        return response
@@ -1 +1,2 @@
+from .email import EmailJob
 from .user import User
@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+from apps.core.models.mixin import ModelMixin
+
+
+class EmailJob(ModelMixin):
+    """
+    An outgoing email waiting in the queue.
+
+    Jobs are sent by the `send_queued_emails` command. A failed job is retried
+    after a growing delay until it runs out of attempts or reaches `expires_at`.
+    While a worker sends a job, `available_at` holds the end of its lease.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to_address = models.EmailField(max_length=255)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "available_at"])]
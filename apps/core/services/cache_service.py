@@ -0,0 +1,104 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class CacheService:
+    """
+    Versioned cache namespaces.
+
+    Every cache key is built on top of one or more namespace versions. Bumping a
+    version makes all keys built on the old value unreachable, so invalidation
+    is a single `INCR` no matter how many entries depend on the namespace.
+    """
+
+    VERSION_KEY_PREFIX = "version"
+    CHANGED_KEY_PREFIX = "changed"
+    # Versions are re-seeded from the clock after they expire, so they only need to
+    # outlive the entries built on them. Unused namespaces don't stay forever.
+    VERSION_TIMEOUT = 60 * 60 * 24  # in seconds
+
+    @classmethod
+    def get_version(cls, namespace: str) -> int:
+        """Return the current version of a namespace, initializing it if missing."""
+
+        key = cls._version_key(namespace)
+        version = cache.get(key)
+        if version is None:
+            # Seed from the clock, so a version evicted from the cache never
+            # restarts below a value that is still referenced by stored entries.
+            cache.add(key, cls._initial_version(), timeout=cls.VERSION_TIMEOUT)
+            version = cache.get(key, cls._initial_version())
+        return version
+
+    @classmethod
+    def get_changed_at(cls, *namespaces: str) -> int:
+        """
+        Return when the namespaces were last invalidated, as a Unix timestamp, e.g. for
+        `Last-Modified`. A namespace that was not invalidated since its entry was
+        stored reports the time it was stored, which is never earlier than the change.
+        """
+
+        changed_at = []
+        for namespace in namespaces:
+            key = cls._changed_key(namespace)
+            value = cache.get(key)
+            if value is None:
+                cache.add(key, cls._now(), timeout=cls.VERSION_TIMEOUT)
+                value = cache.get(key, cls._now())
+            changed_at.append(value)
+        return max(changed_at)
+
+    @classmethod
+    def bump_version(cls, *namespaces: str) -> None:
+        """
+        Invalidate every key built on the given namespaces.
+
+        Inside a transaction the bump is deferred until commit, otherwise a concurrent
+        reader could cache the old rows under the new version.
+        """
+
+        transaction.on_commit(lambda: cls._incr_versions(namespaces))
+
+    @classmethod
+    def _incr_versions(cls, namespaces) -> None:
+        for namespace in namespaces:
+            key = cls._version_key(namespace)
+            cache.add(key, cls._initial_version(), timeout=cls.VERSION_TIMEOUT)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # The backend does not store anything (e.g. DummyCache).
+                pass
+            cache.set(
+                cls._changed_key(namespace), cls._now(), timeout=cls.VERSION_TIMEOUT
+            )
+
+    @staticmethod
+    def build_key(prefix: str, *parts) -> str:
+        """Build a cache key from a prefix and a list of parts of any length."""
+
+        digest = hashlib.md5(
+            ":".join(str(part) for part in parts).encode("utf-8")
+        ).hexdigest()
+        return f"{prefix}:{digest}"
+
+    @classmethod
+    def _version_key(cls, namespace: str) -> str:
+        return f"{cls.VERSION_KEY_PREFIX}:{namespace}"
+
+    @classmethod
+    def _changed_key(cls, namespace: str) -> str:
+        return f"{cls.CHANGED_KEY_PREFIX}:{namespace}"
+
+    @staticmethod
+    def _now() -> int:
+        # rounded up, HTTP dates have no fractions of a second
+        return math.ceil(time.time())
+
+    @staticmethod
+    def _initial_version() -> int:
+        return int(time.time() * 1000)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.models.email import EmailJob
+
+
+class EmailQueue:
+    """
+    A database-backed queue of outgoing emails.
+
+    Requests only insert a row, the `send_queued_emails` worker does the SMTP work.
+    Jobs are claimed in a short transaction and sent outside of it, every batch over
+    one SMTP connection. A claimed job is leased for `EMAIL_QUEUE_LEASE` seconds, so
+    the jobs of a crashed worker are picked up again once the lease runs out.
+    """
+
+    EXPIRED_ERROR = "Expired before it could be sent."
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.EMAIL_DELIVERY == "queue"
+
+    @staticmethod
+    def enqueue(subject, body, to_address, expires_in: int = None) -> EmailJob:
+        """
+        Add an email to the queue.
+
+        `expires_in` (seconds) is set for time-sensitive emails, like OTP codes:
+        they are dropped instead of being delivered after the code has expired.
+        """
+        expires_at = None
+        if expires_in is not None:
+            expires_at = timezone.now() + timedelta(seconds=expires_in)
+        return EmailJob.objects.create(
+            subject=subject, body=body, to_address=to_address, expires_at=expires_at
+        )
+
+    @classmethod
+    def send_batch(cls, batch_size: int = 100) -> tuple[int, int]:
+        """
+        Send up to `batch_size` due jobs, return the number sent and failed.
+
+        A job that fails is retried after `EMAIL_QUEUE_RETRY_DELAY` seconds, doubled
+        on every attempt, and is marked failed after `EMAIL_QUEUE_MAX_ATTEMPTS` or
+        when the retry would come after the job expires.
+        """
+
+        jobs = cls._claim(batch_size)
+        if not jobs:
+            return 0, 0
+
+        sent = failed = 0
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            for job in jobs:
+                cls._record_failure(job, e)
+            return 0, len(jobs)
+
+        try:
+            for job in jobs:
+                try:
+                    connection.send_messages([cls._build_message(job)])
+                except Exception as e:
+                    cls._record_failure(job, e)
+                    failed += 1
+                else:
+                    cls._record_sent(job)
+                    sent += 1
+        finally:
+            connection.close()
+        return sent, failed
+
+    @staticmethod
+    @transaction.atomic
+    def _claim(batch_size: int) -> list[EmailJob]:
+        """
+        Lease the due jobs to this worker and count the attempt.
+
+        Due jobs are pending ones and the ones whose lease has run out.
+        Expired jobs are marked failed instead.
+        """
+        now = timezone.now()
+        due = EmailJob.objects.filter(
+            status__in=[EmailJob.STATUS_PENDING, EmailJob.STATUS_SENDING],
+            available_at__lte=now,
+        )
+        due.filter(expires_at__lte=now).update(
+            status=EmailJob.STATUS_FAILED, last_error=EmailQueue.EXPIRED_ERROR
+        )
+
+        jobs = list(
+            due.select_for_update(skip_locked=True).order_by("available_at", "id")[
+                :batch_size
+            ]
+        )
+        if not jobs:
+            return []
+
+        lease_until = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+        EmailJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=EmailJob.STATUS_SENDING,
+            available_at=lease_until,
+            attempts=F("attempts") + 1,
+        )
+        for job in jobs:
+            job.status = EmailJob.STATUS_SENDING
+            job.available_at = lease_until
+            job.attempts += 1
+        return jobs
+
+    @staticmethod
+    def _record_sent(job: EmailJob):
+        job.status = EmailJob.STATUS_SENT
+        job.sent_at = timezone.now()
+        job.last_error = ""
+        EmailJob.objects.filter(id=job.id).update(
+            status=job.status, sent_at=job.sent_at, last_error=job.last_error
+        )
+
+    @staticmethod
+    def _record_failure(job: EmailJob, error):
+        job.last_error = str(error)
+        job.available_at = timezone.now() + timedelta(
+            seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+        if job.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS or (
+            job.expires_at is not None and job.available_at >= job.expires_at
+        ):
+            job.status = EmailJob.STATUS_FAILED
+        else:
+            job.status = EmailJob.STATUS_PENDING
+        EmailJob.objects.filter(id=job.id).update(
+            status=job.status, available_at=job.available_at, last_error=job.last_error
+        )
+
+    @staticmethod
+    def _build_message(job: EmailJob) -> EmailMultiAlternatives:
+        return EmailMultiAlternatives(
+            subject=job.subject,
+            body=job.body,
+            from_email=settings.EMAIL_HOST_USER,
+            to=[job.to_address],
+        )
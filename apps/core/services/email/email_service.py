@@ -1,25 +1,35 @@
 from django.conf import settings
-from django.contrib.sites.models import Site
 from django.core.mail import EmailMultiAlternatives
 
+from apps.core.services.email.email_queue import EmailQueue
+from apps.core.services.site_settings import SiteSettings
 from apps.core.services.token_service import TokenService
 
 
 class EmailService:
     @classmethod
-    def __send_email(cls, subject, body, to_address):
+    def __send_email(cls, subject, body, to_address, expires_in=None):
         """
         Sends an email with the provided subject, body, and recipient address.
 
+        With `EMAIL_DELIVERY = "queue"` the email is only added to the queue, and is
+        sent later by the `send_queued_emails` command, unless `expires_in` seconds
+        have passed by then.
+
         Args:
             subject (str): The subject of the email.
             body (str): The body content of the email.
             to_address (str): The recipient's email address.
+            expires_in (int, optional): How long a queued email stays worth sending.
 
         Raises:
             Exception: If there is an error during the email sending process.
 
         """
+        if EmailQueue.is_enabled():
+            EmailQueue.enqueue(subject, body, to_address, expires_in)
+            return
+
         try:
             email = EmailMultiAlternatives(
                 subject=subject,
@@ -45,12 +55,12 @@ class EmailService:
         otp = TokenService.create_otp_token(to_address)
         subject = "Email Verification"
         body = (
-            f'Thank you for registering with "{Site.objects.get_current().name}"!\n\n'
+            f'Thank you for registering with "{SiteSettings.site_name()}"!\n\n'
             f"To complete your registration, please enter the following code: {otp}\n\n"
             f"If you didn't register, please ignore this email."
         )
 
-        cls.__send_email(subject, body, to_address)
+        cls.__send_email(subject, body, to_address, settings.OTP_EXPIRE_SECONDS)
 
     @classmethod
     def send_change_email(cls, to_address):
@@ -64,12 +74,12 @@ class EmailService:
         otp = TokenService.create_otp_token(to_address)
         subject = "Email Change Verification"
         body = (
-            f'We received a request to change the email associated with your "{Site.objects.get_current().name}" account. \n'
+            f'We received a request to change the email associated with your "{SiteSettings.site_name()}" account. \n'
             f"To confirm this change, please enter the following code: {otp}\n\n"
             f"If you didn't request this, please contact our support team."
         )
 
-        cls.__send_email(subject, body, to_address)
+        cls.__send_email(subject, body, to_address, settings.OTP_EXPIRE_SECONDS)
 
     @classmethod
     def send_reset_password_email(cls, to_address):
@@ -83,9 +93,9 @@ class EmailService:
         otp = TokenService.create_otp_token(to_address)
         subject = "Password Reset Verification"
         body = (
-            f'We received a request to reset your "{Site.objects.get_current().name}" password.\n\n'
+            f'We received a request to reset your "{SiteSettings.site_name()}" password.\n\n'
             f"Please enter the following code to reset your password: {otp}\n\n"
             f"If you didn't register, please ignore this email."
         )
 
-        cls.__send_email(subject, body, to_address)
+        cls.__send_email(subject, body, to_address, settings.OTP_EXPIRE_SECONDS)
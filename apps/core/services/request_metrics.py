@@ -0,0 +1,224 @@
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint ran more queries than its budget in `REQUEST_QUERY_BUDGETS`."""
+
+
+class RequestMetrics:
+    """
+    Query count and timings of one sampled request, see `RequestMetricsMiddleware`.
+
+    The durations are in seconds:
+    - db: time spent executing queries, measured with `execute_wrapper`
+    - view: time spent in the view, without the queries
+    - serializer: the part of the view spent in code wrapped with `measure`
+    - render: time spent rendering the response body
+    - total: the whole request, as seen by the middleware
+
+    The sums are aggregated per endpoint (e.g. `ProductViewSet.list`) in the cache,
+    so every process contributes to the same report. Entries are read and written
+    back without a lock: concurrent requests may drop a sample, which is fine for
+    sampled statistics.
+    """
+
+    CACHE_PREFIX = "request_metrics"
+    TIMINGS = ("db", "serializer", "view", "render", "total")
+
+    def __init__(self):
+        self.endpoint = None
+        self.queries = 0
+        self.durations = dict.fromkeys(self.TIMINGS, 0.0)
+        self._started = time.perf_counter()
+        self._view_started = None
+        self._view_db = 0.0
+        self._view_finished = None
+        self._depths = {}
+
+    @classmethod
+    def sample(cls) -> "RequestMetrics | None":
+        """Return the metrics of a new request, or None when it is not sampled."""
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return None
+        return cls()
+
+    @classmethod
+    @contextmanager
+    def measure(cls, name: str):
+        """Add the time of the block to a timing of the current request, if sampled."""
+        metrics = _current_metrics.get()
+        if metrics is None:
+            yield
+            return
+
+        # nested blocks, e.g. a serializer of a serializer, are only counted once
+        depth = metrics._depths.get(name, 0)
+        metrics._depths[name] = depth + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics._depths[name] = depth
+            if not depth:
+                metrics.durations[name] += time.perf_counter() - started
+
+    @contextmanager
+    def capture(self):
+        """Count the queries and the time of the request run in the block."""
+        token = _current_metrics.set(self)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._execute))
+                yield self
+        finally:
+            _current_metrics.reset(token)
+            finished = time.perf_counter()
+            self.durations["total"] = finished - self._started
+            if self._view_started is not None:
+                view_finished = self._view_finished or finished
+                self.durations["view"] = (
+                    view_finished - self._view_started - (self._view_db or 0.0)
+                )
+                if self._view_finished is not None:
+                    self.durations["render"] = finished - self._view_finished
+
+    def _execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.durations["db"] += time.perf_counter() - started
+
+    # ------------
+    # --- View ---
+    # ------------
+
+    def start_view(self, request, view_func) -> None:
+        self.endpoint = self.endpoint_name(request, view_func)
+        self._view_started = time.perf_counter()
+        self._view_db = self.durations["db"]
+
+    def finish_view(self) -> None:
+        """Called once the view returned, before its response is rendered."""
+        self._view_finished = time.perf_counter()
+        self._view_db = self.durations["db"] - self._view_db
+
+    @staticmethod
+    def endpoint_name(request, view_func) -> str:
+        # DRF sets `cls` on its views, and `actions` ({method: action}) on viewsets
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            return f"{view_func.__module__}.{view_func.__name__}"
+        method = request.method.lower()
+        action = (getattr(view_func, "actions", None) or {}).get(method, method)
+        return f"{view_class.__name__}.{action}"
+
+    # ---------------
+    # --- Budgets ---
+    # ---------------
+
+    @property
+    def budget(self) -> int | None:
+        return settings.REQUEST_QUERY_BUDGETS.get(self.endpoint)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+    def check_budget(self) -> None:
+        if not self.over_budget:
+            return
+        message = (
+            f"{self.endpoint} ran {self.queries} queries, "
+            f"over its budget of {self.budget}"
+        )
+        if settings.REQUEST_QUERY_BUDGET_ACTION == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    # --------------
+    # --- Report ---
+    # --------------
+
+    def server_timing(self) -> str:
+        """The value of a `Server-Timing` header, durations are in milliseconds."""
+        timings = [
+            f'db;dur={self.durations["db"] * 1000:.1f};desc="{self.queries} queries"'
+        ]
+        timings += [
+            f"{name};dur={self.durations[name] * 1000:.1f}" for name in self.TIMINGS[1:]
+        ]
+        return ", ".join(timings)
+
+    def record(self) -> None:
+        """Add the metrics of the request to the sums of its endpoint."""
+        endpoints_key, key = self._cache_key(), self._cache_key(self.endpoint)
+        stored = cache.get_many([endpoints_key, key])
+        endpoints = stored.get(endpoints_key, [])
+        totals = stored.get(key) or {"requests": 0, "over_budget": 0, "queries": 0}
+        totals["requests"] += 1
+        totals["over_budget"] += self.over_budget
+        totals["queries"] += self.queries
+        for name, seconds in self.durations.items():
+            totals[name] = totals.get(name, 0.0) + seconds
+
+        values = {key: totals}
+        if self.endpoint not in endpoints:
+            values[endpoints_key] = [*endpoints, self.endpoint]
+        cache.set_many(values, timeout=None)
+
+    @classmethod
+    def report(cls) -> list[dict]:
+        """The averages of every recorded endpoint, the slowest in total first."""
+        endpoints = cache.get(cls._cache_key(), [])
+        stored = cache.get_many([cls._cache_key(endpoint) for endpoint in endpoints])
+        report = []
+        for endpoint in endpoints:
+            totals = stored.get(cls._cache_key(endpoint))
+            if not totals:
+                continue
+            requests = totals["requests"]
+            report.append(
+                {
+                    "endpoint": endpoint,
+                    "requests": requests,
+                    "over_budget": totals["over_budget"],
+                    "query_budget": settings.REQUEST_QUERY_BUDGETS.get(endpoint),
+                    "queries": round(totals["queries"] / requests, 1),
+                    **{
+                        f"{name}_ms": round(totals[name] * 1000 / requests, 2)
+                        for name in cls.TIMINGS
+                    },
+                    "_total": totals["total"],
+                }
+            )
+        report.sort(key=lambda row: row.pop("_total"), reverse=True)
+        return report
+
+    @classmethod
+    def reset(cls) -> None:
+        endpoints = cache.get(cls._cache_key(), [])
+        cache.delete_many(
+            [cls._cache_key(), *[cls._cache_key(endpoint) for endpoint in endpoints]]
+        )
+
+    @classmethod
+    def _cache_key(cls, endpoint: str = None) -> str:
+        if endpoint is None:
+            return f"{cls.CACHE_PREFIX}:endpoints"
+        return f"{cls.CACHE_PREFIX}:{endpoint}"
@@ -0,0 +1,44 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+
+
+class SiteSettings:
+    """
+    A per-process cache of configuration that rarely changes.
+
+    Values are computed on first use and kept until `clear()`, which is called by
+    the signal connected in `CoreConfig.ready()` when a setting changes (in tests).
+    The site itself comes from `Site.objects.get_current()`, which Django already
+    caches per process.
+    """
+
+    _values = {}
+
+    @classmethod
+    def get(cls, name: str, loader):
+        """Return the cached value of `name`, computing it with `loader()` once."""
+
+        try:
+            return cls._values[name]
+        except KeyError:
+            return cls._values.setdefault(name, loader())
+
+    @classmethod
+    def clear(cls, **kwargs) -> None:
+        cls._values.clear()
+
+    @staticmethod
+    def site(request=None) -> Site:
+        return Site.objects.get_current(request)
+
+    @classmethod
+    def site_name(cls) -> str:
+        return cls.site().name
+
+    @classmethod
+    def media_url_has_domain(cls) -> bool:
+        return cls.get(
+            "media_url_has_domain", lambda: bool(urlparse(settings.MEDIA_URL).scheme)
+        )
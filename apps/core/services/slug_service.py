@@ -0,0 +1,122 @@
+import re
+from functools import reduce
+from operator import or_
+from typing import Callable
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+
+class SlugService:
+    """
+    Allocates unique slugs derived from a name: "t-shirt", "t-shirt-1", "t-shirt-2"...
+
+    The next free suffix is found with one aggregate query: the slugs that start with
+    the base are scanned by prefix (an index range scan) and the highest numeric
+    suffix is returned, so the cost doesn't grow with the number of collisions.
+    Many names are allocated at once with one query per `BASES_PER_QUERY` bases.
+
+    Two writers can still pick the same slug at the same time, the unique constraint
+    catches it and `save_with_slug` allocates again.
+    """
+
+    BASES_PER_QUERY = 100
+    MAX_ATTEMPTS = 5
+
+    @classmethod
+    def allocate(cls, model, name: str, field: str = "slug") -> str:
+        return cls.allocate_many(model, [name], field)[0]
+
+    @classmethod
+    def allocate_many(
+        cls, model, names: list[str], field: str = "slug", reserved: set = frozenset()
+    ) -> list[str]:
+        """
+        Return a free and distinct slug for each name, in the same order. The slugs in
+        `reserved` are about to be written by the caller and are not handed out.
+        """
+
+        max_length = model._meta.get_field(field).max_length
+        bases = [cls.base_slug(name, max_length) for name in names]
+
+        distinct_bases = list(dict.fromkeys(bases))
+        state = {}
+        for start in range(0, len(distinct_bases), cls.BASES_PER_QUERY):
+            state.update(
+                cls._taken_suffixes(
+                    model, field, distinct_bases[start : start + cls.BASES_PER_QUERY]
+                )
+            )
+
+        slugs = []
+        for base in bases:
+            base_taken, suffix = state[base]
+            slug = base
+            if base_taken or slug in reserved:
+                suffix = suffix or 0
+                while slug in reserved or slug == base:
+                    suffix += 1
+                    slug = f"{base}-{suffix}"
+            state[base] = (True, suffix)
+            slugs.append(slug)
+        return slugs
+
+    @staticmethod
+    def base_slug(name: str, max_length: int = None) -> str:
+        base = slugify(name, allow_unicode=True)
+        if max_length and len(base) > max_length - 11:
+            # leave room for a "-<suffix>"
+            base = base[: max_length - 11].rstrip("-")
+        return base
+
+    @classmethod
+    def save_with_slug(cls, instance, save: Callable[[], None], field: str = "slug"):
+        """
+        Run `save()`, allocating a new slug and retrying when another writer took the
+        slug of `instance` first.
+        """
+
+        name = instance.name
+        for attempt in range(cls.MAX_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return save()
+            except IntegrityError:
+                slug = getattr(instance, field)
+                taken = (
+                    type(instance)
+                    ._default_manager.filter(**{field: slug})
+                    .exclude(pk=instance.pk)
+                    .exists()
+                )
+                if not taken or attempt == cls.MAX_ATTEMPTS - 1:
+                    raise
+                setattr(instance, field, cls.allocate(type(instance), name, field))
+
+    @staticmethod
+    def _taken_suffixes(model, field: str, bases: list[str]) -> dict:
+        """Map each base to whether it is taken and its highest numeric suffix."""
+
+        aggregates = {}
+        for index, base in enumerate(bases):
+            pattern = rf"^{re.escape(base)}-[0-9]{{1,18}}$"
+            aggregates[f"taken_{index}"] = Count("pk", filter=Q(**{field: base}))
+            aggregates[f"suffix_{index}"] = Max(
+                Cast(Substr(field, len(base) + 2), BigIntegerField()),
+                filter=Q(**{f"{field}__regex": pattern}),
+            )
+
+        conditions = reduce(
+            or_,
+            [
+                Q(**{field: base}) | Q(**{f"{field}__startswith": f"{base}-"})
+                for base in bases
+            ],
+        )
+        result = model._default_manager.filter(conditions).aggregate(**aggregates)
+        return {
+            base: (bool(result[f"taken_{index}"]), result[f"suffix_{index}"])
+            for index, base in enumerate(bases)
+        }
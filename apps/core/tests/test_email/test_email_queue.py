@@ -0,0 +1,138 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import EmailJob
+from apps.core.services.email.email_queue import EmailQueue
+
+
+@override_settings(
+    EMAIL_DELIVERY="queue", EMAIL_QUEUE_MAX_ATTEMPTS=2, EMAIL_QUEUE_RETRY_DELAY=30
+)
+class EmailQueueTest(APITestCase):
+    def send_queued_emails(self):
+        out = StringIO()
+        call_command("send_queued_emails", once=True, stdout=out)
+        return out.getvalue()
+
+    def test_register_queues_the_activation_email(self):
+        payload = {
+            "email": "user_test@example.com",
+            "password": "Test_1234",
+            "password_confirm": "Test_1234",
+        }
+        response = self.client.post(
+            reverse("user-list"),
+            json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # nothing is sent during the request
+        self.assertEqual(len(mail.outbox), 0)
+        job = EmailJob.objects.get()
+        self.assertEqual(job.to_address, payload["email"])
+
+        self.assertIn("Sent 1 emails, 0 failed.", self.send_queued_emails())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [payload["email"]])
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.STATUS_SENT)
+        self.assertIsNotNone(job.sent_at)
+
+    def test_batch_uses_one_connection(self):
+        for number in range(3):
+            EmailQueue.enqueue("Subject", "Body", f"user{number}@example.com")
+
+        with mock.patch(
+            "apps.core.services.email.email_queue.get_connection",
+            wraps=get_connection,
+        ) as connection_factory:
+            self.assertEqual(EmailQueue.send_batch(batch_size=10), (3, 0))
+        connection_factory.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        job = EmailQueue.enqueue("Subject", "Body", "user@example.com")
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP is down"),
+        ):
+            self.assertIn("Sent 0 emails, 1 failed.", self.send_queued_emails())
+            job.refresh_from_db()
+            self.assertEqual(job.status, EmailJob.STATUS_PENDING)
+            self.assertEqual(job.attempts, 1)
+            self.assertEqual(job.last_error, "SMTP is down")
+            self.assertGreater(job.available_at, timezone.now())
+
+            # not due yet
+            self.assertEqual(EmailQueue.send_batch(), (0, 0))
+
+            # out of attempts
+            EmailJob.objects.update(available_at=timezone.now())
+            self.assertEqual(EmailQueue.send_batch(), (0, 1))
+            job.refresh_from_db()
+            self.assertEqual(job.status, EmailJob.STATUS_FAILED)
+            self.assertEqual(job.attempts, 2)
+
+        self.assertEqual(EmailQueue.send_batch(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_results_are_recorded_as_they_are_sent(self):
+        first = EmailQueue.enqueue("Subject", "Body", "first@example.com")
+        second = EmailQueue.enqueue("Subject", "Body", "second@example.com")
+
+        # the worker dies after sending the first email
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=[1, KeyboardInterrupt],
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                EmailQueue.send_batch()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, EmailJob.STATUS_SENT)
+        self.assertEqual(second.status, EmailJob.STATUS_SENDING)
+
+        # leased to the dead worker
+        self.assertEqual(EmailQueue.send_batch(), (0, 0))
+
+        # picked up again once the lease runs out
+        EmailJob.objects.filter(id=second.id).update(available_at=timezone.now())
+        self.assertEqual(EmailQueue.send_batch(), (1, 0))
+        second.refresh_from_db()
+        self.assertEqual(second.status, EmailJob.STATUS_SENT)
+        self.assertEqual(second.attempts, 2)
+
+    def test_expired_email_is_not_sent(self):
+        job = EmailQueue.enqueue("Subject", "Body", "user@example.com", expires_in=20)
+
+        # the retry would come after the code has expired
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP is down"),
+        ):
+            self.assertEqual(EmailQueue.send_batch(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.STATUS_FAILED)
+        self.assertEqual(job.attempts, 1)
+
+        # expired while waiting in the queue
+        job = EmailQueue.enqueue("Subject", "Body", "user@example.com", expires_in=60)
+        EmailJob.objects.filter(id=job.id).update(expires_at=timezone.now())
+        self.assertEqual(EmailQueue.send_batch(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.STATUS_FAILED)
+        self.assertEqual(job.last_error, EmailQueue.EXPIRED_ERROR)
+        self.assertEqual(len(mail.outbox), 0)
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.services.request_metrics import QueryBudgetExceeded, RequestMetrics
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "request-metrics-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RequestMetricsTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        ProductFactory.customize()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def api_path(self) -> str:
+        return reverse("request-metrics-list")
+
+    def products_path(self) -> str:
+        return reverse("products:product-list")
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def test_access_permission_by_regular_user(self):
+        self.authorization_as_regular_user()
+        self.assertHTTPStatusCode(self.send_request(), status.HTTP_403_FORBIDDEN)
+
+    def test_server_timing(self):
+        response = self.send_request(self.products_path())
+        timings = [
+            timing.split(";")[0] for timing in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(timings, list(RequestMetrics.TIMINGS))
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries"'
+        )
+
+    def test_report(self):
+        self.send_request(self.products_path())
+        self.send_request(self.products_path())
+        self.validate_response_body(self.send_request())
+
+        report = {row["endpoint"]: row for row in self.response_body}
+        products = report["ProductViewSet.list"]
+        self.assertEqual(products["requests"], 2)
+        self.assertEqual(products["over_budget"], 0)
+        self.assertEqual(products["query_budget"], 15)
+        self.assertGreater(products["queries"], 0)
+        self.assertGreater(products["total_ms"], 0)
+
+        reset_response = self.client.post(reverse("request-metrics-reset"))
+        self.assertHTTPStatusCode(reset_response, status.HTTP_204_NO_CONTENT)
+        # the reset request itself is recorded once it is done
+        self.assertEqual(
+            [row["endpoint"] for row in self.send_request().json()],
+            ["RequestMetricsViewSet.reset"],
+        )
+
+    def test_over_budget_fails_in_tests(self):
+        with override_settings(REQUEST_QUERY_BUDGETS={"ProductViewSet.list": 1}):
+            with self.assertRaisesMessage(
+                QueryBudgetExceeded, "ProductViewSet.list ran"
+            ):
+                self.send_request(self.products_path())
+
+    def test_over_budget_is_logged(self):
+        with override_settings(
+            REQUEST_QUERY_BUDGETS={"ProductViewSet.list": 1},
+            REQUEST_QUERY_BUDGET_ACTION="log",
+        ):
+            with self.assertLogs("apps.core.services.request_metrics", "WARNING"):
+                response = self.send_request(self.products_path())
+        self.assertHTTPStatusCode(response)
+        report = self.send_request().json()
+        self.assertEqual(report[0]["endpoint"], "ProductViewSet.list")
+        self.assertEqual(report[0]["over_budget"], 1)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_requests_that_are_not_sampled(self):
+        response = self.send_request(self.products_path())
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(RequestMetrics.report(), [])
+
+    def test_nested_measures_are_counted_once(self):
+        metrics = RequestMetrics()
+        with metrics.capture():
+            with RequestMetrics.measure("serializer"):
+                with RequestMetrics.measure("serializer"):
+                    pass
+            serializer = metrics.durations["serializer"]
+        self.assertGreater(serializer, 0)
+        # outside of a sampled request
+        with RequestMetrics.measure("serializer"):
+            pass
+        self.assertEqual(metrics.durations["serializer"], serializer)
@@ -0,0 +1,28 @@
+from django.contrib.sites.models import Site
+from django.test import TestCase, override_settings
+
+from apps.core.services.site_settings import SiteSettings
+
+
+class SiteSettingsTest(TestCase):
+    def setUp(self):
+        SiteSettings.clear()
+        Site.objects.clear_cache()
+
+    def test_site_name_is_cached(self):
+        name = SiteSettings.site_name()
+        with self.assertNumQueries(0):
+            self.assertEqual(SiteSettings.site_name(), name)
+
+    def test_saving_the_site_clears_the_cache(self):
+        SiteSettings.site_name()
+        site = Site.objects.get_current()
+        site.name = "Bazaar"
+        site.save()
+        self.assertEqual(SiteSettings.site_name(), "Bazaar")
+
+    def test_changing_a_setting_clears_the_cache(self):
+        with override_settings(MEDIA_URL="https://cdn.example.com/media/"):
+            self.assertTrue(SiteSettings.media_url_has_domain())
+        with override_settings(MEDIA_URL="/media/"):
+            self.assertFalse(SiteSettings.media_url_has_domain())
@@ -0,0 +1,34 @@
+from drf_spectacular.utils import extend_schema_view, extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from apps.core.services.request_metrics import RequestMetrics
+
+
+@extend_schema_view(
+    list=extend_schema(
+        tags=["Metrics"],
+        summary="Request metrics per endpoint",
+        description="""Average query count and timings (in milliseconds) of the sampled requests of every view action,
+the slowest first, with the number of requests over their query budget. Requests are sampled with
+`REQUEST_METRICS_SAMPLE_RATE`.""",
+    ),
+    reset=extend_schema(
+        tags=["Metrics"],
+        summary="Reset the request metrics",
+        request=None,
+        responses={204: None},
+    ),
+)
+class RequestMetricsViewSet(viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(RequestMetrics.report())
+
+    @action(detail=False, methods=["post"])
+    def reset(self, request):
+        RequestMetrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
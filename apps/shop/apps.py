@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, post_save, post_delete
 
 
 class ShopConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.shop"
+
+    def ready(self):
+        from apps.shop import signals
+        from apps.shop.models.category import Category, CategoryImage
+
+        for model in (Category, CategoryImage):
+            post_save.connect(signals.invalidate_category_tree, sender=model)
+            post_delete.connect(signals.invalidate_category_tree, sender=model)
+
+        # the search indexes are not declared on the model, they only exist on PostgreSQL
+        post_migrate.connect(signals.install_product_search, sender=self)
+        # created once here, checkouts only take numbers from it
+        post_migrate.connect(signals.install_order_number_sequence, sender=self)
@@ -1,4 +1,4 @@
-from factory import LazyAttribute, SubFactory
+from factory import Sequence, SubFactory
 from factory.django import DjangoModelFactory
 from faker import Faker
 
@@ -12,18 +12,18 @@ class AttributeFactory(DjangoModelFactory):
     class Meta:
         model = Attribute
 
-    attribute_name = LazyAttribute(lambda _: fake.word())
+    # the names are unique, random words alone collide
+    attribute_name = Sequence(lambda n: f"{fake.word()} {n}")
 
     @classmethod
     def create_with_items(cls, attribute_name=None, item_count=1):
         """
         Create an attribute and optionally attach multiple attribute items.
         """
-        # Use Faker's `unique` feature to guarantee uniqueness
-        attribute_name = attribute_name if attribute_name else fake.word()
-
         # Create the attribute instance
-        attribute = cls(attribute_name=attribute_name)
+        attribute = cls(
+            **({"attribute_name": attribute_name} if attribute_name else {})
+        )
 
         # Create associated attribute items
         for _ in range(item_count):
@@ -63,7 +63,7 @@ class AttributeItemFactory(DjangoModelFactory):
     class Meta:
         model = AttributeItem
 
-    item_name = LazyAttribute(lambda _: fake.word())
+    item_name = Sequence(lambda n: f"{fake.word()} {n}")
     attribute = SubFactory(
         AttributeFactory
     )  # Automatically link to an Attribute instance
@@ -1,4 +1,4 @@
-from factory import LazyAttribute, post_generation
+from factory import LazyAttribute, Sequence, post_generation
 from factory.django import DjangoModelFactory
 from faker import Faker
 
@@ -11,7 +11,8 @@ class CategoryFactory(DjangoModelFactory):
     class Meta:
         model = Category
 
-    name = LazyAttribute(lambda _: fake.word())
+    # `Category.name` is unique, random words alone collide
+    name = Sequence(lambda n: f"{fake.word()} {n}")
     description = LazyAttribute(lambda _: fake.sentence())
     slug = LazyAttribute(lambda obj: fake.slug())
     parent = None  # Set to None by default, you can override in tests
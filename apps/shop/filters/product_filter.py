@@ -1,14 +1,139 @@
-from django_filters.rest_framework import FilterSet
+from django.db.models import Exists, OuterRef
+from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
+from rest_framework.filters import OrderingFilter, SearchFilter
 
-from apps.shop.models.product import Product
+from apps.shop.models.category import Category
+from apps.shop.models.attribute import AttributeItem
+from apps.shop.models.product import (
+    Product,
+    ProductAttribute,
+    ProductOptionItem,
+    ProductVariant,
+)
+from apps.shop.services.product.product_bitmap_index import ProductBitmapIndex
+from apps.shop.services.product.product_search import ProductSearch
 
 
 class ProductFilter(FilterSet):
+    # A product has a variant priced above `x` exactly when its maximum price is above `x`
+    # (and below `x` when its minimum price is), so price filters use the summary columns.
+    variants__price__gt = NumberFilter(field_name="max_price", lookup_expr="gt")
+    variants__price__lt = NumberFilter(field_name="min_price", lookup_expr="lt")
+    variants__stock__gt = NumberFilter(method="filter_variants_stock")
+    variants__stock__lt = NumberFilter(method="filter_variants_stock")
+    category = NumberFilter(method="filter_category")
+    # `?attribute_items=1,2,5` and `?options=color:red,color:blue,size:M`, the values of
+    # one attribute (or option) are alternatives, different ones must all match
+    attribute_items = CharFilter(method="filter_attribute_items")
+    options = CharFilter(method="filter_options")
+
     class Meta:
         model = Product
         fields = {
             "status": ["exact"],
             "updated_at": "",
-            "variants__price": ["gt", "lt"],
-            "variants__stock": ["gt", "lt"],
+            "min_price": ["gt", "lt"],
+            "max_price": ["gt", "lt"],
+            "total_stock": ["gt", "lt"],
+        }
+
+    @staticmethod
+    def filter_variants_stock(queryset, name, value):
+        # Use a semi-join, so a product with several matching variants is returned once.
+        lookup = name.removeprefix("variants__")
+        variants = ProductVariant.objects.filter(
+            product_id=OuterRef("pk"), **{lookup: value}
+        )
+        return queryset.filter(Exists(variants))
+
+    @staticmethod
+    def filter_category(queryset, name, value):
+        # Include the products of every subcategory, using the materialized path.
+        path = Category.objects.filter(pk=value).values_list("path", flat=True).first()
+        if not path:
+            return queryset.none()
+        return queryset.filter(category__path__startswith=path)
+
+    @staticmethod
+    def filter_attribute_items(queryset, name, value):
+        # `isdigit` alone accepts digits like "²" that `int` rejects
+        item_ids = {
+            int(item)
+            for item in map(str.strip, value.split(","))
+            if item.isascii() and item.isdecimal()
         }
+        items_by_attribute = {}
+        for item_id, attribute_id in AttributeItem.objects.filter(
+            id__in=item_ids
+        ).values_list("id", "attribute_id"):
+            items_by_attribute.setdefault(attribute_id, []).append(item_id)
+        if not items_by_attribute:
+            return queryset.none() if item_ids else queryset
+
+        product_ids = ProductBitmapIndex.match_attribute_items(
+            items_by_attribute.values()
+        )
+        if product_ids is not None:
+            return queryset.filter(id__in=product_ids)
+        for items in items_by_attribute.values():
+            product_items = ProductAttribute.items.through.objects.filter(
+                productattribute__product_id=OuterRef("pk"), attributeitem_id__in=items
+            )
+            queryset = queryset.filter(Exists(product_items))
+        return queryset
+
+    @staticmethod
+    def filter_options(queryset, name, value):
+        items_by_option = {}
+        for pair in value.split(","):
+            option_name, _, item_name = pair.partition(":")
+            if option_name.strip() and item_name.strip():
+                items_by_option.setdefault(option_name.strip(), []).append(
+                    item_name.strip()
+                )
+        if not items_by_option:
+            return queryset
+
+        product_ids = ProductBitmapIndex.match_option_items(
+            [(option_name, item) for item in items]
+            for option_name, items in items_by_option.items()
+        )
+        if product_ids is not None:
+            return queryset.filter(id__in=product_ids)
+        for option_name, item_names in items_by_option.items():
+            product_items = ProductOptionItem.objects.filter(
+                option__product_id=OuterRef("pk"),
+                option__option_name=option_name,
+                item_name__in=item_names,
+            )
+            queryset = queryset.filter(Exists(product_items))
+        return queryset
+
+
+class ProductSearchFilter(SearchFilter):
+    """`?search=` through the configured product search backend, best match first."""
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").replace("\x00", "")
+        if not term.strip():
+            return queryset
+        return ProductSearch.backend().search(queryset, term)
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """
+    `?ordering=` with the variant fields of the old API mapped onto the summary
+    columns, like the `variants__price__gt/lt` filters: ascending prices order by the
+    cheapest variant, descending ones by the most expensive.
+    """
+
+    ORDERING_ALIASES = {
+        "variants__price": "min_price",
+        "-variants__price": "-max_price",
+        "variants__stock": "total_stock",
+        "-variants__stock": "-total_stock",
+    }
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [self.ORDERING_ALIASES.get(field, field) for field in fields]
+        return super().remove_invalid_fields(queryset, fields, view, request)
@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.shop.services.product.product_bitmap_index import (
+    ProductBitmapIndex,
+    bitmap_class,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the product bitmap index of a generated catalog and report the build "
+        "time, the memory footprint and the time of multi-facet intersections. "
+        "With --database the index of the stored catalog is rebuilt instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1_000_000)
+        parser.add_argument("--attribute-items", type=int, default=500)
+        parser.add_argument("--items-per-product", type=int, default=5)
+        parser.add_argument("--option-items", type=int, default=50)
+        parser.add_argument("--options-per-product", type=int, default=4)
+        parser.add_argument("--queries", type=int, default=1000)
+        parser.add_argument("--database", action="store_true")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"bitmaps: {bitmap_class().__name__}")
+        if options["database"]:
+            started = time.perf_counter()
+            ProductBitmapIndex.rebuild()
+            elapsed = time.perf_counter() - started
+            indexes = (
+                ProductBitmapIndex._attribute_items,
+                ProductBitmapIndex._option_items,
+            )
+            self.stdout.write(f"rebuild from the database: {elapsed:.2f} s")
+        else:
+            indexes = self.build_generated(options)
+
+        self.stdout.write(
+            f"keys: {sum(len(index) for index in indexes)}, "
+            f"memory: {self.footprint(*indexes) / 2**20:.1f} MB"
+        )
+        self.report_intersections(*indexes, options["queries"])
+
+    def build_generated(self, options) -> tuple[dict, dict]:
+        def rows(keys: list, per_product: int):
+            generator = random.Random(0)
+            for product_id in range(1, options["products"] + 1):
+                for key in generator.sample(keys, per_product):
+                    yield key, product_id
+
+        attribute_keys = list(range(1, options["attribute_items"] + 1))
+        option_keys = [
+            (f"option-{n % 5}", f"item-{n}") for n in range(options["option_items"])
+        ]
+
+        def build():
+            return ProductBitmapIndex.build(
+                rows(attribute_keys, options["items_per_product"]),
+                rows(option_keys, options["options_per_product"]),
+            )[:2]
+
+        started = time.perf_counter()
+        indexes = build()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"products: {options['products']}, build: {elapsed:.2f} s "
+            "(the rows are generated while building)"
+        )
+        return indexes
+
+    @staticmethod
+    def footprint(*indexes: dict) -> int:
+        """Bytes held by the bitmaps (with `set`, without the shared id objects)."""
+        total = 0
+        for index in indexes:
+            for bitmap in index.values():
+                if hasattr(bitmap, "get_statistics"):  # pyroaring
+                    stats = bitmap.get_statistics()
+                    total += (
+                        stats["n_bytes_array_containers"]
+                        + stats["n_bytes_run_containers"]
+                        + stats["n_bytes_bitset_containers"]
+                    )
+                else:
+                    total += bitmap.__sizeof__()
+        return total
+
+    def report_intersections(self, attribute_items, option_items, queries: int):
+        generator = random.Random(1)
+        attribute_keys = list(attribute_items)
+        option_keys = list(option_items)
+        if not attribute_keys or not option_keys:
+            return
+
+        # the keys of both indexes are distinct (ids and name pairs)
+        index = {**attribute_items, **option_items}
+        timings, matches = [], []
+        for _ in range(queries):
+            # e.g. color=red AND material=cotton AND size in (M, L)
+            item_groups = [
+                [generator.choice(attribute_keys)],
+                [generator.choice(attribute_keys)],
+                generator.sample(option_keys, min(2, len(option_keys))),
+            ]
+            started = time.perf_counter()
+            matched = ProductBitmapIndex.intersect(index, item_groups)
+            timings.append(time.perf_counter() - started)
+            matches.append(len(matched))
+
+        self.stdout.write(
+            f"intersections: median {statistics.median(timings) * 1e6:.0f} us, "
+            f"median {statistics.median(matches):.0f} products matched"
+        )
@@ -0,0 +1,103 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.models.order import Order, OrderAddress
+from apps.shop.models.product import Product
+from apps.shop.services.order.checkout_service import CheckoutService
+from apps.shop.services.product.product_service import ProductService
+
+
+class Command(BaseCommand):
+    help = (
+        "Check out many carts of the same size one after another, and report "
+        "p50/p99 checkout latency against a target."
+    )
+
+    ADDRESS = {
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "phone": "+10000000000",
+        "country": "Country",
+        "province": "Province",
+        "city": "City",
+        "address1": "Street 1",
+        "zip": "00000",
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkouts", type=int, default=200)
+        parser.add_argument("--lines", type=int, default=20)
+        parser.add_argument(
+            "--target", type=float, default=50, help="p99 target in milliseconds"
+        )
+
+    def handle(self, *args, **options):
+        checkouts, lines = options["checkouts"], options["lines"]
+
+        product = ProductService.create_product(
+            name=f"Checkout benchmark {uuid.uuid4().hex[:8]}",
+            status=Product.STATUS_ACTIVE,
+            price=10,
+            stock=checkouts * 2,
+            options=[{"option_name": "size", "items": [str(n) for n in range(lines)]}],
+        )
+        variant_ids = list(product.variants.values_list("id", flat=True))
+        customer = get_user_model().objects.create_user(
+            email=f"checkout-benchmark-{uuid.uuid4().hex[:8]}@test.test"
+        )
+
+        latencies = []
+        try:
+            for _ in range(checkouts):
+                cart = Cart.objects.create()
+                CartItem.objects.bulk_create(
+                    [
+                        CartItem(cart=cart, variant_id=variant_id, quantity=2)
+                        for variant_id in variant_ids
+                    ]
+                )
+                started = time.perf_counter()
+                CheckoutService.checkout(
+                    cart.id,
+                    customer,
+                    shipping_address=self.ADDRESS,
+                    idempotency_key=str(cart.id),
+                )
+                latencies.append(time.perf_counter() - started)
+        finally:
+            orders = Order.objects.filter(customer=customer)
+            address_ids = list(
+                orders.values_list("shipping_address_id", "billing_address_id")
+            )
+            orders.delete()
+            OrderAddress.objects.filter(
+                id__in=[id for ids in address_ids for id in ids]
+            ).delete()
+            customer.delete()
+            product.delete()
+
+        latencies.sort()
+        percentile = (
+            statistics.quantiles(latencies, n=100)
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        p99 = percentile[98] * 1000
+
+        self.stdout.write(
+            f"checkouts: {checkouts}, lines per cart: {len(variant_ids)}\n"
+            f"latency p50: {percentile[49] * 1000:.2f} ms, p99: {p99:.2f} ms"
+        )
+        if p99 > options["target"]:
+            self.stdout.write(
+                self.style.ERROR(f"p99 is over the {options['target']:g} ms target")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"p99 is within the {options['target']:g} ms target")
+            )
@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.shop.serializers.cart_serializers import CartItemSerializer
+from apps.shop.serializers.fast_serializers import (
+    FastCartItemSerializer,
+    FastProductSerializer,
+)
+from apps.shop.serializers.product_serializers import ProductSerializer
+from apps.shop.services.cart.cart_repository import CartRepository
+from apps.shop.services.product.product_repository import ProductRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize the stored products and cart items with the DRF serializers and "
+        "with the fast read-only ones, and report the median time of both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=50)
+        parser.add_argument("--cart-items", type=int, default=200)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        context = {"request": request}
+
+        # the objects are loaded once, only the serialization is timed
+        products = list(
+            ProductRepository.get_product_queryset(request)[: options["products"]]
+        )
+        cart_items = list(
+            CartRepository.get_cart_item_queryset()[: options["cart_items"]]
+        )
+
+        self.report(
+            f"products: {len(products)}",
+            lambda: ProductSerializer(products, many=True, context=context).data,
+            lambda: FastProductSerializer(products, many=True, context=context).data,
+            options["iterations"],
+        )
+        self.report(
+            f"cart items: {len(cart_items)}",
+            lambda: CartItemSerializer(cart_items, many=True).data,
+            lambda: FastCartItemSerializer(cart_items, many=True).data,
+            options["iterations"],
+        )
+
+    def report(self, title: str, serialize, fast_serialize, iterations: int):
+        drf = self.median_time(serialize, iterations)
+        fast = self.median_time(fast_serialize, iterations)
+        speedup = drf / fast if fast else 0
+        self.stdout.write(
+            f"{title}\n"
+            f"  drf: {drf * 1000:.2f} ms, fast: {fast * 1000:.2f} ms"
+            f" ({speedup:.1f}x)"
+        )
+
+    @staticmethod
+    def median_time(serialize, iterations: int) -> float:
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
@@ -0,0 +1,107 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.shop.models.cart import StockReservation
+from apps.shop.models.product import Product, ProductVariant
+from apps.shop.services.cart.stock_reservation_service import (
+    InsufficientStockError,
+    StockReservationService,
+)
+from apps.shop.services.product.product_service import ProductService
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate many buyers reserving the same variant at once, and report "
+        "throughput, latency and whether the variant was oversold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--stock", type=int, default=100)
+        parser.add_argument("--quantity", type=int, default=1)
+
+    def handle(self, *args, **options):
+        buyers, concurrency = options["buyers"], options["concurrency"]
+        quantity = options["quantity"]
+
+        product = ProductService.create_product(
+            name=f"Reservation benchmark {uuid.uuid4().hex[:8]}",
+            status=Product.STATUS_ACTIVE,
+            price=1,
+            stock=options["stock"],
+        )
+        variant = product.variants.get()
+
+        def buy():
+            started = time.perf_counter()
+            try:
+                StockReservationService.reserve(uuid.uuid4(), variant.id, quantity)
+                reserved = True
+            except InsufficientStockError:
+                reserved = False
+            return reserved, time.perf_counter() - started
+
+        def run_buyers(count):
+            try:
+                return [buy() for _ in range(count)]
+            finally:
+                if concurrency > 1:
+                    connection.close()
+
+        # spread the buyers over the workers, each worker uses its own connection
+        shares = [
+            buyers // concurrency + (worker < buyers % concurrency)
+            for worker in range(concurrency)
+        ]
+        started = time.perf_counter()
+        try:
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    results = [
+                        result
+                        for worker_results in executor.map(run_buyers, shares)
+                        for result in worker_results
+                    ]
+            else:
+                results = run_buyers(buyers)
+            elapsed = time.perf_counter() - started
+
+            variant = ProductVariant.objects.get(pk=variant.pk)
+            held = sum(
+                StockReservation.objects.filter(variant=variant).values_list(
+                    "quantity", flat=True
+                )
+            )
+        finally:
+            product.delete()
+
+        successful = sum(reserved for reserved, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        percentile = (
+            statistics.quantiles(latencies, n=100)
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        oversold = variant.reserved > variant.stock
+        consistent = held == variant.reserved == successful * quantity
+
+        self.stdout.write(
+            f"buyers: {buyers}, concurrency: {concurrency}, stock: {variant.stock}\n"
+            f"successful reservations: {successful}, reserved: {variant.reserved}\n"
+            f"throughput: {len(results) / elapsed:.0f} reservations/s\n"
+            f"latency p50: {percentile[49] * 1000:.2f} ms, "
+            f"p99: {percentile[98] * 1000:.2f} ms"
+        )
+        if oversold or not consistent:
+            self.stdout.write(
+                self.style.ERROR(f"oversold: {oversold}, consistent: {consistent}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("oversold: no"))
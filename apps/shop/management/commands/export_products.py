@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.services.product.product_service import ProductService
+
+
+class Command(BaseCommand):
+    help = "Export all products as CSV or JSON Lines, to a file or to stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=ProductService.FILE_FORMATS, default="csv"
+        )
+        parser.add_argument("--output", help="Defaults to stdout.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products read per query.",
+        )
+
+    def handle(self, *args, **options):
+        chunks = ProductService.export_products(
+            options["format"], chunk_size=options["chunk_size"]
+        )
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(chunks)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.services.cart.redis_cart_store import RedisCartStore
+
+
+class Command(BaseCommand):
+    help = "Write the carts changed in the Redis cart store to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of carts written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if not RedisCartStore.is_enabled():
+            raise CommandError(
+                'The Redis cart store is not enabled (CART_STORE="redis").'
+            )
+
+        flushed = RedisCartStore.flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} carts."))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.services.product.product_bulk_manager import ProductImportError
+from apps.shop.services.product.product_service import ProductService
+
+
+class Command(BaseCommand):
+    help = "Import products from a CSV or JSON Lines file, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=ProductService.FILE_FORMATS,
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products written per transaction.",
+        )
+        parser.add_argument(
+            "--update-existing",
+            action="store_true",
+            help="Update products whose slug already exists instead of skipping them.",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or options["path"].rsplit(".", 1)[-1].lower()
+        if file_format not in ProductService.FILE_FORMATS:
+            raise CommandError("Set --format, or use a .csv or .jsonl file.")
+
+        with open(options["path"], encoding="utf-8", newline="") as stream:
+            try:
+                result = ProductService.import_products(
+                    stream,
+                    file_format,
+                    chunk_size=options["chunk_size"],
+                    update_existing=options["update_existing"],
+                )
+            except ProductImportError as e:
+                raise CommandError(str(e))
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, updated {result.updated}, "
+                f"skipped {result.skipped} products."
+            )
+        )
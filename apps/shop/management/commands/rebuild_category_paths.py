@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.shop.models.category import Category
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized path of every category from its parent links."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        categories = list(Category.objects.only("id", "parent", "path"))
+        children_by_parent = {}
+        for category in categories:
+            children_by_parent.setdefault(category.parent_id, []).append(category)
+
+        # Walk the tree from the roots, so every parent path is known before its children.
+        stack = [(category, "") for category in children_by_parent.get(None, [])]
+        while stack:
+            category, parent_path = stack.pop()
+            category.path = f"{parent_path}{category.id}/"
+            stack.extend(
+                (child, category.path)
+                for child in children_by_parent.get(category.id, [])
+            )
+
+        Category.objects.bulk_update(categories, ["path"], batch_size=1000)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt paths of {len(categories)} categories.")
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.shop.models.product import Product
+from apps.shop.services.product.product_repository import ProductRepository
+
+
+class Command(BaseCommand):
+    help = "Rebuild the min_price, max_price and total_stock columns of all products."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products to refresh per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        product_ids = Product.objects.order_by("id").values_list("id", flat=True)
+        total = 0
+
+        chunk = []
+        for product_id in product_ids.iterator(chunk_size=chunk_size):
+            chunk.append(product_id)
+            if len(chunk) == chunk_size:
+                total += self._refresh(chunk)
+                chunk = []
+        if chunk:
+            total += self._refresh(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt summaries of {total} products."))
+
+    @staticmethod
+    @transaction.atomic
+    def _refresh(product_ids: list[int]) -> int:
+        ProductRepository.refresh_variant_summary(*product_ids)
+        return len(product_ids)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from apps.shop.models.product import Product
+from apps.shop.services.product.product_search import ProductSearch
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the product search indexes and rebuild the search vectors of all "
+        "products."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products to refresh per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        backend = ProductSearch.backend()
+        backend.install(DEFAULT_DB_ALIAS)
+
+        product_ids = Product.objects.order_by("id").values_list("id", flat=True)
+        total = 0
+
+        chunk = []
+        for product_id in product_ids.iterator(chunk_size=chunk_size):
+            chunk.append(product_id)
+            if len(chunk) == chunk_size:
+                total += self._refresh(backend, chunk)
+                chunk = []
+        if chunk:
+            total += self._refresh(backend, chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the search vectors of {total} products.")
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def _refresh(backend, product_ids: list[int]) -> int:
+        backend.update_vectors(Product.objects.filter(id__in=product_ids))
+        return len(product_ids)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.services.cart.stock_reservation_service import StockReservationService
+
+
+class Command(BaseCommand):
+    help = "Release the stock held by expired cart reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of reservations released per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        released = 0
+        while True:
+            batch = StockReservationService.release_expired(
+                batch_size=options["batch_size"]
+            )
+            released += batch
+            if batch < options["batch_size"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Released {released} reservations."))
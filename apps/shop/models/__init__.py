@@ -0,0 +1,14 @@
+from .attribute import Attribute, AttributeItem
+from .cart import Cart, CartItem, StockReservation
+from .category import Category, CategoryImage
+from .option import Option, OptionItem
+from .order import Order, OrderAddress, OrderItem
+from .product import (
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductOption,
+    ProductOptionItem,
+    ProductVariant,
+    ProductVariantImage,
+)
@@ -8,6 +8,9 @@ class Attribute(ModelMixin):
 
     class Meta:
         ordering = ["attribute_name"]
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="attribute_created_id_idx")
+        ]
 
     def __str__(self):
         return self.attribute_name
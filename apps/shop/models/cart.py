@@ -11,6 +11,19 @@ class Cart(ModelMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
 
 
+class StockReservation(ModelMixin):
+    # Not a foreign key: carts of the Redis cart store are not in the database until flushed
+    cart_id = models.UUIDField(db_index=True)
+    variant = models.ForeignKey(
+        ProductVariant, on_delete=models.CASCADE, related_name="reservations"
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = [["cart_id", "variant"]]
+
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
     variant = models.ForeignKey(
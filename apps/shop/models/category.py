@@ -1,8 +1,15 @@
-from django.db import models
-from django.utils.text import slugify
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 
 from apps.core.models.image import AbstractImage
 from apps.core.models.mixin import ModelMixin
+from apps.core.services.slug_service import SlugService
 
 
 class Category(ModelMixin):
@@ -16,51 +23,134 @@ class Category(ModelMixin):
         blank=True,
         related_name="children",  # Add a reverse relation to easily access children
     )
+    # Materialized path of primary keys from the root down to this category, e.g. "1/5/9/".
+    # Ancestors and descendants are resolved from it with a single query.
+    path = models.CharField(max_length=1000, db_index=True, editable=False, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="category_created_id_idx")
+        ]
+
+    def get_ancestor_ids(self) -> list[int]:
+        """Return the ancestor IDs from the highest ancestor down to the direct parent."""
+        return [int(pk) for pk in self.path.split("/")[:-2]]
+
+    def get_descendants(self):
+        return Category.objects.filter(path__startswith=self.path).exclude(pk=self.pk)
+
+    def get_parents_hierarchy(self, ancestors: dict = None):
+        """`ancestors` are the categories loaded by `load_hierarchies`, by ID."""
+        ancestor_ids = self.get_ancestor_ids()
+        if ancestors is None:
+            ancestors = Category.objects.only("id", "name").in_bulk(ancestor_ids)
+        # Keep the path order to get the highest ancestor first
+        return [
+            {"id": pk, "name": ancestors[pk].name}
+            for pk in ancestor_ids
+            if pk in ancestors
+        ]
+
+    def get_children_hierarchy(self, children_by_parent: dict = None):
+        """`children_by_parent` is the grouping loaded by `load_hierarchies`."""
+        if children_by_parent is None:
+            descendants = self.get_descendants().only("id", "name", "parent")
+            children_by_parent = self.group_by_parent(descendants)
+        return self.nest_children(children_by_parent, root_id=self.pk)
+
+    @classmethod
+    def load_hierarchies(cls, categories) -> dict:
+        """
+        Load what the hierarchies of several categories, e.g. a page of them, are built
+        from: the ancestors with one query, and the descendants with another.
+        """
+        categories = list(categories)
+        ancestors = cls.objects.only("id", "name").in_bulk(
+            {pk for category in categories for pk in category.get_ancestor_ids()}
+        )
+        paths = {category.path for category in categories if category.path}
+        descendants = []
+        if paths:
+            descendants = cls.objects.filter(
+                reduce(or_, (Q(path__startswith=path) for path in paths))
+            ).only("id", "name", "parent")
+        return {
+            "ancestors": ancestors,
+            "children_by_parent": cls.group_by_parent(descendants),
+        }
+
+    @classmethod
+    def build_hierarchy(cls, categories, root_id=None) -> list[dict]:
+        """Nest already loaded categories under their parents, starting at `root_id`."""
+        return cls.nest_children(cls.group_by_parent(categories), root_id)
+
+    @staticmethod
+    def group_by_parent(categories) -> dict:
+        children_by_parent = defaultdict(list)
+        for category in sorted(categories, key=lambda category: category.id):
+            children_by_parent[category.parent_id].append(category)
+        return children_by_parent
 
-    def get_parents_hierarchy(self):
-        hierarchy = []
-        category = self
-        while category.parent is not None:
-            hierarchy.append(
+    @staticmethod
+    def nest_children(children_by_parent: dict, root_id=None) -> list[dict]:
+        def fetch_children(parent_id):
+            return [
                 {
-                    "id": category.parent.id,
-                    "name": category.parent.name,
+                    "id": child.id,
+                    "name": child.name,
+                    "children": fetch_children(child.id),
                 }
-            )
-            category = category.parent
-        return hierarchy[::-1]  # Reverse the list to get the highest ancestor first
-
-    def get_children_hierarchy(self):
-        def fetch_children(category):
-            children = []
-            for child in category.children.all():
-                children.append(
-                    {
-                        "id": child.id,
-                        "name": child.name,
-                        "children": fetch_children(
-                            child
-                        ),  # Recursively get child hierarchy
-                    }
-                )
-            return children
-
-        return fetch_children(self)
-
-    def automatic_slug_creation(self):
-        # TODO fix bug on automatic assign count
-        if not self.slug:
-            base_slug = slugify(self.name, allow_unicode=True)
-            slug = base_slug
-            count = 1
-            while Category.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{count}"
-                count += 1
-            self.slug = slug
+                for child in children_by_parent.get(parent_id, [])
+            ]
+
+        return fetch_children(root_id)
 
+    def automatic_slug_creation(self) -> bool:
+        """Assign a free slug when none is set, return whether one was assigned."""
+        if self.slug:
+            return False
+        self.slug = SlugService.allocate(Category, self.name)
+        return True
+
+    @transaction.atomic
     def save(self, *args, **kwargs):
-        self.automatic_slug_creation()
-        super().save(*args, **kwargs)
+        slug_assigned = self.automatic_slug_creation()
+        if self.pk and self.parent and self.parent.path.startswith(self.path or "-"):
+            raise ValidationError(
+                "A category cannot be a child of itself or of its descendants.",
+                code="category_cycle",
+            )
+        if slug_assigned:
+            SlugService.save_with_slug(
+                self, lambda: super(Category, self).save(*args, **kwargs)
+            )
+        else:
+            super().save(*args, **kwargs)
+        self.update_path()
+
+    @transaction.atomic
+    def delete(self, *args, **kwargs):
+        path = self.path
+        deleted = super().delete(*args, **kwargs)
+        # The children were detached by `SET_NULL`, so their subtrees become roots.
+        Category.objects.filter(path__startswith=path).update(
+            path=Substr("path", len(path) + 1)
+        )
+        return deleted
+
+    def update_path(self):
+        """Store the path of this category and move its descendants along with it."""
+        old_path = self.path
+        new_path = f"{self.parent.path if self.parent else ''}{self.pk}/"
+        if new_path == old_path:
+            return
+
+        Category.objects.filter(pk=self.pk).update(path=new_path)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(
+                pk=self.pk
+            ).update(path=Concat(Value(new_path), Substr("path", len(old_path) + 1)))
+        self.path = new_path
 
 
 class CategoryImage(AbstractImage):
@@ -6,6 +6,11 @@ from apps.core.models.mixin import ModelMixin
 class Option(ModelMixin):
     option_name = models.CharField(max_length=255, unique=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="option_created_id_idx")
+        ]
+
     def __str__(self):
         return self.option_name
 
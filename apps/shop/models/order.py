@@ -1,6 +1,7 @@
 from django.db import models
 
 from apps.core.models.mixin import ModelMixin
+from apps.shop.models.product import Product, ProductVariant
 from config import settings
 
 
@@ -25,7 +26,7 @@ class OrderAddress(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     company = models.CharField(max_length=255, blank=True, null=True)
-    phone = models.EmailField()
+    phone = models.CharField(max_length=32)
     country = models.CharField(max_length=255)
     province = models.CharField(max_length=255)
     city = models.CharField(max_length=255)
@@ -38,7 +39,10 @@ class OrderAddress(models.Model):
 
 class Order(ModelMixin):
     customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
-    order_number = models.AutoField(unique=True, default=1001)
+    # assigned by `OrderNumberAllocator`
+    order_number = models.PositiveBigIntegerField(unique=True, editable=False)
+    # Sent by the client with a checkout, so a retried request returns the same order
+    idempotency_key = models.CharField(max_length=255, blank=True, null=True)
     ORDER_STATUS_open = "open"
     ORDER_STATUS_INVOICE_SENT = "invoice_sent"
     ORDER_STATUS_completed = "completed"
@@ -50,7 +54,7 @@ class Order(ModelMixin):
         max_length=10, default=FinancialStatus.PENDING, choices=FinancialStatus.choices
     )
     purchase_number = models.IntegerField(unique=True, blank=True, null=True)
-    gateway = models.TextField()
+    gateway = models.TextField(blank=True)
 
     total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     total_discounts = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
@@ -71,17 +75,32 @@ class Order(ModelMixin):
 
     completed_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "idempotency_key"],
+                name="order_customer_idempotency_key_unique",
+            )
+        ]
+
 
 class OrderItem(ModelMixin):
-    pass
-    # custom
-    # variant_id
-    # product_id
-    # name
-    # quantity
-    # gift_card
-    # applied_discount
-    # price
-    # grams
-
-    # variant price
+    """A line of an order, a snapshot of the variant at checkout time."""
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.SET_NULL,
+        related_name="order_items",
+        null=True,
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.SET_NULL, related_name="order_items", null=True
+    )
+    name = models.CharField(max_length=255)
+    variant_title = models.CharField(max_length=255, blank=True)
+    sku = models.CharField(max_length=100, blank=True, null=True)
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+
+    # todo gift_card, applied_discount, grams
@@ -1,12 +1,15 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.utils.text import slugify
 
 from apps.core.models.image import AbstractImage
 from apps.core.models.mixin import ModelMixin
+from apps.core.services.slug_service import SlugService
 from apps.shop.models.attribute import Attribute, AttributeItem
 from apps.shop.models.category import Category
+from apps.shop.services.product.product_search import ProductSearch
 
 
 class Product(ModelMixin):
@@ -51,24 +54,44 @@ class Product(ModelMixin):
         blank=True,
     )
 
+    # Summary of the product variants, kept in sync by `ProductRepository.refresh_variant_summary`
+    # so listing, filtering and sorting by price or stock don't aggregate the variants per request.
+    min_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, db_index=True
+    )
+    max_price = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, db_index=True
+    )
+    total_stock = models.PositiveIntegerField(default=0, db_index=True)
+
+    # Name and description as a `tsvector`, written on save and after bulk imports by
+    # the search backend (see `ProductSearch`). It stays empty on other databases.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="product_created_id_idx"),
+            # recently changed products are polled by `ProductBitmapIndex`
+            models.Index(fields=["updated_at"], name="product_updated_at_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
         if self.status == Product.STATUS_ACTIVE:
             self.published_at = timezone.now()
+        self.search_vector = ProductSearch.backend().document(
+            self.name, self.description
+        )
 
-        if not self.slug:
-            # TODO add tests for slug on create, read, update
-            base_slug = slugify(self.name, allow_unicode=True)
-            slug = base_slug
-            count = 1
-            while Product.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{count}"
-                count += 1
-            self.slug = slug
+        if self.slug:
+            return super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+        self.slug = SlugService.allocate(Product, self.name)
+        SlugService.save_with_slug(
+            self, lambda: super(Product, self).save(*args, **kwargs)
+        )
 
 
 class ProductAttribute(ModelMixin):
@@ -125,6 +148,8 @@ class ProductVariant(ModelMixin):
     )
     price = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     stock = models.PositiveSmallIntegerField()
+    # Quantity held by carts (see `StockReservation`), available stock is `stock - reserved`
+    reserved = models.PositiveIntegerField(default=0)
     sku = models.CharField(max_length=100, blank=True, null=True)
 
     option1 = models.ForeignKey(
@@ -151,6 +176,19 @@ class ProductVariant(ModelMixin):
         blank=True,
     )
 
+    class Meta:
+        constraints = [
+            # One variant per combination of option items. The empty options are
+            # coalesced, so products with less than 3 options are covered as well.
+            models.UniqueConstraint(
+                "product",
+                Coalesce("option1", 0),
+                Coalesce("option2", 0),
+                Coalesce("option3", 0),
+                name="product_variant_options_unique",
+            )
+        ]
+
 
 class ProductImage(AbstractImage):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="media")
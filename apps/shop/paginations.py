@@ -1,5 +1,190 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by `(-created_at, id)`.
+
+    Each page is fetched with a `WHERE (created_at, id)` seek on the last row of the
+    previous page instead of `OFFSET n`, and no `COUNT(*)` is issued, so late pages
+    cost the same as the first one.
+    """
+
+    page_size = 12
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.base_url = None
+        self.has_next = False
+        self.has_previous = False
+        self.page = []
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            queryset = queryset.order_by("-created_at", "id")
+            reverse = False
+        else:
+            created_at, pk, reverse = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by("created_at", "-id")
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by("-created_at", "id")
+
+        # Fetch one extra row to know whether there is another page.
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            return (
+                datetime.fromisoformat(payload["c"]),
+                int(payload["i"]),
+                bool(payload["r"]),
+            )
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse: bool):
+        payload = json.dumps(
+            {"c": instance.created_at.isoformat(), "i": instance.id, "r": reverse}
+        )
+        encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
 
 
 class DefaultPagination(PageNumberPagination):
+    """
+    Page-number pagination, with opt-in keyset pagination.
+
+    Clients that send `?pagination=cursor` get a `KeysetPagination` page instead,
+    existing clients keep using `?page=n`. Keyset pages are always ordered by
+    `(-created_at, id)`, so they can't be combined with `ordering` or `search`.
+    """
+
     page_size = 12
+    pagination_query_param = "pagination"
+    cursor_pagination_value = "cursor"
+
+    def __init__(self):
+        self.keyset_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            request.query_params.get(self.pagination_query_param)
+            == self.cursor_pagination_value
+        ):
+            ordered_by = [
+                param
+                for param in (api_settings.ORDERING_PARAM, api_settings.SEARCH_PARAM)
+                if request.query_params.get(param)
+            ]
+            if ordered_by:
+                raise ValidationError(
+                    {
+                        self.pagination_query_param: (
+                            f"Cursor pagination can't be combined with "
+                            f"{' or '.join(ordered_by)}."
+                        )
+                    }
+                )
+            self.keyset_paginator = KeysetPagination()
+            self.keyset_paginator.page_size = self.page_size
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Set to `cursor` to use keyset pagination, ordered by newest "
+                    "first. It can't be combined with `ordering` or `search`."
+                ),
+                "schema": {"type": "string", "enum": [self.cursor_pagination_value]},
+            },
+            *KeysetPagination().get_schema_operation_parameters(view),
+        ]
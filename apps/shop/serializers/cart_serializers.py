@@ -1,8 +1,12 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from apps.shop.models.cart import CartItem, Cart
 from apps.shop.models.product import ProductVariant, Product
+from apps.shop.services.cart.cart_repository import CartRepository
+from apps.shop.services.cart.redis_cart_store import RedisCartStore
+from apps.shop.services.cart.stock_reservation_service import StockReservationService
 
 
 class CartVariantSerializer(serializers.ModelSerializer):
@@ -44,12 +48,20 @@ class UpdateCartItemSerializer(serializers.ModelSerializer):
         if not variant.stock:
             raise serializers.ValidationError("This product is currently not in stock.")
 
-        if quantity > variant.stock:
+        # the stock held by the other carts is not available
+        available = StockReservationService.get_available(
+            variant, quantity, self.instance.cart_id
+        )
+        if quantity > available:
             raise serializers.ValidationError("Quantity exceeds available stock!")
         return data
 
 
 class AddCartItemSerializer(serializers.ModelSerializer):
+    variant = serializers.PrimaryKeyRelatedField(
+        queryset=ProductVariant.objects.select_related("product")
+    )
+
     class Meta:
         model = CartItem
         # todo rename `variant` to `variant_id`
@@ -66,19 +78,25 @@ class AddCartItemSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Quantity should be a positive number greater than 0."
             )
-        if quantity > variant.stock:
+
+        # check cart exist
+        if RedisCartStore.is_enabled():
+            if not RedisCartStore.cart_exists(cart_id):
+                raise Http404
+        else:
+            get_object_or_404(Cart, pk=cart_id)
+
+        # the stock held by the other carts is not available
+        available = StockReservationService.get_available(variant, quantity, cart_id)
+        if quantity > available:
             raise serializers.ValidationError("Quantity exceeds available stock!")
 
         # validate variant
         if not variant.stock:
             raise serializers.ValidationError("This product is currently not in stock.")
 
-        # check cart exist
-        get_object_or_404(Cart, pk=cart_id)
-
         # validate product status
-        product = Product.objects.get(id=variant.product_id)
-        if product.status != Product.STATUS_ACTIVE:
+        if variant.product.status != Product.STATUS_ACTIVE:
             raise serializers.ValidationError(
                 "Inactive products cannot be added to the cart. Please choose an active product."
             )
@@ -97,10 +115,9 @@ class CartItemSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_image(cart_item) -> str | None:
-        # todo fix: first check variant image, if not exist then get product main image.
         # todo fix: shoe domain name in src.
-        first_media = cart_item.variant.product.media.first()
-        return first_media.src.url if first_media else None
+        image = CartRepository.get_cart_item_image(cart_item)
+        return image.src.url if image else None
 
     @staticmethod
     def get_item_total(cart_item) -> float:
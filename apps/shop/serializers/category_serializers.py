@@ -14,19 +14,6 @@ class CategoryImageSerializer(ModelMixinSerializer):
         fields = ["id", "category_id", "src", "alt", "updated_at", "created_at"]
 
 
-class CategoryTreeSerializer(serializers.ModelSerializer):
-    children = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Category
-        fields = ["id", "name", "children"]  # Add any other fields you want to include
-
-    def get_children(self, obj):
-        # Get the children categories for the current category
-        children = obj.children.all()
-        return CategoryTreeSerializer(children, many=True).data
-
-
 class CategorySerializer(ModelMixinSerializer):
     image = CategoryImageSerializer(read_only=True)
     parents_hierarchy = serializers.SerializerMethodField()
@@ -47,8 +34,11 @@ class CategorySerializer(ModelMixinSerializer):
             "created_at",
         ]
 
+    # The list view loads the hierarchies of the whole page into the context, see
+    # `Category.load_hierarchies`, a single category loads its own.
+
     def get_parents_hierarchy(self, obj):
-        return obj.get_parents_hierarchy()
+        return obj.get_parents_hierarchy(self.context.get("ancestors"))
 
     def get_children_hierarchy(self, obj):
-        return obj.get_children_hierarchy()
+        return obj.get_children_hierarchy(self.context.get("children_by_parent"))
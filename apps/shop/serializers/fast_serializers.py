@@ -0,0 +1,253 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.services.request_metrics import RequestMetrics
+from apps.core.services.site_settings import SiteSettings
+from apps.shop.serializers.product_serializers import ProductSerializer
+from apps.shop.services.cart.cart_repository import CartRepository
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+TWO_PLACES = Decimal("0.01")
+
+
+class FastSerializer:
+    """
+    Read-only serializer that builds the representation dicts directly.
+
+    DRF serializers resolve every field of every object through field instances,
+    `get_attribute` and `to_representation`, which is the bulk of the CPU time of the
+    catalog and cart responses. The subclasses write the same output as the DRF
+    serializer they stand for from already loaded objects, their parity is covered
+    by tests. They are only used to render responses, never to validate input.
+    """
+
+    def __init__(self, instance=None, many: bool = False, context: dict = None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @property
+    def data(self):
+        with RequestMetrics.measure("serializer"):
+            if self.many:
+                return [self.to_representation(obj) for obj in self.instance]
+            return self.to_representation(self.instance)
+
+    def to_representation(self, instance) -> dict:
+        raise NotImplementedError
+
+    # The conversions of the DRF fields, with the settings used by the serializers
+
+    @staticmethod
+    def datetime(value) -> str | None:
+        if not value:
+            return None
+        if settings.USE_TZ and timezone.is_aware(value):
+            value = value.astimezone(timezone.get_current_timezone())
+        return value.strftime(DATETIME_FORMAT)
+
+    @staticmethod
+    def decimal(value) -> Decimal:
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return value.quantize(TWO_PLACES)
+
+    def file_url(self, value) -> str | None:
+        if not value:
+            return None
+        request = self.context.get("request")
+        if request is not None:
+            return request.build_absolute_uri(value.url)
+        return value.url
+
+
+class FastProductVariantSerializer(FastSerializer):
+    """Stands for `ProductVariantSerializer`."""
+
+    def to_representation(self, variant) -> dict:
+        options = (variant.option1, variant.option2, variant.option3)
+        return {
+            "id": variant.id,
+            "product_id": variant.product_id,
+            "price": self.decimal(variant.price),
+            "stock": variant.stock,
+            "sku": variant.sku,
+            "option1": options[0].item_name if options[0] else None,
+            "option2": options[1].item_name if options[1] else None,
+            "option3": options[2].item_name if options[2] else None,
+            "images": [self._image(image) for image in variant.images.all()],
+            "created_at": self.datetime(variant.created_at),
+            "updated_at": self.datetime(variant.updated_at),
+        }
+
+    def _image(self, variant_image) -> dict:
+        # same as `ProductVariantImageSerializer.get_src`
+        request = self.context.get("request")
+        src = None
+        if request is not None:
+            src = f"{settings.MEDIA_URL}{variant_image.product_image.src}"
+            if not SiteSettings.media_url_has_domain():
+                src = f"http://{request.get_host()}{src}"
+        return {"image_id": variant_image.product_image_id, "src": src}
+
+
+class FastProductSerializer(FastSerializer):
+    """
+    Stands for `ProductSerializer` and `ProductListSerializer`, `serializer_class`
+    decides which fields are rendered (see `ProductSerializer.rendered_fields`).
+    """
+
+    def __init__(
+        self,
+        instance=None,
+        many: bool = False,
+        context: dict = None,
+        serializer_class=ProductSerializer,
+    ):
+        super().__init__(instance, many, context)
+        rendered = serializer_class.rendered_fields(self.context)
+        # (field name, method) pairs, resolved once for all the products
+        self.fields = [
+            (name, getattr(self, f"_{name}"))
+            for name in serializer_class.Meta.fields
+            if name in rendered
+        ]
+        self.variant_serializer = FastProductVariantSerializer(context=self.context)
+
+    def to_representation(self, product) -> dict:
+        return {name: method(product) for name, method in self.fields}
+
+    @staticmethod
+    def _id(product):
+        return product.id
+
+    @staticmethod
+    def _name(product):
+        return product.name
+
+    @staticmethod
+    def _slug(product):
+        return product.slug
+
+    @staticmethod
+    def _description(product):
+        return product.description
+
+    @staticmethod
+    def _status(product):
+        return product.status
+
+    @staticmethod
+    def _category(product):
+        return product.category_id
+
+    @staticmethod
+    def _price(product):
+        return {"min_price": product.min_price, "max_price": product.max_price}
+
+    @staticmethod
+    def _total_stock(product):
+        return product.total_stock
+
+    @staticmethod
+    def _options(product):
+        options = [
+            {
+                "id": option.id,
+                "option_name": option.option_name,
+                "items": [item.item_name for item in option.items.all()],
+            }
+            for option in product.options.all()
+        ]
+        return options or None
+
+    def _variants(self, product):
+        return [
+            self.variant_serializer.to_representation(variant)
+            for variant in product.variants.all()
+        ]
+
+    @staticmethod
+    def _attributes(product):
+        attributes = [
+            {
+                "attribute_id": product_attribute.attribute.id,
+                "attribute_name": product_attribute.attribute.attribute_name,
+                "items": [
+                    {"item_id": item.id, "item_name": item.item_name}
+                    for item in product_attribute.items.all()
+                ],
+            }
+            for product_attribute in product.productattribute_set.all()
+        ]
+        return attributes or None
+
+    def _images(self, product):
+        images = [
+            {
+                "id": image.id,
+                "product_id": image.product_id,
+                "src": self.file_url(image.src),
+                "alt": image.alt,
+                "is_main": image.is_main,
+                "created_at": self.datetime(image.created_at),
+                "updated_at": self.datetime(image.updated_at),
+            }
+            for image in product.media.all()
+        ]
+        return images or None
+
+    def _main_image(self, product):
+        images = getattr(product, "main_media", None)
+        if images is None:
+            images = product.media.filter(is_main=True)
+        for image in images:
+            return {"id": image.id, "src": self.file_url(image.src), "alt": image.alt}
+        return None
+
+    def _created_at(self, product):
+        return self.datetime(product.created_at)
+
+    def _updated_at(self, product):
+        return self.datetime(product.updated_at)
+
+    def _published_at(self, product):
+        return self.datetime(product.published_at)
+
+
+class FastCartItemSerializer(FastSerializer):
+    """Stands for `CartItemSerializer`, the items come from `CartRepository`."""
+
+    def to_representation(self, cart_item) -> dict:
+        variant = cart_item.variant
+        options = (variant.option1, variant.option2, variant.option3)
+        image = CartRepository.get_cart_item_image(cart_item)
+        return {
+            "id": cart_item.id,
+            "variant": {
+                "id": variant.id,
+                "product_id": variant.product_id,
+                "price": self.decimal(variant.price),
+                "stock": variant.stock,
+                "option1": options[0].item_name if options[0] else None,
+                "option2": options[1].item_name if options[1] else None,
+                "option3": options[2].item_name if options[2] else None,
+            },
+            "image": image.src.url if image else None,
+            "quantity": cart_item.quantity,
+            "item_total": cart_item.quantity * variant.price,
+        }
+
+
+class FastCartSerializer(FastSerializer):
+    """Stands for `CartSerializer`."""
+
+    def to_representation(self, cart) -> dict:
+        items = cart.items.all()
+        return {
+            "id": str(cart.id),
+            "items": FastCartItemSerializer(items, many=True).data,
+            "total_price": sum([item.quantity * item.variant.price for item in items]),
+        }
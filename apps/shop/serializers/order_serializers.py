@@ -0,0 +1,57 @@
+from rest_framework import serializers
+
+from apps.core.serializers.mixin import ModelMixinSerializer
+from apps.shop.models.order import Order, OrderAddress, OrderItem
+
+
+class OrderAddressSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderAddress
+        exclude = ["id"]
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = [
+            "id",
+            "variant_id",
+            "product_id",
+            "name",
+            "variant_title",
+            "sku",
+            "quantity",
+            "price",
+        ]
+
+
+class OrderSerializer(ModelMixinSerializer):
+    shipping_address = OrderAddressSerializer(read_only=True)
+    billing_address = OrderAddressSerializer(read_only=True)
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "order_number",
+            "order_status",
+            "financial_status",
+            "total_line_items_price",
+            "total_discounts",
+            "total_tax",
+            "total_price",
+            "shipping_address",
+            "billing_address",
+            "items",
+            "note",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class CheckoutSerializer(serializers.Serializer):
+    shipping_address = OrderAddressSerializer()
+    billing_address = OrderAddressSerializer(required=False)
+    gateway = serializers.CharField(required=False, allow_blank=True, default="")
+    note = serializers.CharField(required=False, allow_blank=True, default="")
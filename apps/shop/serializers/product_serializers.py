@@ -1,11 +1,10 @@
-from urllib.parse import urlparse
-
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from rest_framework import serializers
+from rest_framework.fields import empty
 
 from apps.core.serializers.mixin import ModelMixinSerializer
-from apps.shop.models.attribute import Attribute, AttributeItem
+from apps.core.services.site_settings import SiteSettings
 from apps.shop.models.category import Category
 from apps.shop.models.product import (
     Product,
@@ -14,6 +13,9 @@ from apps.shop.models.product import (
     ProductImage,
     ProductVariantImage,
 )
+from apps.shop.services.product.product_attributes_manager import (
+    ProductAttributeMixin,
+)
 
 
 class ProductOptionSerializer(serializers.ModelSerializer):
@@ -42,7 +44,7 @@ class ProductVariantImageSerializer(serializers.ModelSerializer):
         src = obj.product_image.src  # Relative URL of the image
 
         # Check if media_url already contains a domain
-        if not urlparse(media_url).scheme:
+        if not SiteSettings.media_url_has_domain():
             return f"http://{domain}{media_url}{src}"
         else:
             return f"{media_url}{src}"
@@ -164,20 +166,21 @@ class ProductCreateSerializer(serializers.ModelSerializer):
         ]
 
     def validate_attributes(self, attributes):
+        # Load every referenced attribute and item at once, the service reuses them
+        self._attribute_items = ProductAttributeMixin.load_attribute_items(attributes)
+
         for attr in attributes:
             attribute_id = attr["attribute_id"]
             item_ids = attr["items_id"]
 
             # Validate attribute ID
-            if not Attribute.objects.filter(id=attribute_id).exists():
+            if attribute_id not in self._attribute_items:
                 raise serializers.ValidationError(
                     f"One or more attribute IDs are invalid."
                 )
 
             # Validate item IDs
-            valid_item_ids = AttributeItem.objects.filter(
-                attribute_id=attribute_id
-            ).values_list("id", flat=True)
+            valid_item_ids = self._attribute_items[attribute_id]
             invalid_item_ids = [
                 item_id for item_id in item_ids if item_id not in valid_item_ids
             ]
@@ -189,6 +192,12 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
         return attributes
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if "attributes" in attrs:
+            attrs["attribute_items"] = getattr(self, "_attribute_items", {})
+        return attrs
+
     @staticmethod
     def validate_options(options):
         # If options is None, return None
@@ -249,11 +258,45 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
 
 class ProductUpdateSerializer(ProductCreateSerializer):
-    pass
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Without defaults, so only the values sent are written to the variants
+        for name in ("price", "stock", "sku"):
+            self.fields[name].default = empty
+
+
+class ProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=["csv", "jsonl"],
+        required=False,
+        help_text="Defaults to the file extension.",
+    )
+    update_existing = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if "file_format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            if extension not in ("csv", "jsonl"):
+                raise serializers.ValidationError(
+                    {"file_format": "Set the format, or upload a .csv or .jsonl file."}
+                )
+            attrs["file_format"] = extension
+        return attrs
 
 
 class ProductSerializer(ModelMixinSerializer):
+    """
+    Full product representation.
+
+    A `fields` list in the serializer context (`?fields=` on the views) limits the
+    output to those fields, and `rendered_fields` tells the queryset which nested
+    relations to prefetch.
+    """
+
     DEFAULT_TOTAL_STOCK = 0
+    # Nested relations, prefetched only when they are rendered
+    RELATED_FIELDS = ("options", "variants", "attributes", "images")
 
     published_at = serializers.DateTimeField(
         format="%Y-%m-%d %H:%M:%S", required=False, read_only=True
@@ -290,8 +333,22 @@ class ProductSerializer(ModelMixinSerializer):
             "published_at",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name in set(self.fields) - self.rendered_fields(self.context):
+            self.fields.pop(field_name)
+
+    @classmethod
+    def rendered_fields(cls, context: dict) -> set:
+        """Return the names of the fields to render for the serializer `context`."""
+        fields = set(cls.Meta.fields)
+        requested = context.get("fields")
+        if requested:
+            fields &= set(requested)
+        return fields
+
     def get_price(self, instance):
-        # Use annotated values instead of querying variants
+        # Use the summary columns instead of querying variants
         return {
             "min_price": getattr(instance, "min_price", None),
             "max_price": getattr(instance, "max_price", None),
@@ -325,14 +382,59 @@ class ProductSerializer(ModelMixinSerializer):
         representation = super().to_representation(instance)
         self._set_none_if_empty(representation, "options")
         self._set_none_if_empty(representation, "images")
-        representation["total_stock"] = getattr(
-            instance, "total_stock", self.DEFAULT_TOTAL_STOCK
-        )
+        if "total_stock" in representation:
+            representation["total_stock"] = getattr(
+                instance, "total_stock", self.DEFAULT_TOTAL_STOCK
+            )
 
         return representation
 
     @staticmethod
     def _set_none_if_empty(data, field_name):
         """Helper to set a field to None if it's empty."""
-        if not data.get(field_name):
+        if field_name in data and not data[field_name]:
             data[field_name] = None
+
+
+class ProductMainImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductImage
+        fields = ["id", "src", "alt"]
+
+
+class ProductListSerializer(ProductSerializer):
+    """
+    Compact product representation for catalog grids: the summary fields and the main
+    image. The nested relations are only rendered when they are listed in the
+    `expand` of the serializer context (`?expand=variants,options`).
+    """
+
+    main_image = serializers.SerializerMethodField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "status",
+            "category",
+            "price",
+            "total_stock",
+            "main_image",
+            *ProductSerializer.RELATED_FIELDS,
+            "published_at",
+        ]
+
+    @classmethod
+    def rendered_fields(cls, context: dict) -> set:
+        expand = set(context.get("expand") or [])
+        return super().rendered_fields(context) - (set(cls.RELATED_FIELDS) - expand)
+
+    def get_main_image(self, instance):
+        # `main_media` is prefetched by the product queryset
+        images = getattr(instance, "main_media", None)
+        if images is None:
+            images = instance.media.filter(is_main=True)
+        for image in images:
+            return ProductMainImageSerializer(image, context=self.context).data
+        return None
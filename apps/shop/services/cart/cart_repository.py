@@ -0,0 +1,162 @@
+from django.db import connection, transaction
+from django.db.models import Max, Prefetch, Q
+
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.models.product import ProductImage, ProductVariant, ProductVariantImage
+
+
+class CartRepository:
+    """
+    Repository class to manage Cart-related database queries.
+
+    The querysets load a cart with its items, their variants, option items, products
+    and images in a fixed number of queries, whatever the number of items:
+    one for the items joined with their variant, product and options, one for the
+    variant images and one for the product images (plus one for the carts).
+    """
+
+    @staticmethod
+    def _get_image_prefetches(variant_path: str = ""):
+        return (
+            Prefetch(
+                f"{variant_path}images",
+                queryset=ProductVariantImage.objects.select_related(
+                    "product_image"
+                ).order_by("id"),
+            ),
+            Prefetch(
+                f"{variant_path}product__media",
+                queryset=ProductImage.objects.order_by("id"),
+            ),
+        )
+
+    @classmethod
+    def get_cart_item_queryset(cls):
+        return CartItem.objects.select_related(
+            "variant__product",
+            "variant__option1",
+            "variant__option2",
+            "variant__option3",
+        ).prefetch_related(*cls._get_image_prefetches("variant__"))
+
+    @classmethod
+    def get_cart_queryset(cls):
+        return Cart.objects.prefetch_related(
+            Prefetch("items", queryset=cls.get_cart_item_queryset())
+        )
+
+    @classmethod
+    def get_variant_queryset(cls):
+        """Variants loaded with everything a cart item needs to be serialized."""
+
+        return ProductVariant.objects.select_related(
+            "product", "option1", "option2", "option3"
+        ).prefetch_related(*cls._get_image_prefetches())
+
+    @staticmethod
+    def get_cart_items(cart_id) -> dict[int, tuple[int, int]] | None:
+        """
+        Return the `(item id, quantity)` of the items of a stored cart by variant id,
+        or None if the cart does not exist.
+        """
+
+        if not Cart.objects.filter(pk=cart_id).exists():
+            return None
+        return {
+            variant_id: (item_id, quantity)
+            for item_id, variant_id, quantity in CartItem.objects.filter(
+                cart_id=cart_id
+            ).values_list("id", "variant_id", "quantity")
+        }
+
+    @staticmethod
+    def reserve_item_id() -> int | None:
+        """
+        Take the id of a cart item that is inserted later, by `save_carts`.
+
+        On PostgreSQL the id comes from the sequence of the table, so the rows the
+        database numbers itself never get it. Return None on databases without
+        sequences.
+        """
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id'))",
+                [CartItem._meta.db_table],
+            )
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def get_max_item_id() -> int:
+        return CartItem.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+
+    @staticmethod
+    @transaction.atomic
+    def save_carts(items_by_cart: dict[str, dict[int, tuple[int, int]]]) -> None:
+        """
+        Make the stored carts match the given `(item id, quantity)` by variant id, in a
+        fixed number of queries.
+
+        Missing carts are created, items that are no longer in a cart are deleted and
+        the others are upserted, new ones with their given id. Variants that were
+        deleted in the meantime are skipped.
+        """
+
+        if not items_by_cart:
+            return
+
+        Cart.objects.bulk_create(
+            [Cart(id=cart_id) for cart_id in items_by_cart], ignore_conflicts=True
+        )
+
+        variant_ids = set(
+            ProductVariant.objects.filter(
+                id__in={
+                    variant_id
+                    for items in items_by_cart.values()
+                    for variant_id in items
+                }
+            ).values_list("id", flat=True)
+        )
+
+        removed_items = Q()
+        for cart_id, items in items_by_cart.items():
+            removed_items |= Q(cart_id=cart_id) & ~Q(variant_id__in=list(items))
+        CartItem.objects.filter(removed_items).delete()
+
+        CartItem.objects.bulk_create(
+            [
+                CartItem(
+                    id=item_id,
+                    cart_id=cart_id,
+                    variant_id=variant_id,
+                    quantity=quantity,
+                )
+                for cart_id, items in items_by_cart.items()
+                for variant_id, (item_id, quantity) in items.items()
+                if variant_id in variant_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["cart", "variant"],
+            update_fields=["quantity"],
+        )
+
+    @staticmethod
+    def get_cart_item_image(cart_item: CartItem) -> ProductImage | None:
+        """
+        Return the image to show for a cart item, using the prefetched images only.
+
+        The first image of the variant is used, if the variant has no image then the
+        main image of the product, and if there is no main image the first product image.
+        """
+        variant = cart_item.variant
+        variant_images = variant.images.all()
+        if variant_images:
+            return variant_images[0].product_image
+
+        product_images = variant.product.media.all()
+        return next(
+            (image for image in product_images if image.is_main),
+            product_images[0] if product_images else None,
+        )
@@ -0,0 +1,291 @@
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.services.cart.cart_repository import CartRepository
+
+
+@lru_cache
+def _get_client(url: str):
+    # `redis` is only needed when the Redis cart store is enabled
+    import redis
+
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+class RedisCartStore:
+    """
+    Keeps active carts as Redis hashes, with a sliding TTL.
+
+    Every cart is a hash of `variant id -> "item id:quantity"` (plus a marker field, so
+    an empty cart still exists). Items keep the id of their `CartItem` row, and new
+    items reserve the id of the row that the flush inserts, so the item URLs are the
+    same in both stores and don't change when a cart is loaded or flushed.
+    Writes only touch Redis and mark the cart as dirty; `flush` writes the dirty
+    carts to the `Cart`/`CartItem` tables, from the `flush_carts` command or at
+    checkout. Carts that expire before being flushed never reach the database.
+
+    Enabled with `CART_STORE = "redis"`.
+    """
+
+    CART_MARKER = "_"
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.CART_STORE == "redis"
+
+    @staticmethod
+    def get_client():
+        return _get_client(settings.CART_REDIS_URL)
+
+    @staticmethod
+    def _cart_key(cart_id) -> str:
+        return f"{settings.CART_REDIS_KEY_PREFIX}:{uuid.UUID(str(cart_id))}"
+
+    @staticmethod
+    def _dirty_key() -> str:
+        return f"{settings.CART_REDIS_KEY_PREFIX}:dirty"
+
+    @staticmethod
+    def _item_ids_key() -> str:
+        return f"{settings.CART_REDIS_KEY_PREFIX}:item_ids"
+
+    # -------------
+    # --- Carts ---
+    # -------------
+
+    @classmethod
+    def create_cart(cls) -> str:
+        cart_id = str(uuid.uuid4())
+        pipe = cls.get_client().pipeline()
+        pipe.hset(cls._cart_key(cart_id), cls.CART_MARKER, 1)
+        pipe.expire(cls._cart_key(cart_id), settings.CART_REDIS_TTL)
+        pipe.execute()
+        return cart_id
+
+    @classmethod
+    def cart_exists(cls, cart_id) -> bool:
+        return cls._get_cart_items(cart_id) is not None
+
+    @classmethod
+    def delete_cart(cls, cart_id) -> bool:
+        """Delete a cart from Redis and from the database, return False if it does not exist."""
+
+        if not cls.cart_exists(cart_id):
+            return False
+        cls.discard_cart(cart_id)
+        Cart.objects.filter(pk=cart_id).delete()
+        return True
+
+    @classmethod
+    def discard_cart(cls, cart_id) -> None:
+        """Remove a cart from Redis only, e.g. once it is checked out."""
+
+        pipe = cls.get_client().pipeline()
+        pipe.delete(cls._cart_key(cart_id))
+        pipe.srem(cls._dirty_key(), str(cart_id))
+        pipe.execute()
+
+    # -------------
+    # --- Items ---
+    # -------------
+
+    @classmethod
+    def get_items(cls, cart_id) -> list[CartItem] | None:
+        """
+        Return the items of a cart as unsaved `CartItem` instances, so they can be
+        serialized like the stored ones. Return None if the cart does not exist.
+        """
+
+        items = cls._get_cart_items(cart_id)
+        if items is None:
+            return None
+        return cls._build_items(cart_id, items)
+
+    @classmethod
+    def get_item(cls, cart_id, item_id) -> CartItem | None:
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        items = cls._get_cart_items(cart_id) or {}
+        for variant_id, (stored_item_id, quantity) in items.items():
+            if stored_item_id == item_id:
+                built = cls._build_items(
+                    cart_id, {variant_id: (stored_item_id, quantity)}
+                )
+                return built[0] if built else None
+        return None
+
+    @classmethod
+    def add_item(cls, cart_id, variant, quantity: int) -> CartItem | None:
+        """Add a variant to a cart, return None if the variant is already in the cart."""
+
+        item_id = cls._reserve_item_id()
+        key = cls._cart_key(cart_id)
+        pipe = cls.get_client().pipeline()
+        pipe.hsetnx(key, variant.id, cls._item_value(item_id, quantity))
+        pipe.expire(key, settings.CART_REDIS_TTL)
+        pipe.sadd(cls._dirty_key(), str(cart_id))
+        added, *_ = pipe.execute()
+        if not added:
+            return None
+        return cls.get_item(cart_id, item_id)
+
+    @classmethod
+    def update_item(cls, cart_item: CartItem, quantity: int) -> CartItem:
+        value = cls._item_value(cart_item.id, quantity)
+        cls._write(
+            cart_item.cart_id,
+            lambda pipe, key: pipe.hset(key, cart_item.variant_id, value),
+        )
+        cart_item.quantity = quantity
+        return cart_item
+
+    @classmethod
+    def remove_item(cls, cart_item: CartItem) -> None:
+        cls._write(
+            cart_item.cart_id, lambda pipe, key: pipe.hdel(key, cart_item.variant_id)
+        )
+
+    # -------------
+    # --- Flush ---
+    # -------------
+
+    @classmethod
+    def flush(cls, cart_ids=None, batch_size: int = 500) -> int:
+        """
+        Write dirty carts to the database and return the number of flushed carts.
+
+        With `cart_ids`, only those carts are flushed (e.g. at checkout), otherwise
+        every dirty cart is, in batches of `batch_size`.
+        """
+
+        client = cls.get_client()
+        flushed = 0
+        while True:
+            if cart_ids is None:
+                batch = client.spop(cls._dirty_key(), batch_size)
+            else:
+                batch = [str(cart_id) for cart_id in cart_ids]
+                if batch:
+                    client.srem(cls._dirty_key(), *batch)
+            if not batch:
+                return flushed
+
+            pipe = client.pipeline()
+            for cart_id in batch:
+                pipe.hgetall(cls._cart_key(cart_id))
+            items_by_cart = {
+                cart_id: cls._parse_items(cart)
+                for cart_id, cart in zip(batch, pipe.execute())
+                # expired carts are abandoned, they are not persisted
+                if cart
+            }
+
+            try:
+                CartRepository.save_carts(items_by_cart)
+            except Exception:
+                # keep the carts dirty, so the next flush retries them
+                client.sadd(cls._dirty_key(), *batch)
+                raise
+            flushed += len(items_by_cart)
+
+            if cart_ids is not None:
+                return flushed
+
+    # ---------------
+    # --- Helpers ---
+    # ---------------
+
+    @classmethod
+    def _write(cls, cart_id, command) -> None:
+        key = cls._cart_key(cart_id)
+        pipe = cls.get_client().pipeline()
+        command(pipe, key)
+        pipe.expire(key, settings.CART_REDIS_TTL)
+        pipe.sadd(cls._dirty_key(), str(cart_id))
+        pipe.execute()
+
+    @classmethod
+    def _reserve_item_id(cls) -> int:
+        item_id = CartRepository.reserve_item_id()
+        if item_id is not None:
+            return item_id
+        # Without sequences, count in Redis from the largest stored id. Rows the
+        # database numbers itself could collide, which only matters outside of
+        # PostgreSQL, e.g. in development.
+        client = cls.get_client()
+        if not client.exists(cls._item_ids_key()):
+            client.set(cls._item_ids_key(), CartRepository.get_max_item_id(), nx=True)
+        return client.incr(cls._item_ids_key())
+
+    @classmethod
+    def _get_cart_items(cls, cart_id) -> dict[int, tuple[int, int]] | None:
+        """
+        Return the `(item id, quantity)` of the items of a cart by variant id.
+
+        A cart that is not in Redis is loaded from the database (e.g. it was
+        created before the store was enabled, or it expired after being flushed).
+        """
+
+        try:
+            cart_id = uuid.UUID(str(cart_id))
+        except ValueError:
+            return None
+
+        key = cls._cart_key(cart_id)
+        client = cls.get_client()
+        cart = client.hgetall(key)
+        if cart:
+            return cls._parse_items(cart)
+
+        items = CartRepository.get_cart_items(cart_id)
+        if items is None:
+            return None
+        pipe = client.pipeline()
+        pipe.hset(
+            key,
+            mapping={
+                cls.CART_MARKER: 1,
+                **{
+                    variant_id: cls._item_value(item_id, quantity)
+                    for variant_id, (item_id, quantity) in items.items()
+                },
+            },
+        )
+        pipe.expire(key, settings.CART_REDIS_TTL)
+        pipe.execute()
+        return items
+
+    @staticmethod
+    def _item_value(item_id: int, quantity: int) -> str:
+        return f"{item_id}:{quantity}"
+
+    @classmethod
+    def _parse_items(cls, cart: dict) -> dict[int, tuple[int, int]]:
+        items = {}
+        for variant_id, value in cart.items():
+            if variant_id == cls.CART_MARKER:
+                continue
+            # carts written before items kept their id used the variant id
+            item_id, _, quantity = value.rpartition(":")
+            items[int(variant_id)] = (int(item_id or variant_id), int(quantity))
+        return items
+
+    @staticmethod
+    def _build_items(cart_id, items: dict[int, tuple[int, int]]) -> list[CartItem]:
+        variants = CartRepository.get_variant_queryset().in_bulk(list(items))
+        return [
+            CartItem(
+                id=items[variant_id][0],
+                cart_id=uuid.UUID(str(cart_id)),
+                variant=variants[variant_id],
+                quantity=items[variant_id][1],
+            )
+            for variant_id in sorted(items, key=lambda variant_id: items[variant_id][0])
+            # skip variants that were deleted since they were added to the cart
+            if variant_id in variants
+        ]
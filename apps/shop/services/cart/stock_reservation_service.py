@@ -0,0 +1,210 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.shop.models.cart import StockReservation
+from apps.shop.models.product import ProductVariant
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, variant_id):
+        self.variant_id = variant_id
+        super().__init__(f"Not enough available stock for variant {variant_id}.")
+
+
+class StockReservationService:
+    """
+    Holds stock for cart items until they are checked out or expire.
+
+    `ProductVariant.reserved` is the quantity held by all carts, it is only changed
+    with conditional `UPDATE`s (`... WHERE stock >= reserved + n`), so concurrent
+    buyers can never reserve more than `stock` and no row is locked longer than
+    a single statement. `ProductVariant.stock` is only changed at checkout.
+    """
+
+    @staticmethod
+    def get_expires_at():
+        return timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+    @classmethod
+    @transaction.atomic
+    def reserve(cls, cart_id, variant_id: int, quantity: int) -> StockReservation:
+        """
+        Set the quantity of a variant held by a cart, and renew its expiry.
+
+        Raise `InsufficientStockError` if the missing quantity is not available.
+        """
+
+        reservation = (
+            StockReservation.objects.select_for_update()
+            .filter(cart_id=cart_id, variant_id=variant_id)
+            .first()
+        )
+        delta = quantity - (reservation.quantity if reservation else 0)
+
+        if delta > 0 and not cls._take(variant_id, delta):
+            # expired reservations may still hold the stock, release them and retry
+            cls.release_expired(variant_ids=[variant_id])
+            if not cls._take(variant_id, delta):
+                raise InsufficientStockError(variant_id)
+        elif delta < 0:
+            cls._give_back({variant_id: -delta})
+
+        if reservation is None:
+            return StockReservation.objects.create(
+                cart_id=cart_id,
+                variant_id=variant_id,
+                quantity=quantity,
+                expires_at=cls.get_expires_at(),
+            )
+        reservation.quantity = quantity
+        reservation.expires_at = cls.get_expires_at()
+        reservation.save(update_fields=["quantity", "expires_at", "updated_at"])
+        return reservation
+
+    @classmethod
+    def get_available(cls, variant: ProductVariant, quantity: int, cart_id=None) -> int:
+        """
+        Return the stock of a variant that a cart can hold: the stock that is not held
+        by the other carts.
+
+        Like `reserve`, expired reservations are released when `quantity` is not
+        available otherwise, so validation and reservation agree.
+        """
+
+        def available() -> int:
+            held = 0
+            if cart_id is not None:
+                held = (
+                    StockReservation.objects.filter(
+                        cart_id=cart_id, variant_id=variant.id
+                    )
+                    .values_list("quantity", flat=True)
+                    .first()
+                ) or 0
+            return variant.stock - variant.reserved + held
+
+        result = available()
+        if quantity > result and cls.release_expired(variant_ids=[variant.id]):
+            variant.refresh_from_db(fields=["stock", "reserved"])
+            result = available()
+        return result
+
+    @classmethod
+    @transaction.atomic
+    def release(cls, cart_id, variant_ids=None) -> None:
+        """Release the stock held by a cart, for all of its variants or the given ones."""
+
+        reservations = StockReservation.objects.select_for_update().filter(
+            cart_id=cart_id
+        )
+        if variant_ids is not None:
+            reservations = reservations.filter(variant_id__in=variant_ids)
+        cls._delete_and_give_back(
+            reservations.values_list("id", "variant_id", "quantity")
+        )
+
+    @classmethod
+    @transaction.atomic
+    def consume(cls, cart_id, quantities: dict[int, int]) -> None:
+        """
+        Take `quantities` (by variant id) out of stock for a cart being checked out.
+
+        The stock held by the cart counts as available, and is released. Every
+        variant is updated in a single conditional `UPDATE`; if one of them has not
+        enough stock nothing is changed and `InsufficientStockError` is raised.
+        """
+
+        held = dict(
+            StockReservation.objects.select_for_update()
+            .filter(cart_id=cart_id)
+            .values_list("variant_id", "quantity")
+        )
+        quantity_case = cls._variant_case(quantities)
+        held_case = cls._variant_case(held)
+
+        updated = ProductVariant.objects.filter(
+            id__in=quantities, stock__gte=F("reserved") - held_case + quantity_case
+        ).update(
+            stock=F("stock") - quantity_case,
+            reserved=Greatest(F("reserved") - held_case, Value(0)),
+        )
+        if updated != len(quantities):
+            # find the variant that is out of stock, only on this (rare) path
+            for variant_id, stock, reserved in ProductVariant.objects.filter(
+                id__in=quantities
+            ).values_list("id", "stock", "reserved"):
+                if stock < reserved - held.get(variant_id, 0) + quantities[variant_id]:
+                    raise InsufficientStockError(variant_id)
+            raise InsufficientStockError(None)
+
+        StockReservation.objects.filter(cart_id=cart_id).delete()
+
+    @classmethod
+    @transaction.atomic
+    def release_expired(cls, variant_ids=None, batch_size: int = 1000) -> int:
+        """
+        Release up to `batch_size` expired reservations, return the number released.
+
+        Rows locked by another transaction are skipped, so concurrent sweepers and
+        buyers don't wait on each other.
+        """
+
+        reservations = StockReservation.objects.select_for_update(
+            skip_locked=True
+        ).filter(expires_at__lte=timezone.now())
+        if variant_ids is not None:
+            reservations = reservations.filter(variant_id__in=variant_ids)
+        return cls._delete_and_give_back(
+            reservations.values_list("id", "variant_id", "quantity")[:batch_size]
+        )
+
+    @staticmethod
+    def _take(variant_id: int, quantity: int) -> bool:
+        return bool(
+            ProductVariant.objects.filter(
+                id=variant_id, stock__gte=F("reserved") + quantity
+            ).update(reserved=F("reserved") + quantity)
+        )
+
+    @staticmethod
+    def _variant_case(quantities: dict[int, int]):
+        """A `CASE` expression that maps variant ids to quantities, 0 for other variants."""
+
+        return Case(
+            *[
+                When(id=variant_id, then=Value(quantity))
+                for variant_id, quantity in quantities.items()
+            ],
+            default=Value(0),
+        )
+
+    @classmethod
+    def _give_back(cls, quantities: dict[int, int]) -> None:
+        """Decrease the reserved quantity of many variants in a single `UPDATE`."""
+
+        if not quantities:
+            return
+        ProductVariant.objects.filter(id__in=quantities).update(
+            reserved=Greatest(F("reserved") - cls._variant_case(quantities), Value(0))
+        )
+
+    @classmethod
+    def _delete_and_give_back(cls, reservations) -> int:
+        reservations = list(reservations)
+        if not reservations:
+            return 0
+
+        quantities = Counter()
+        for _, variant_id, quantity in reservations:
+            quantities[variant_id] += quantity
+        StockReservation.objects.filter(
+            id__in=[reservation_id for reservation_id, _, _ in reservations]
+        ).delete()
+        cls._give_back(quantities)
+        return len(reservations)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from apps.core.services.cache_service import CacheService
+from apps.shop.models.category import Category
+
+
+class CategoryTreeCache:
+    """
+    Pre-serialized category tree.
+
+    The whole tree is stored as one JSON blob together with its version and ETag,
+    under one key that every rebuild overwrites, so old trees don't pile up. It is
+    rebuilt only after the version is bumped by a category or category image change,
+    every other request is answered straight from the cache.
+    """
+
+    NAMESPACE = "shop:categories"
+    KEY = "shop:categories:tree"
+
+    @classmethod
+    def get(cls) -> dict:
+        """Return the cached tree as a dict with `version`, `etag` and `body` keys."""
+
+        version = CacheService.get_version(cls.NAMESPACE)
+        tree = cache.get(cls.KEY)
+        if tree is None or tree["version"] != version:
+            tree = cls.build(version)
+            cache.set(cls.KEY, tree, timeout=None)
+        return tree
+
+    @staticmethod
+    def build(version: int) -> dict:
+        categories = Category.objects.only("id", "name", "parent")
+        body = json.dumps(
+            {
+                "version": version,
+                "categories_tree": Category.build_hierarchy(categories),
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return {
+            "version": version,
+            "etag": f'"{hashlib.md5(body).hexdigest()}"',
+            "body": body,
+        }
+
+    @classmethod
+    def invalidate(cls) -> None:
+        CacheService.bump_version(cls.NAMESPACE)
@@ -0,0 +1,176 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, Sum, Window
+
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.models.order import Order, OrderAddress, OrderItem
+from apps.shop.models.product import Product
+from apps.shop.services.cart.redis_cart_store import RedisCartStore
+from apps.shop.services.cart.stock_reservation_service import StockReservationService
+from apps.shop.services.order.order_number_allocator import OrderNumberAllocator
+from apps.shop.services.product.product_cache import ProductCache
+from apps.shop.services.product.product_repository import ProductRepository
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class CheckoutService:
+    """
+    Turns a cart into an order in a single transaction.
+
+    The number of queries doesn't depend on the number of lines: the lines and the
+    total are read in one query, the stock of every variant is taken in one
+    conditional `UPDATE` and the order items are written with one bulk insert.
+    """
+
+    LINE_FIELDS = [
+        "variant_id",
+        "quantity",
+        "variant__price",
+        "variant__sku",
+        "variant__product_id",
+        "variant__product__name",
+        "variant__product__status",
+        "variant__option1__item_name",
+        "variant__option2__item_name",
+        "variant__option3__item_name",
+    ]
+
+    @classmethod
+    def checkout(
+        cls,
+        cart_id,
+        customer,
+        shipping_address: dict,
+        billing_address: dict = None,
+        idempotency_key: str = None,
+        gateway: str = "",
+        note: str = "",
+    ) -> tuple[Order, bool]:
+        """
+        Place an order for a cart and return it, with whether it was created.
+
+        A request with the idempotency key of a previous order of the customer
+        returns that order instead of placing a new one.
+        """
+
+        if idempotency_key:
+            order = cls._get_order(customer, idempotency_key)
+            if order is not None:
+                return order, False
+
+        if RedisCartStore.is_enabled():
+            RedisCartStore.flush([cart_id])
+
+        try:
+            order = cls._place_order(
+                cart_id,
+                customer,
+                shipping_address,
+                billing_address or shipping_address,
+                idempotency_key,
+                gateway,
+                note,
+            )
+        except (IntegrityError, Cart.DoesNotExist):
+            # a concurrent request with the same idempotency key placed the order,
+            # and may have deleted the cart already
+            order = idempotency_key and cls._get_order(customer, idempotency_key)
+            if not order:
+                raise
+            return order, False
+
+        if RedisCartStore.is_enabled():
+            transaction.on_commit(lambda: RedisCartStore.discard_cart(cart_id))
+        return order, True
+
+    @classmethod
+    @transaction.atomic
+    def _place_order(
+        cls,
+        cart_id,
+        customer,
+        shipping_address: dict,
+        billing_address: dict,
+        idempotency_key,
+        gateway,
+        note,
+    ) -> Order:
+        lines = list(
+            CartItem.objects.filter(cart_id=cart_id)
+            .annotate(
+                cart_total=Window(
+                    Sum(
+                        F("quantity") * F("variant__price"),
+                        output_field=DecimalField(max_digits=12, decimal_places=2),
+                    )
+                )
+            )
+            .order_by("id")
+            .values(*cls.LINE_FIELDS, "cart_total")
+        )
+        if not lines:
+            if not Cart.objects.filter(pk=cart_id).exists():
+                raise Cart.DoesNotExist
+            raise CheckoutError("The cart is empty.")
+        if any(
+            line["variant__product__status"] != Product.STATUS_ACTIVE for line in lines
+        ):
+            raise CheckoutError("Inactive products cannot be checked out.")
+
+        StockReservationService.consume(
+            cart_id, {line["variant_id"]: line["quantity"] for line in lines}
+        )
+
+        shipping, billing = OrderAddress.objects.bulk_create(
+            [OrderAddress(**shipping_address), OrderAddress(**billing_address)]
+        )
+        # SQLite sums decimals as floats
+        total = lines[0]["cart_total"].quantize(Decimal("0.01"))
+        order = Order.objects.create(
+            customer=customer,
+            order_number=OrderNumberAllocator.next_number(),
+            idempotency_key=idempotency_key or None,
+            shipping_address=shipping,
+            billing_address=billing,
+            total_line_items_price=total,
+            total_price=total,
+            gateway=gateway,
+            note=note,
+        )
+        OrderItem.objects.bulk_create(
+            [cls._build_order_item(order, line) for line in lines]
+        )
+
+        Cart.objects.filter(pk=cart_id).delete()
+
+        product_ids = {line["variant__product_id"] for line in lines}
+        ProductRepository.refresh_variant_summary(*product_ids)
+        for product_id in product_ids:
+            ProductCache.invalidate_product(product_id)
+        return order
+
+    @staticmethod
+    def _build_order_item(order: Order, line: dict) -> OrderItem:
+        options = [
+            line[f"variant__option{number}__item_name"] for number in range(1, 4)
+        ]
+        return OrderItem(
+            order=order,
+            variant_id=line["variant_id"],
+            product_id=line["variant__product_id"],
+            name=line["variant__product__name"],
+            variant_title=" / ".join(option for option in options if option),
+            sku=line["variant__sku"],
+            quantity=line["quantity"],
+            price=line["variant__price"],
+        )
+
+    @staticmethod
+    def _get_order(customer, idempotency_key: str) -> Order | None:
+        return Order.objects.filter(
+            customer=customer, idempotency_key=idempotency_key
+        ).first()
@@ -0,0 +1,103 @@
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Max
+
+from apps.shop.models.order import Order
+
+
+class OrderNumberAllocator:
+    """
+    Hands out the human-facing order numbers.
+
+    On PostgreSQL the numbers come from a sequence. `nextval()` is not transactional
+    and takes no row lock, so concurrent checkouts never wait on each other and a
+    number is never given twice, even when a checkout is rolled back (which leaves a
+    gap). With `ORDER_NUMBER_BLOCK_SIZE` > 1 the sequence is incremented by the block
+    size and every process hands out the numbers of its block from memory; the block
+    size is fixed when the sequence is created.
+
+    The sequence is created by `install`, after migrations, so checkouts only call
+    `nextval()` and never run DDL.
+
+    Databases without sequences (SQLite in tests) serialize writers anyway, so the
+    next number is read from the orders table.
+    """
+
+    SEQUENCE_NAME = "shop_order_number_seq"
+
+    _lock = threading.Lock()
+    _block = iter(())
+    _block_pid = None
+
+    @classmethod
+    def next_number(cls) -> int:
+        if not cls.uses_sequence():
+            return cls._next_from_table()
+
+        with cls._lock:
+            # a forked worker must not reuse the block of its parent
+            if cls._block_pid == os.getpid():
+                number = next(cls._block, None)
+                if number is not None:
+                    return number
+
+        # reserved outside the lock, so threads don't wait on each other's queries;
+        # if two threads reserve at once the rest of one block is left unused
+        block = cls._reserve_block()
+        with cls._lock:
+            cls._block = iter(block[1:])
+            cls._block_pid = os.getpid()
+        return block[0]
+
+    @staticmethod
+    def uses_sequence() -> bool:
+        return connection.vendor == "postgresql"
+
+    @classmethod
+    def install(cls, using: str = "default") -> None:
+        """
+        Create the sequence, or move it past the numbers already in the orders table
+        (e.g. given by the fallback numbering), so it never hands out a taken number.
+        """
+
+        if connections[using].vendor != "postgresql":
+            return
+        last = Order.objects.using(using).aggregate(last=Max("order_number"))["last"]
+        start = max(settings.ORDER_NUMBER_START, (last or 0) + 1)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE SEQUENCE IF NOT EXISTS {cls.SEQUENCE_NAME} "
+                "START WITH %s INCREMENT BY %s",
+                [start, max(settings.ORDER_NUMBER_BLOCK_SIZE, 1)],
+            )
+            # only ever moves forward: the next value is `last_value + increment_by`,
+            # or `start_value` before the first `nextval()`
+            cursor.execute(
+                "SELECT setval(%s, %s, false) FROM pg_sequences "
+                "WHERE schemaname = current_schema() AND sequencename = %s "
+                "AND COALESCE(last_value + increment_by, start_value) < %s",
+                [cls.SEQUENCE_NAME, start, cls.SEQUENCE_NAME, start],
+            )
+
+    @classmethod
+    def _reserve_block(cls) -> range:
+        """Take the next block of numbers from the sequence."""
+
+        with connection.cursor() as cursor:
+            # the block size is the increment the sequence was created with, so
+            # blocks never overlap even if the setting changes later
+            cursor.execute(
+                "SELECT nextval(%s), increment_by FROM pg_sequences "
+                "WHERE schemaname = current_schema() AND sequencename = %s",
+                [cls.SEQUENCE_NAME, cls.SEQUENCE_NAME],
+            )
+            start, size = cursor.fetchone()
+            return range(start, start + size)
+
+    @staticmethod
+    def _next_from_table() -> int:
+        last = Order.objects.aggregate(last=Max("order_number"))["last"]
+        return settings.ORDER_NUMBER_START if last is None else last + 1
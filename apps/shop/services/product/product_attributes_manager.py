@@ -1,81 +1,141 @@
 # python
-from apps.shop.models.attribute import Attribute, AttributeItem
+from django.db.models import FilteredRelation, Q
+
+from apps.shop.models.attribute import Attribute
 from apps.shop.models.product import ProductAttribute
 from apps.shop.services.product.product_data import ProductData
 
 
 class ProductAttributeMixin:
-    @staticmethod
-    def manage_attributes(product_data: ProductData) -> None:
+    @classmethod
+    def manage_attributes(cls, product_data: ProductData) -> None:
         """
         Manage attributes for a product.
 
         This method handles the creation, update, and deletion of attributes for a product.
         It performs the following operations:
         1. If no attributes are provided, it removes all existing attributes associated with the product.
-        2. Otherwise, it clears the current attributes and creates new ones based on the provided data.
+        2. Otherwise, it diffs the current attributes and their items against the provided data and
+           only writes the changes, so the `ProductAttribute` rows of kept attributes stay the same.
         """
+        product = product_data.product
         # Remove all current attributes if no new attributes are provided
         if not product_data.attributes:
-            ProductAttribute.objects.filter(product=product_data.product).delete()
+            ProductAttribute.objects.filter(product=product).delete()
             return
 
-        # Delete existing product attributes to prevent duplicate entries
-        ProductAttribute.objects.filter(product=product_data.product).delete()
+        # {attribute_id: {item_id, ...}} of the provided data, invalid IDs are left out
+        wanted = cls._valid_attribute_items(product_data)
 
-        # Extract attribute IDs and item IDs from the provided data
-        attribute_ids = [
-            attr_data["attribute_id"] for attr_data in product_data.attributes
+        # {attribute_id: product_attribute_id} and {(product_attribute_id, item_id): through_id}
+        current = dict(
+            ProductAttribute.objects.filter(product=product).values_list(
+                "attribute_id", "id"
+            )
+        )
+        through = ProductAttribute.items.through
+        current_items = {
+            (product_attribute_id, item_id): through_id
+            for through_id, product_attribute_id, item_id in through.objects.filter(
+                productattribute_id__in=current.values()
+            ).values_list("id", "productattribute_id", "attributeitem_id")
+        }
+
+        # Remove the attributes that are no longer provided, their items go with them
+        attributes_to_delete = [
+            product_attribute_id
+            for attribute_id, product_attribute_id in current.items()
+            if attribute_id not in wanted
         ]
-        item_ids = {
-            item_id
-            for attr_data in product_data.attributes
-            for item_id in attr_data["items_id"]
+        if attributes_to_delete:
+            ProductAttribute.objects.filter(id__in=attributes_to_delete).delete()
+
+        created = ProductAttribute.objects.bulk_create(
+            [
+                ProductAttribute(product=product, attribute_id=attribute_id)
+                for attribute_id in wanted
+                if attribute_id not in current
+            ]
+        )
+        current.update(
+            (product_attribute.attribute_id, product_attribute.id)
+            for product_attribute in created
+        )
+
+        # Link the new items and unlink the removed ones of the kept attributes
+        wanted_items = {
+            (current[attribute_id], item_id)
+            for attribute_id, item_ids in wanted.items()
+            for item_id in item_ids
         }
+        kept_attributes = set(current.values()).difference(attributes_to_delete)
+        items_to_unlink = [
+            through_id
+            for key, through_id in current_items.items()
+            if key[0] in kept_attributes and key not in wanted_items
+        ]
+        if items_to_unlink:
+            through.objects.filter(id__in=items_to_unlink).delete()
+
+        items_to_link = [
+            through(productattribute_id=product_attribute_id, attributeitem_id=item_id)
+            for product_attribute_id, item_id in sorted(wanted_items)
+            if (product_attribute_id, item_id) not in current_items
+        ]
+        if items_to_link:
+            through.objects.bulk_create(items_to_link)
 
-        # Fetch all attributes and items in bulk to minimize queries
-        attributes = Attribute.objects.filter(id__in=attribute_ids).prefetch_related(
-            "items"
+    @staticmethod
+    def load_attribute_items(attributes: list[dict]) -> dict[int, set]:
+        """
+        Map the provided attribute IDs that exist to their provided item IDs that belong
+        to them, with one query.
+        """
+        item_ids = {
+            item_id for attr_data in attributes for item_id in attr_data["items_id"]
+        }
+        queryset = Attribute.objects.filter(
+            id__in={attr_data["attribute_id"] for attr_data in attributes}
         )
-        items = AttributeItem.objects.filter(id__in=item_ids)
+        if not item_ids:
+            # an empty `__in` would make Django skip the whole query
+            return {
+                attribute_id: set()
+                for attribute_id in queryset.values_list("id", flat=True)
+            }
 
-        # Prepare ProductAttribute instances
-        product_attributes = []
-        for attr_data in product_data.attributes:
-            attribute_id = attr_data["attribute_id"]
-            attribute = next(
-                (attr for attr in attributes if attr.id == attribute_id), None
+        rows = queryset.annotate(
+            requested_items=FilteredRelation(
+                "items", condition=Q(items__id__in=item_ids)
             )
-            if attribute:
-                product_attribute = ProductAttribute(
-                    product=product_data.product, attribute=attribute
-                )
-                product_attributes.append(product_attribute)
+        ).values_list("id", "requested_items__id")
 
-        # Bulk create ProductAttributes and retrieve the created instances
-        created_product_attributes = ProductAttribute.objects.bulk_create(
-            product_attributes
-        )
+        attribute_items = {}
+        for attribute_id, item_id in rows:
+            items = attribute_items.setdefault(attribute_id, set())
+            if item_id is not None:
+                items.add(item_id)
+        return attribute_items
+
+    @classmethod
+    def _valid_attribute_items(cls, product_data: ProductData) -> dict[int, set]:
+        """
+        Map the provided attribute IDs to their provided item IDs, keeping the order of
+        the attributes and leaving out the attributes and items that don't exist. The
+        IDs loaded by the serializer are reused when there are any.
+        """
+        attribute_items = product_data.attribute_items
+        if attribute_items is None:
+            attribute_items = cls.load_attribute_items(product_data.attributes)
 
-        # Prepare many-to-many relationships for valid items
-        m2m_entries = []
-        for attr_data, product_attribute in zip(
-            product_data.attributes, created_product_attributes
-        ):
+        valid = {}
+        for attr_data in product_data.attributes:
             attribute_id = attr_data["attribute_id"]
-            attribute = next(
-                (attr for attr in attributes if attr.id == attribute_id), None
+            if attribute_id not in attribute_items:
+                continue
+            valid.setdefault(attribute_id, set()).update(
+                item_id
+                for item_id in attr_data["items_id"]
+                if item_id in attribute_items[attribute_id]
             )
-            if attribute:
-                valid_items = items.filter(attribute=attribute)
-                m2m_entries.extend(
-                    ProductAttribute.items.through(
-                        productattribute_id=product_attribute.id,
-                        attributeitem_id=item.id,
-                    )
-                    for item in valid_items
-                )
-
-        # Bulk create many-to-many relationships if any entries exist
-        if m2m_entries:
-            ProductAttribute.items.through.objects.bulk_create(m2m_entries)
+        return valid
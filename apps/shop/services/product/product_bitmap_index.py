@@ -0,0 +1,244 @@
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache, reduce
+from operator import or_
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.shop.models.product import Product, ProductAttribute, ProductOptionItem
+
+
+@lru_cache
+def bitmap_class():
+    """
+    `pyroaring.BitMap` when it is installed (the `bitmap-index` extra), compressed and
+    with fast set operations, else the built-in `set`, which has the same interface
+    but ~10x the footprint.
+    """
+    try:
+        from pyroaring import BitMap
+    except ImportError:
+        return set
+    return BitMap
+
+
+class ProductBitmapIndex:
+    """
+    In-process inverted index of the attribute and option filters of the product list.
+
+    Every attribute item, and every option item name (option items are rows of one
+    product, so "color: red" is one entry for all the products that have it), maps to
+    the bitmap of the ids of the products that have it. Filtering by several items is
+    then a few bitmap unions and intersections in memory, and the database only gets
+    the matching ids.
+
+    Enabled with `PRODUCT_BITMAP_INDEX = True`. Every process builds its index on first
+    use. Writes made through `ProductService` are applied after they commit, and the
+    writes of the other processes are picked up through `Product.updated_at`, at most
+    `REFRESH_INTERVAL` seconds late. Deleted products may stay in the index, which is
+    harmless: the ids are only used to narrow down a query on the products table.
+    """
+
+    REFRESH_INTERVAL = 5  # in seconds
+    # rows committed after a refresh may carry an older `updated_at`
+    REFRESH_OVERLAP = timedelta(seconds=60)
+    # larger results are filtered with a join, a long `IN` list would be slower
+    MAX_MATCHED_IDS = 10000
+
+    _lock = threading.RLock()
+    _attribute_items = None  # {attribute item id: bitmap}
+    _option_items = None  # {(option name, item name): bitmap}
+    # {product id: (attribute item ids, option keys)}, so a write only touches the
+    # bitmaps of the keys the product had
+    _product_keys = None
+    _refreshed_at = None
+    _next_refresh = 0.0
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.PRODUCT_BITMAP_INDEX
+
+    # ---------------
+    # --- Queries ---
+    # ---------------
+
+    @classmethod
+    def match_attribute_items(cls, item_groups: Iterable[Iterable[int]]):
+        """
+        Return the ids of the products that have an item of every group, or None when
+        the index is disabled or the result is too large to be worth it.
+        """
+        if not cls.is_enabled():
+            return None
+        cls._ensure_fresh()
+        with cls._lock:
+            return cls._match(cls._attribute_items, item_groups)
+
+    @classmethod
+    def match_option_items(cls, item_groups: Iterable[Iterable[tuple[str, str]]]):
+        """Like `match_attribute_items`, for (option name, item name) pairs."""
+        if not cls.is_enabled():
+            return None
+        cls._ensure_fresh()
+        with cls._lock:
+            return cls._match(cls._option_items, item_groups)
+
+    @classmethod
+    def _match(cls, index: dict, item_groups):
+        matched = cls.intersect(index, item_groups)
+        if len(matched) > cls.MAX_MATCHED_IDS:
+            return None
+        return sorted(matched)
+
+    @staticmethod
+    def intersect(index: dict, item_groups):
+        """
+        The union of the bitmaps of every group, intersected. The result can be a
+        bitmap of the index, it must not be modified.
+        """
+        bitmap = bitmap_class()
+        groups = [
+            [index.get(key, bitmap()) for key in group] or [bitmap()]
+            for group in item_groups
+        ]
+        # Start from the smallest group, the other groups are only probed: the
+        # result never grows, and large groups are not copied into a union
+        groups.sort(key=lambda bitmaps: sum(map(len, bitmaps)))
+        matched = reduce(or_, groups[0])
+        for bitmaps in groups[1:]:
+            if len(bitmaps) == 1:
+                matched = matched & bitmaps[0]
+            else:
+                matched = bitmap(
+                    product_id
+                    for product_id in matched
+                    if any(product_id in other for other in bitmaps)
+                )
+        return matched
+
+    # ----------------
+    # --- Building ---
+    # ----------------
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """Build the index of the whole catalog."""
+        refreshed_at = timezone.now()
+        attribute_items, option_items, product_keys = cls.build(
+            ProductAttribute.items.through.objects.values_list(
+                "attributeitem_id", "productattribute__product_id"
+            ).iterator(chunk_size=10000),
+            (
+                ((option_name, item_name), product_id)
+                for option_name, item_name, product_id in (
+                    ProductOptionItem.objects.values_list(
+                        "option__option_name", "item_name", "option__product_id"
+                    ).iterator(chunk_size=10000)
+                )
+            ),
+        )
+        with cls._lock:
+            cls._attribute_items = attribute_items
+            cls._option_items = option_items
+            cls._product_keys = product_keys
+            cls._refreshed_at = refreshed_at
+            cls._next_refresh = time.monotonic() + cls.REFRESH_INTERVAL
+
+    @staticmethod
+    def build(attribute_rows, option_rows) -> tuple[dict, dict, dict]:
+        """
+        Build the bitmaps from (key, product id) pairs, and the keys of every product.
+        """
+        ids = ({}, {})
+        product_keys = {}
+        for position, (index, rows) in enumerate(
+            zip(ids, (attribute_rows, option_rows))
+        ):
+            for key, product_id in rows:
+                index.setdefault(key, []).append(product_id)
+                product_keys.setdefault(product_id, ([], []))[position].append(key)
+        bitmap = bitmap_class()
+        return (
+            *(
+                {key: bitmap(product_ids) for key, product_ids in index.items()}
+                for index in ids
+            ),
+            product_keys,
+        )
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the index, it is built again on next use."""
+        with cls._lock:
+            cls._attribute_items = cls._option_items = cls._product_keys = None
+            cls._refreshed_at = None
+
+    @classmethod
+    def _ensure_fresh(cls) -> None:
+        if cls._attribute_items is not None and time.monotonic() < cls._next_refresh:
+            return
+
+        with cls._lock:
+            if cls._attribute_items is None:
+                cls.rebuild()
+                return
+            if time.monotonic() < cls._next_refresh:
+                return
+            since = cls._refreshed_at - cls.REFRESH_OVERLAP
+            cls._refreshed_at = timezone.now()
+            cls._next_refresh = time.monotonic() + cls.REFRESH_INTERVAL
+        product_ids = Product.objects.filter(updated_at__gt=since).values_list(
+            "id", flat=True
+        )
+        cls._reindex(list(product_ids))
+
+    # --------------
+    # --- Writes ---
+    # --------------
+
+    @classmethod
+    def reindex_products(cls, *product_ids: int) -> None:
+        """Index the attributes and options of products once the transaction commits."""
+        if cls.is_enabled() and cls._attribute_items is not None:
+            transaction.on_commit(lambda: cls._reindex(product_ids))
+
+    @classmethod
+    def _reindex(cls, product_ids) -> None:
+        if not product_ids:
+            return
+        attribute_items, option_items, product_keys = cls.build(
+            ProductAttribute.items.through.objects.filter(
+                productattribute__product_id__in=product_ids
+            ).values_list("attributeitem_id", "productattribute__product_id"),
+            (
+                ((option_name, item_name), product_id)
+                for option_name, item_name, product_id in (
+                    ProductOptionItem.objects.filter(
+                        option__product_id__in=product_ids
+                    ).values_list(
+                        "option__option_name", "item_name", "option__product_id"
+                    )
+                )
+            ),
+        )
+
+        with cls._lock:
+            if cls._attribute_items is None:
+                return
+            indexes = (cls._attribute_items, cls._option_items)
+            for product_id in product_ids:
+                previous = cls._product_keys.pop(product_id, ((), ()))
+                for index, keys in zip(indexes, previous):
+                    for key in keys:
+                        bitmap = index[key]
+                        bitmap.discard(product_id)
+                        if not bitmap:
+                            del index[key]
+            for index, changes in zip(indexes, (attribute_items, option_items)):
+                for key, bitmap in changes.items():
+                    index.setdefault(key, bitmap_class()()).update(bitmap)
+            cls._product_keys.update(product_keys)
@@ -0,0 +1,741 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice, product as options_combination
+from typing import Iterable, Iterator
+
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.core.services.slug_service import SlugService
+from apps.shop.models.attribute import AttributeItem
+from apps.shop.models.category import Category
+from apps.shop.models.product import (
+    Product,
+    ProductAttribute,
+    ProductOption,
+    ProductOptionItem,
+    ProductVariant,
+)
+from apps.shop.services.product.product_bitmap_index import ProductBitmapIndex
+from apps.shop.services.product.product_cache import ProductCache
+from apps.shop.services.product.product_search import ProductSearch
+
+
+class ProductImportError(ValueError):
+    pass
+
+
+@dataclass
+class ProductImportResult:
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)  # (line, message) pairs
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "errors": [
+                {"line": line, "message": message} for line, message in self.errors
+            ],
+        }
+
+
+class ProductBulkMixin:
+    """
+    Streaming import and export of product catalogs as CSV or JSON Lines.
+
+    A record is one product:
+
+        {"name": "...", "slug": "...", "description": "...", "status": "active",
+         "category": "<category slug>", "price": "9.99", "stock": 10, "sku": "...",
+         "options": [{"option_name": "color", "items": ["red", "blue"]}],
+         "attributes": [{"attribute": "material", "items": ["cotton"]}],
+         "variants": [{"options": ["red"], "price": "8.99", "stock": 3, "sku": "..."}]}
+
+    `price`, `stock` and `sku` apply to every variant, `variants` overrides them for
+    the listed option combinations. In CSV files `options`, `attributes` and
+    `variants` are JSON-encoded cells.
+
+    Records are imported in chunks, every chunk in its own transaction: categories,
+    attributes and existing slugs are resolved with one query each, then products,
+    options, option items, variants and attribute links are written with one bulk
+    insert each. Records whose slug already exists are skipped, or updated one by one
+    through `update_product` with `update_existing`.
+    """
+
+    FILE_FORMATS = ("csv", "jsonl")
+    EXPORT_FIELDS = [
+        "name",
+        "slug",
+        "description",
+        "status",
+        "category",
+        "price",
+        "stock",
+        "sku",
+        "options",
+        "attributes",
+        "variants",
+    ]
+    JSON_FIELDS = ("options", "attributes", "variants")
+    MAX_PRICE = Decimal("9999999999.99")
+    MAX_STOCK = 32767
+
+    # --------------
+    # --- Import ---
+    # --------------
+
+    @classmethod
+    def import_products(
+        cls,
+        stream: Iterable[str],
+        file_format: str,
+        chunk_size: int = 1000,
+        update_existing: bool = False,
+    ) -> ProductImportResult:
+        """Import the products of a text stream and return the counts and errors."""
+
+        result = ProductImportResult()
+        records = cls._read_records(stream, file_format)
+        while chunk := list(islice(records, chunk_size)):
+            cls._import_chunk(chunk, update_existing, result)
+        return result
+
+    @classmethod
+    def _read_records(cls, stream, file_format: str) -> Iterator[tuple[int, dict]]:
+        """
+        Yield (line number, record) pairs, or (line number, error) for bad lines.
+
+        A file that can't be decoded or parsed raises `ProductImportError`, the chunks
+        before the bad line are kept.
+        """
+
+        line = 0
+        try:
+            for line, record in cls._parse_records(stream, file_format):
+                yield line, record
+        except UnicodeDecodeError:
+            raise ProductImportError(f"Line {line + 1}: the file is not UTF-8 encoded.")
+        except csv.Error as e:
+            raise ProductImportError(f"Line {line + 1}: {e}.")
+
+    @classmethod
+    def _parse_records(cls, stream, file_format: str) -> Iterator[tuple[int, dict]]:
+        if file_format == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                record = {}
+                try:
+                    for key, value in row.items():
+                        if key in cls.JSON_FIELDS:
+                            value = json.loads(value) if value else None
+                        record[key] = value
+                except json.JSONDecodeError as e:
+                    record = ProductImportError(f"Invalid JSON: {e}")
+                yield reader.line_num, record
+        elif file_format == "jsonl":
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = ProductImportError(f"Invalid JSON: {e}")
+                yield line_number, record
+        else:
+            raise ValueError(f"Unsupported file format: {file_format}")
+
+    @classmethod
+    @transaction.atomic
+    def _import_chunk(
+        cls, chunk: list[tuple[int, dict]], update_existing: bool, result
+    ) -> None:
+        # values of the wrong type are left out here, and reported by `_clean_record`
+        categories = cls._resolve_categories(
+            {
+                record["category"]
+                for _, record in chunk
+                if isinstance(record, dict) and isinstance(record.get("category"), str)
+            }
+        )
+        attribute_items = cls._resolve_attribute_items(
+            {
+                attribute["attribute"]
+                for _, record in chunk
+                if isinstance(record, dict)
+                for attribute in (
+                    record.get("attributes")
+                    if isinstance(record.get("attributes"), list)
+                    else []
+                )
+                if isinstance(attribute, dict)
+                and isinstance(attribute.get("attribute"), str)
+            }
+        )
+
+        rows = []
+        for line, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                rows.append(
+                    (line, cls._clean_record(record, categories, attribute_items))
+                )
+            except ProductImportError as e:
+                result.errors.append((line, str(e)))
+                result.skipped += 1
+
+        existing = dict(
+            Product.objects.filter(
+                slug__in=[row["slug"] for _, row in rows if row["slug"]]
+            ).values_list("slug", "id")
+        )
+        new_rows, seen_slugs = [], set()
+        for line, row in rows:
+            slug = row["slug"]
+            if slug in existing:
+                if update_existing:
+                    cls._update_from_row(existing[slug], row)
+                    result.updated += 1
+                else:
+                    result.skipped += 1
+            elif slug and slug in seen_slugs:
+                result.errors.append((line, f'Duplicate slug "{slug}".'))
+                result.skipped += 1
+            else:
+                seen_slugs.add(slug)
+                new_rows.append(row)
+
+        if new_rows:
+            cls._bulk_create_rows(new_rows)
+            result.created += len(new_rows)
+            ProductCache.invalidate_catalog()
+
+    @staticmethod
+    def _resolve_categories(slugs: set) -> dict:
+        return dict(Category.objects.filter(slug__in=slugs).values_list("slug", "id"))
+
+    @staticmethod
+    def _resolve_attribute_items(attribute_names: set) -> dict:
+        """Map attribute names to their id and a {item name: item id} dict."""
+
+        attributes = {}
+        for (
+            attribute_id,
+            attribute_name,
+            item_id,
+            item_name,
+        ) in AttributeItem.objects.filter(
+            attribute__attribute_name__in=attribute_names
+        ).values_list(
+            "attribute_id", "attribute__attribute_name", "id", "item_name"
+        ):
+            attributes.setdefault(attribute_name, (attribute_id, {}))[1][
+                item_name
+            ] = item_id
+        return attributes
+
+    @classmethod
+    def _clean_record(cls, record, categories: dict, attribute_items: dict) -> dict:
+        """Validate a record and convert it to the values to write."""
+
+        if not isinstance(record, dict):
+            raise ProductImportError("A record must be an object.")
+
+        name = cls._clean_text(record.get("name"), "Name").strip()
+        if not name:
+            raise ProductImportError("Name is required.")
+        if len(name) > 255:
+            raise ProductImportError("Name is longer than 255 characters.")
+
+        status = cls._clean_text(record.get("status"), "Status") or Product.STATUS_DRAFT
+        if status not in dict(Product.STATUS_CHOICES):
+            raise ProductImportError(f'Unknown status "{status}".')
+
+        category_id = None
+        category = cls._clean_text(record.get("category"), "Category")
+        if category:
+            category_id = categories.get(category)
+            if category_id is None:
+                raise ProductImportError(f'Unknown category "{category}".')
+
+        options = cls._clean_options(record.get("options"))
+        price = cls._clean_price(record.get("price"))
+        stock = cls._clean_stock(record.get("stock"))
+        sku = cls._clean_sku(record.get("sku")) or ""
+
+        return {
+            "name": name,
+            "slug": slugify(
+                cls._clean_text(record.get("slug"), "Slug"), allow_unicode=True
+            ),
+            "description": cls._clean_text(record.get("description"), "Description")
+            or None,
+            "status": status,
+            "category_id": category_id,
+            "price": price,
+            "stock": stock,
+            "sku": sku,
+            "options": options,
+            "attributes": cls._clean_attributes(
+                record.get("attributes"), attribute_items
+            ),
+            "variants": cls._clean_variants(record.get("variants"), options),
+        }
+
+    @staticmethod
+    def _clean_text(value, label: str) -> str:
+        """A text value, empty when it is missing."""
+        if value is None:
+            return ""
+        if not isinstance(value, str):
+            raise ProductImportError(f"{label} must be a string.")
+        return value
+
+    @classmethod
+    def _clean_names(cls, values, label: str) -> list[str]:
+        """A list of item names."""
+        if values is None:
+            return []
+        if not isinstance(values, list):
+            raise ProductImportError(f"{label} must be a list.")
+        return [
+            cls._clean_text(value, f"Every item of {label.lower()}") for value in values
+        ]
+
+    @classmethod
+    def _clean_options(cls, options) -> list:
+        if not options:
+            return []
+        if not isinstance(options, list):
+            raise ProductImportError("Options must be a list.")
+
+        # merge options with the same name, like the product serializer does
+        merged = {}
+        for option in options:
+            if not isinstance(option, dict) or not option.get("option_name"):
+                raise ProductImportError("Every option needs an option_name.")
+            option_name = cls._clean_text(option["option_name"], "Option name")
+            if not isinstance(option.get("items"), list):
+                raise ProductImportError("Every option needs a list of items.")
+            items = cls._clean_names(option["items"], "Option items")
+            if items:
+                merged.setdefault(option_name, {}).update(dict.fromkeys(items))
+
+        if len(merged) > 3:
+            raise ProductImportError("A product can have a maximum of 3 options.")
+        return [
+            {"option_name": option_name, "items": list(items)}
+            for option_name, items in merged.items()
+        ]
+
+    @classmethod
+    def _clean_attributes(cls, attributes, attribute_items: dict) -> list:
+        """Return the attributes as `{"attribute_id", "items_id"}` dicts."""
+
+        if not attributes:
+            return []
+        if not isinstance(attributes, list):
+            raise ProductImportError("Attributes must be a list.")
+
+        cleaned = []
+        for attribute in attributes:
+            if not isinstance(attribute, dict):
+                raise ProductImportError("Every attribute must be an object.")
+            name = cls._clean_text(attribute.get("attribute"), "Attribute")
+            if name not in attribute_items:
+                raise ProductImportError(f'Unknown attribute "{name}".')
+            attribute_id, items = attribute_items[name]
+            item_ids = []
+            for item_name in cls._clean_names(
+                attribute.get("items"), "Attribute items"
+            ):
+                if item_name not in items:
+                    raise ProductImportError(
+                        f'Unknown item "{item_name}" for attribute "{name}".'
+                    )
+                item_ids.append(items[item_name])
+            cleaned.append({"attribute_id": attribute_id, "items_id": item_ids})
+        return cleaned
+
+    @classmethod
+    def _clean_variants(cls, variants, options: list) -> dict:
+        """Return the variant overrides keyed by their tuple of option item names."""
+
+        if not variants:
+            return {}
+        if not isinstance(variants, list):
+            raise ProductImportError("Variants must be a list.")
+
+        cleaned = {}
+        for variant in variants:
+            if not isinstance(variant, dict):
+                raise ProductImportError("Every variant must be an object.")
+            key = tuple(cls._clean_names(variant.get("options"), "Variant options"))
+            if len(key) != len(options) or any(
+                item not in option["items"] for item, option in zip(key, options)
+            ):
+                raise ProductImportError(
+                    f"Variant options {list(key)} don't match the product options."
+                )
+            override = {}
+            if variant.get("price") is not None:
+                override["price"] = cls._clean_price(variant["price"])
+            if variant.get("stock") is not None:
+                override["stock"] = cls._clean_stock(variant["stock"])
+            if "sku" in variant:
+                override["sku"] = cls._clean_sku(variant["sku"])
+            cleaned[key] = override
+        return cleaned
+
+    @classmethod
+    def _clean_sku(cls, value) -> str | None:
+        if value is None:
+            return None
+        sku = cls._clean_text(value, "SKU")
+        if len(sku) > 100:
+            raise ProductImportError("SKU is longer than 100 characters.")
+        return sku
+
+    @classmethod
+    def _clean_price(cls, value) -> Decimal:
+        if isinstance(value, bool) or not isinstance(
+            value, (str, int, float, type(None))
+        ):
+            raise ProductImportError(f'Invalid price "{value}".')
+        try:
+            price = Decimal(str(value)) if value not in (None, "") else Decimal(0)
+        except InvalidOperation:
+            raise ProductImportError(f'Invalid price "{value}".')
+        if not price.is_finite() or not 0 <= price <= cls.MAX_PRICE:
+            raise ProductImportError(f'Price "{value}" is out of range.')
+        return price.quantize(Decimal("0.01"))
+
+    @classmethod
+    def _clean_stock(cls, value) -> int:
+        if isinstance(value, bool) or not isinstance(
+            value, (str, int, float, type(None))
+        ):
+            raise ProductImportError(f'Invalid stock "{value}".')
+        try:
+            stock = int(value) if value not in (None, "") else 0
+        except (ValueError, OverflowError):
+            raise ProductImportError(f'Invalid stock "{value}".')
+        if not 0 <= stock <= cls.MAX_STOCK:
+            raise ProductImportError(f'Stock "{value}" is out of range.')
+        return stock
+
+    @classmethod
+    def _bulk_create_rows(cls, rows: list[dict]) -> None:
+        # the variants are built first, so the summary columns are written with the
+        # products instead of being recomputed afterwards
+        variants_by_row = [cls._variant_values(row) for row in rows]
+        products = cls._bulk_create_products(rows, variants_by_row)
+        # `bulk_create` skips `Product.save`, the vectors are written in one statement
+        product_ids = [product.id for product in products]
+        ProductSearch.backend().update_vectors(
+            Product.objects.filter(id__in=product_ids)
+        )
+        ProductBitmapIndex.reindex_products(*product_ids)
+
+        options = ProductOption.objects.bulk_create(
+            [
+                ProductOption(product=product, option_name=option["option_name"])
+                for product, row in zip(products, rows)
+                for option in row["options"]
+            ]
+        )
+        items = ProductOptionItem.objects.bulk_create(
+            [
+                ProductOptionItem(option=option, item_name=item_name)
+                for option, option_data in zip(
+                    options, (option for row in rows for option in row["options"])
+                )
+                for item_name in option_data["items"]
+            ]
+        )
+        item_ids = {(item.option_id, item.item_name): item.id for item in items}
+
+        option_ids = iter(option.id for option in options)
+        variants = []
+        for product, row, row_variants in zip(products, rows, variants_by_row):
+            product_option_ids = [next(option_ids) for _ in row["options"]]
+            for variant in row_variants:
+                ids = [
+                    item_ids[(option_id, item_name)]
+                    for option_id, item_name in zip(
+                        product_option_ids, variant["options"]
+                    )
+                ] + [None] * (3 - len(product_option_ids))
+                variants.append(
+                    ProductVariant(
+                        product=product,
+                        price=variant["price"],
+                        stock=variant["stock"],
+                        sku=variant["sku"],
+                        option1_id=ids[0],
+                        option2_id=ids[1],
+                        option3_id=ids[2],
+                    )
+                )
+        ProductVariant.objects.bulk_create(variants)
+
+        product_attributes = ProductAttribute.objects.bulk_create(
+            [
+                ProductAttribute(
+                    product=product, attribute_id=attribute["attribute_id"]
+                )
+                for product, row in zip(products, rows)
+                for attribute in row["attributes"]
+            ]
+        )
+        ProductAttribute.items.through.objects.bulk_create(
+            [
+                ProductAttribute.items.through(
+                    productattribute_id=product_attribute.id, attributeitem_id=item_id
+                )
+                for product_attribute, attribute in zip(
+                    product_attributes,
+                    (attribute for row in rows for attribute in row["attributes"]),
+                )
+                for item_id in set(attribute["items_id"])
+            ]
+        )
+
+    @staticmethod
+    def _variant_values(row: dict) -> list[dict]:
+        """The price, stock, sku and option item names of every variant of a row."""
+
+        return [
+            {
+                "options": combination,
+                "price": row["price"],
+                "stock": row["stock"],
+                "sku": row["sku"],
+                **row["variants"].get(combination, {}),
+            }
+            for combination in options_combination(
+                *[option["items"] for option in row["options"]]
+            )
+        ]
+
+    @classmethod
+    def _bulk_create_products(
+        cls, rows: list[dict], variants_by_row: list[list[dict]]
+    ) -> list[Product]:
+        """
+        Insert the products of a chunk. When another writer takes one of the allocated
+        slugs first, the insert is rolled back to a savepoint and retried with new ones.
+        """
+
+        pending = [row for row in rows if not row["slug"]]
+        for attempt in range(SlugService.MAX_ATTEMPTS):
+            cls._allocate_slugs(rows, pending)
+            now = timezone.now()
+            products = [
+                Product(
+                    name=row["name"],
+                    slug=row["slug"],
+                    description=row["description"],
+                    status=row["status"],
+                    published_at=(
+                        now if row["status"] == Product.STATUS_ACTIVE else None
+                    ),
+                    category_id=row["category_id"],
+                    min_price=min(variant["price"] for variant in variants),
+                    max_price=max(variant["price"] for variant in variants),
+                    total_stock=sum(variant["stock"] for variant in variants),
+                )
+                for row, variants in zip(rows, variants_by_row)
+            ]
+            if not pending:
+                return Product.objects.bulk_create(products)
+            try:
+                with transaction.atomic():
+                    return Product.objects.bulk_create(products)
+            except IntegrityError:
+                if attempt == SlugService.MAX_ATTEMPTS - 1:
+                    raise
+
+    @staticmethod
+    def _allocate_slugs(rows: list[dict], pending: list[dict]) -> None:
+        """Give the `pending` rows a slug derived from their name."""
+
+        if not pending:
+            return
+
+        pending_ids = {id(row) for row in pending}
+        reserved = {row["slug"] for row in rows if id(row) not in pending_ids}
+        slugs = SlugService.allocate_many(
+            Product, [row["name"] for row in pending], reserved=reserved
+        )
+        for row, slug in zip(pending, slugs):
+            row["slug"] = slug
+
+    @classmethod
+    def _update_from_row(cls, product_id: int, row: dict) -> None:
+        product = Product.objects.get(pk=product_id)
+        # the attributes and items were resolved by name while cleaning the record
+        attribute_items = {}
+        for attribute in row["attributes"]:
+            attribute_items.setdefault(attribute["attribute_id"], set()).update(
+                attribute["items_id"]
+            )
+        cls.update_product(
+            product,
+            name=row["name"],
+            description=row["description"],
+            status=row["status"],
+            category_id=row["category_id"],
+            price=row["price"],
+            stock=row["stock"],
+            sku=row["sku"],
+            options=row["options"] or None,
+            attributes=row["attributes"],
+            attribute_items=attribute_items,
+        )
+
+        # `update_product` wrote the price, stock and sku of the row to every variant,
+        # the variants listed in the record override them
+        if not row["variants"]:
+            return
+        variants = []
+        for variant in ProductVariant.objects.filter(
+            product_id=product_id
+        ).select_related("option1", "option2", "option3"):
+            key = tuple(
+                option.item_name
+                for option in (variant.option1, variant.option2, variant.option3)
+                if option is not None
+            )
+            if row["variants"].get(key):
+                for field, value in row["variants"][key].items():
+                    setattr(variant, field, value)
+                variants.append(variant)
+        if variants:
+            ProductVariant.objects.bulk_update(variants, ["price", "stock", "sku"])
+            cls.refresh_variant_summary(product_id)
+
+    # --------------
+    # --- Export ---
+    # --------------
+
+    @classmethod
+    def export_products(cls, file_format: str, chunk_size: int = 1000) -> Iterator[str]:
+        """Yield the whole catalog as CSV or JSON Lines text, chunk by chunk."""
+
+        if file_format not in cls.FILE_FORMATS:
+            raise ValueError(f"Unsupported file format: {file_format}")
+
+        if file_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=cls.EXPORT_FIELDS)
+            writer.writeheader()
+            yield buffer.getvalue()
+
+        for products in cls._iter_export_chunks(chunk_size):
+            records = [cls._export_record(product) for product in products]
+            if file_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=cls.EXPORT_FIELDS)
+                for record in records:
+                    writer.writerow(
+                        {
+                            key: (
+                                json.dumps(value, ensure_ascii=False)
+                                if key in cls.JSON_FIELDS
+                                else value
+                            )
+                            for key, value in record.items()
+                        }
+                    )
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(record, ensure_ascii=False) + "\n" for record in records
+                )
+
+    @staticmethod
+    def _iter_export_chunks(chunk_size: int) -> Iterator[list[Product]]:
+        """Yield the products in id order, a keyset-paginated chunk at a time."""
+
+        queryset = (
+            Product.objects.select_related("category")
+            .prefetch_related(
+                Prefetch(
+                    "options",
+                    queryset=ProductOption.objects.prefetch_related(
+                        Prefetch(
+                            "items", queryset=ProductOptionItem.objects.order_by("id")
+                        )
+                    ).order_by("id"),
+                ),
+                Prefetch(
+                    "variants",
+                    queryset=ProductVariant.objects.select_related(
+                        "option1", "option2", "option3"
+                    ).order_by("id"),
+                ),
+                Prefetch(
+                    "productattribute_set",
+                    queryset=ProductAttribute.objects.select_related(
+                        "attribute"
+                    ).prefetch_related("items"),
+                ),
+            )
+            .order_by("id")
+        )
+        last_id = 0
+        while products := list(queryset.filter(id__gt=last_id)[:chunk_size]):
+            yield products
+            last_id = products[-1].id
+
+    @staticmethod
+    def _export_record(product: Product) -> dict:
+        variants = [
+            {
+                "options": [
+                    option.item_name
+                    for option in (variant.option1, variant.option2, variant.option3)
+                    if option is not None
+                ],
+                "price": str(variant.price),
+                "stock": variant.stock,
+                "sku": variant.sku,
+            }
+            for variant in product.variants.all()
+        ]
+        default = variants[0] if variants else {"price": "0.00", "stock": 0, "sku": ""}
+        return {
+            "name": product.name,
+            "slug": product.slug,
+            "description": product.description or "",
+            "status": product.status,
+            "category": product.category.slug if product.category else "",
+            "price": default["price"],
+            "stock": default["stock"],
+            "sku": default["sku"] or "",
+            "options": [
+                {
+                    "option_name": option.option_name,
+                    "items": [item.item_name for item in option.items.all()],
+                }
+                for option in product.options.all()
+            ],
+            "attributes": [
+                {
+                    "attribute": product_attribute.attribute.attribute_name,
+                    "items": [item.item_name for item in product_attribute.items.all()],
+                }
+                for product_attribute in product.productattribute_set.all()
+            ],
+            "variants": variants,
+        }
@@ -0,0 +1,76 @@
+from typing import Any, Callable
+
+from django.core.cache import cache
+
+from apps.core.services.cache_service import CacheService
+
+
+class ProductCache:
+    """
+    Read-through cache for product list and detail responses.
+
+    List entries are keyed on the catalog version, so any product write invalidates
+    them. Detail entries are keyed on the version of that single product, so writes to
+    one product don't evict the others. Both include the attributes version, because
+    attribute and attribute-item names are rendered inside the product payload.
+    """
+
+    CATALOG_NAMESPACE = "shop:products"
+    ATTRIBUTES_NAMESPACE = "shop:attributes"
+
+    @staticmethod
+    def product_namespace(product_id: int) -> str:
+        return f"shop:product:{product_id}"
+
+    @classmethod
+    def list_key(cls, request) -> str:
+        return CacheService.build_key(
+            "shop:products:list",
+            CacheService.get_version(cls.CATALOG_NAMESPACE),
+            CacheService.get_version(cls.ATTRIBUTES_NAMESPACE),
+            *cls._request_parts(request),
+        )
+
+    @classmethod
+    def detail_key(cls, request, product_id) -> str:
+        return CacheService.build_key(
+            f"shop:products:detail:{product_id}",
+            CacheService.get_version(cls.product_namespace(product_id)),
+            CacheService.get_version(cls.ATTRIBUTES_NAMESPACE),
+            *cls._request_parts(request),
+        )
+
+    @staticmethod
+    def get_or_set(key: str, build_data: Callable[[], Any]) -> Any:
+        """Return the cached data for `key`, building and storing it on a miss."""
+
+        data = cache.get(key)
+        if data is None:
+            data = build_data()
+            cache.set(key, data)
+        return data
+
+    @classmethod
+    def invalidate_product(cls, product_id: int) -> None:
+        """Invalidate a single product and every list that may contain it."""
+
+        CacheService.bump_version(
+            cls.CATALOG_NAMESPACE, cls.product_namespace(product_id)
+        )
+
+    @classmethod
+    def invalidate_catalog(cls) -> None:
+        """Invalidate every list, e.g. after products were added in bulk."""
+
+        CacheService.bump_version(cls.CATALOG_NAMESPACE)
+
+    @classmethod
+    def invalidate_attributes(cls) -> None:
+        CacheService.bump_version(cls.ATTRIBUTES_NAMESPACE)
+
+    @staticmethod
+    def _request_parts(request) -> list:
+        # Draft products are only visible to staff, and image URLs contain the host.
+        visibility = "staff" if request.user.is_staff else "public"
+        query = sorted(request.query_params.lists())
+        return [visibility, request.get_host(), query]
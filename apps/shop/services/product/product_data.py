@@ -6,8 +6,11 @@ from apps.shop.models.product import Product
 @dataclass
 class ProductData:
     product: Product = None
-    price: float = 0.00
-    stock: int = 0
-    sku: str = ""
+    # None when not provided: new variants get 0, 0 and "", existing ones keep theirs
+    price: float = None
+    stock: int = None
+    sku: str = None
     options: list = None
     attributes: list = None
+    # {attribute_id: {item_id, ...}} of the `attributes` already loaded by the caller
+    attribute_items: dict = None
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.db.models import Count, Q
+
+from apps.shop.models.product import Product, ProductAttribute, ProductOptionItem
+
+
+class ProductFacetMixin:
+    """
+    Facet counts of a filtered product list, for the storefront filters.
+
+    Every facet is one aggregate query over the ids of the filtered products (a
+    subquery, the products are not loaded), so the cost is bounded by the number of
+    requested facets and doesn't depend on the number of attribute or option items.
+    """
+
+    FACETS = ("attributes", "options", "category", "price")
+
+    @classmethod
+    def get_facets(cls, queryset, facets=None) -> dict:
+        """
+        Return the counts of `facets` (all of `FACETS` when None) for the products of
+        `queryset`. Unknown facet names are ignored.
+        """
+        product_ids = queryset.order_by().values("id")
+        return {
+            name: getattr(cls, f"_{name}_facet")(product_ids)
+            for name in cls.FACETS
+            if facets is None or name in facets
+        }
+
+    @staticmethod
+    def _attributes_facet(product_ids) -> list[dict]:
+        # a product has one row per attribute and one through row per item
+        rows = (
+            ProductAttribute.items.through.objects.filter(
+                productattribute__product_id__in=product_ids
+            )
+            .values(
+                "attributeitem__attribute_id",
+                "attributeitem__attribute__attribute_name",
+                "attributeitem_id",
+                "attributeitem__item_name",
+            )
+            .annotate(count=Count("id"))
+            .order_by("attributeitem__attribute__attribute_name", "attributeitem_id")
+        )
+
+        attributes = {}
+        for row in rows:
+            attribute_id = row["attributeitem__attribute_id"]
+            if attribute_id not in attributes:
+                attributes[attribute_id] = {
+                    "attribute_id": attribute_id,
+                    "attribute_name": row["attributeitem__attribute__attribute_name"],
+                    "items": [],
+                }
+            attributes[attribute_id]["items"].append(
+                {
+                    "item_id": row["attributeitem_id"],
+                    "item_name": row["attributeitem__item_name"],
+                    "count": row["count"],
+                }
+            )
+        return list(attributes.values())
+
+    @staticmethod
+    def _options_facet(product_ids) -> list[dict]:
+        # option items belong to one product, so they are grouped by name
+        rows = (
+            ProductOptionItem.objects.filter(option__product_id__in=product_ids)
+            .values("option__option_name", "item_name")
+            .annotate(count=Count("id"))
+            .order_by("option__option_name", "item_name")
+        )
+
+        options = {}
+        for row in rows:
+            option_name = row["option__option_name"]
+            options.setdefault(option_name, {"option_name": option_name, "items": []})[
+                "items"
+            ].append({"item_name": row["item_name"], "count": row["count"]})
+        return list(options.values())
+
+    @staticmethod
+    def _category_facet(product_ids) -> list[dict]:
+        rows = (
+            Product.objects.filter(id__in=product_ids, category__isnull=False)
+            .values("category_id", "category__name")
+            .annotate(count=Count("id"))
+            .order_by("category__name")
+        )
+        return [
+            {
+                "category_id": row["category_id"],
+                "category_name": row["category__name"],
+                "count": row["count"],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _price_facet(product_ids) -> list[dict]:
+        # a product falls in the bucket of its lowest variant price
+        bounds = sorted(settings.PRODUCT_PRICE_FACET_BOUNDS)
+        buckets = list(zip([0, *bounds], [*bounds, None]))
+        counts = Product.objects.filter(id__in=product_ids).aggregate(
+            **{
+                f"bucket_{index}": Count(
+                    "id",
+                    filter=Q(min_price__gte=low)
+                    & (Q(min_price__lt=high) if high is not None else Q()),
+                )
+                for index, (low, high) in enumerate(buckets)
+            }
+        )
+        return [
+            {"min_price": low, "max_price": high, "count": counts[f"bucket_{index}"]}
+            for index, (low, high) in enumerate(buckets)
+        ]
@@ -1,59 +1,85 @@
+from django.core.exceptions import ValidationError
+
 from apps.shop.models.product import ProductOption, ProductOptionItem
 from apps.shop.services.product.product_data import ProductData
 
 
 class ProductOptionMixin:
-    @staticmethod
-    def manage_options(product_data: ProductData) -> None:
-        """Implement the logic for handling options."""
-        if product_data.options:
-            items_to_create = []
-            options_to_retain = set()
-
-            for data in product_data.options:
-                option_name = data["option_name"]
-                option_items = data["items"]
-
-                # Create or get a ProductOption instance for each option_name
-                option_object, created = ProductOption.objects.get_or_create(
-                    product=product_data.product, option_name=option_name
-                )
-
-                options_to_retain.add(option_object.id)  # Retain this option
-
-                if created:
-                    # If the option is newly created, add all items
-                    for item in option_items:
-                        new_item = ProductOptionItem(
-                            option=option_object, item_name=item
-                        )
-                        items_to_create.append(new_item)
-                else:
-                    # For existing options, update items
-                    current_items = set(
-                        option_object.items.values_list("item_name", flat=True)
-                    )
-                    new_items_set = set(option_items)
-                    items_to_add = new_items_set - current_items
-                    items_to_remove = current_items - new_items_set
-
-                    # Add new items
-                    for item in items_to_add:
-                        new_item = ProductOptionItem(
-                            option=option_object, item_name=item
-                        )
-                        items_to_create.append(new_item)
-
-                    # Remove items that are no longer present
-                    option_object.items.filter(item_name__in=items_to_remove).delete()
-
-            # Bulk create the new product option-items
-            ProductOptionItem.objects.bulk_create(items_to_create)
+    MAX_OPTIONS = 3
+
+    @classmethod
+    def manage_options(cls, product_data: ProductData) -> None:
+        """
+        Reconcile the options and option-items of a product with `product_data.options`.
+
+        The current options and items are loaded with one query and diffed in memory,
+        then the changes are applied with at most one delete and one bulk insert for
+        the options and the same for the items, however many options there are.
+        """
+
+        product = product_data.product
+        if not product_data.options:
+            ProductOption.objects.filter(product=product).delete()
+            return
+
+        # Load the current options with their items: {option_name: (option_id, {item_name: item_id})}
+        current = {}
+        rows = ProductOption.objects.filter(product=product).values_list(
+            "id", "option_name", "items__id", "items__item_name"
+        )
+        for option_id, option_name, item_id, item_name in rows:
+            _, items = current.setdefault(option_name, (option_id, {}))
+            if item_id is not None:
+                items[item_name] = item_id
 
-            # Remove options that are not in the current options_data
-            ProductOption.objects.filter(product=product_data.product).exclude(
-                id__in=options_to_retain
-            ).delete()
+        wanted = {data["option_name"]: data["items"] for data in product_data.options}
 
-        else:
-            ProductOption.objects.filter(product=product_data.product).delete()
+        # `bulk_create` skips `ProductOption.save`, so the limit is checked here
+        if len(wanted) > cls.MAX_OPTIONS:
+            raise ValidationError(
+                "You cannot add more than 3 options for this product.",
+                code="max_options_exceeded",
+            )
+
+        # Remove the options that are not in the current options data
+        options_to_delete = [
+            option_id
+            for option_name, (option_id, _) in current.items()
+            if option_name not in wanted
+        ]
+        if options_to_delete:
+            ProductOption.objects.filter(id__in=options_to_delete).delete()
+
+        new_options = ProductOption.objects.bulk_create(
+            [
+                ProductOption(product=product, option_name=option_name)
+                for option_name in wanted
+                if option_name not in current
+            ]
+        )
+
+        items_to_create = [
+            ProductOptionItem(option=option, item_name=item_name)
+            for option in new_options
+            for item_name in dict.fromkeys(wanted[option.option_name])
+        ]
+        items_to_delete = []
+        for option_name, (option_id, items) in current.items():
+            if option_name not in wanted:
+                continue
+            wanted_items = dict.fromkeys(wanted[option_name])
+            items_to_create.extend(
+                ProductOptionItem(option_id=option_id, item_name=item_name)
+                for item_name in wanted_items
+                if item_name not in items
+            )
+            items_to_delete.extend(
+                item_id
+                for item_name, item_id in items.items()
+                if item_name not in wanted_items
+            )
+
+        if items_to_delete:
+            ProductOptionItem.objects.filter(id__in=items_to_delete).delete()
+        if items_to_create:
+            ProductOptionItem.objects.bulk_create(items_to_create)
@@ -1,6 +1,7 @@
 from typing import List, Any
 
-from django.db.models import Prefetch, Min, Max, Sum
+from django.db.models import Prefetch, Min, Max, Sum, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
 from apps.shop.models.product import (
     ProductOptionItem,
@@ -9,6 +10,7 @@ from apps.shop.models.product import (
     ProductAttribute,
     ProductVariantImage,
     ProductOption,
+    ProductImage,
 )
 
 
@@ -28,52 +30,80 @@ class ProductRepository:
     """
 
     @staticmethod
-    def get_product_queryset(request):
-        # Annotate each product with minimum price, maximum price, and total stock from its variants.
-        annotated_queryset = Product.objects.annotate(
-            min_price=Min("variants__price"),
-            max_price=Max("variants__price"),
-            total_stock=Sum("variants__stock"),
-        ).select_related(
+    def get_product_queryset(request, related_fields=None):
+        """
+        Return the products visible to the user of `request`.
+
+        `related_fields` names the nested relations that will be rendered ("options",
+        "variants", "attributes", "images", "main_image"), only those are prefetched.
+        All of them except "main_image" are prefetched when it is None.
+        """
+        if related_fields is None:
+            related_fields = {"options", "variants", "attributes", "images"}
+
+        # Minimum price, maximum price, and total stock are read from the summary columns
+        # on the product, so no aggregation over the variants is needed here.
+        queryset = Product.objects.select_related(
             "category"
         )  # Optimize DB query by joining related category.
+        # The search vector is only read by the database.
+        queryset = queryset.defer("search_vector")
 
-        # Prefetch product options along with their items.
-        options_prefetch = Prefetch(
-            "options",
-            queryset=ProductOption.objects.prefetch_related("items"),
-        )
+        prefetches = []
+        if "options" in related_fields:
+            # Prefetch product options along with their items.
+            prefetches.append(
+                Prefetch(
+                    "options",
+                    queryset=ProductOption.objects.prefetch_related("items"),
+                )
+            )
 
-        # Prefetch product variants with their options and images.
-        variants_prefetch = Prefetch(
-            "variants",
-            queryset=ProductVariant.objects.select_related(
-                "option1", "option2", "option3"
+        if "variants" in related_fields:
+            # Prefetch product variants with their options and images.
+            prefetches.append(
+                Prefetch(
+                    "variants",
+                    queryset=ProductVariant.objects.select_related(
+                        "option1", "option2", "option3"
+                    )
+                    .prefetch_related(
+                        Prefetch(
+                            "images",
+                            queryset=ProductVariantImage.objects.select_related(
+                                "product_image"
+                            ),
+                        )
+                    )
+                    .order_by("id"),  # Order variants by their ID.
+                )
             )
-            .prefetch_related(
+
+        if "images" in related_fields:
+            prefetches.append("media")  # Prefetch product media (images).
+
+        if "main_image" in related_fields:
+            prefetches.append(
                 Prefetch(
-                    "images",
-                    queryset=ProductVariantImage.objects.select_related(
-                        "product_image"
-                    ),
+                    "media",
+                    queryset=ProductImage.objects.filter(is_main=True),
+                    to_attr="main_media",
                 )
             )
-            .order_by("id"),  # Order variants by their ID.
-        )
 
-        # Prefetch product attributes and their corresponding attribute details.
-        attributes_prefetch = Prefetch(
-            "productattribute_set",
-            queryset=ProductAttribute.objects.select_related("attribute"),
-        )
+        if "attributes" in related_fields:
+            # Prefetch product attributes and their corresponding attribute details.
+            prefetches.append(
+                Prefetch(
+                    "productattribute_set",
+                    queryset=ProductAttribute.objects.select_related(
+                        "attribute"
+                    ).prefetch_related("items"),
+                )
+            )
 
-        # Combine all prefetches with the annotated queryset.
-        queryset = annotated_queryset.prefetch_related(
-            options_prefetch,
-            variants_prefetch,
-            "media",  # Prefetch product media (images).
-            attributes_prefetch,
-        )
+        # Combine all prefetches with the queryset.
+        queryset = queryset.prefetch_related(*prefetches)
 
         # For non-staff users, exclude products with a draft status.
         if not request.user.is_staff:
@@ -101,9 +131,11 @@ class ProductRepository:
         item_ids_by_option = []
 
         # Query the ProductOptionItem table to retrieve item_ids
-        items = ProductOptionItem.objects.filter(
-            option__product_id=product_id
-        ).values_list("option_id", "id")
+        items = (
+            ProductOptionItem.objects.filter(option__product_id=product_id)
+            .order_by("option_id", "id")
+            .values_list("option_id", "id")
+        )
 
         # Group item_ids by option_id
         item_ids_dict = {}
@@ -115,6 +147,32 @@ class ProductRepository:
 
         return item_ids_by_option
 
+    @staticmethod
+    def refresh_variant_summary(*product_ids: int) -> None:
+        """
+        Recalculate the `min_price`, `max_price` and `total_stock` columns of the given products.
+
+        Explanation: The summary is recomputed from the variants table with correlated subqueries
+        in a single UPDATE statement, so it must be called inside the same transaction as the
+        variant writes to keep the summary consistent with the variants.
+
+        Args:
+        - product_ids (int): The IDs of the products to refresh.
+        """
+        variants = (
+            ProductVariant.objects.filter(product_id=OuterRef("pk"))
+            .order_by()
+            .values("product_id")
+        )
+        Product.objects.filter(id__in=product_ids).update(
+            min_price=Subquery(variants.annotate(value=Min("price")).values("value")),
+            max_price=Subquery(variants.annotate(value=Max("price")).values("value")),
+            total_stock=Coalesce(
+                Subquery(variants.annotate(value=Sum("stock")).values("value")),
+                Value(0),
+            ),
+        )
+
     @classmethod
     def retrieve_product_details(cls, product_id: int) -> Any:
         """
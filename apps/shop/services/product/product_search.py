@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection, connections
+from django.db.models import F, Func, Q, TextField, Value
+from django.utils.module_loading import import_string
+
+# Arabic code points that Farsi text is often typed with, and the Farsi letters and
+# ASCII digits they are indexed as. The zero-width non-joiner inside words such as
+# "می‌خواهم" is indexed as a space.
+FARSI_CHARACTERS = {
+    "ي": "ی",
+    "ى": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ؤ": "و",
+    "\u200c": " ",
+    **{digit: str(value) for value, digit in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+    **{digit: str(value) for value, digit in enumerate("٠١٢٣٤٥٦٧٨٩")},
+}
+# diacritics (harakat) and the tatweel are dropped
+FARSI_IGNORED_CHARACTERS = "".join(map(chr, range(0x064B, 0x0653))) + "\u0640"
+
+FARSI_TRANSLATION = str.maketrans(
+    "".join(FARSI_CHARACTERS),
+    "".join(FARSI_CHARACTERS.values()),
+    FARSI_IGNORED_CHARACTERS,
+)
+
+
+def normalize_search_text(text: str | None) -> str:
+    """Normalize Farsi text the way the search vectors are built."""
+    return (text or "").translate(FARSI_TRANSLATION)
+
+
+class NormalizeFarsi(Func):
+    """The SQL counterpart of `normalize_search_text`."""
+
+    function = "TRANSLATE"
+    output_field = TextField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(
+            expression,
+            Value("".join(FARSI_CHARACTERS) + FARSI_IGNORED_CHARACTERS),
+            Value("".join(FARSI_CHARACTERS.values())),
+            **extra,
+        )
+
+
+class ProductSearchBackend:
+    """
+    Searches products by name and description, the backend in use is picked by
+    `ProductSearch.backend` from the `PRODUCT_SEARCH_BACKEND` setting.
+    """
+
+    def search(self, queryset, term: str):
+        """Return the products of `queryset` that match `term`, best match first."""
+        raise NotImplementedError
+
+    def document(self, name: str, description: str | None):
+        """Return the value of `Product.search_vector` for a product being saved."""
+        return None
+
+    def update_vectors(self, queryset) -> int:
+        """Rebuild `search_vector` of the products of `queryset` with one UPDATE."""
+        return 0
+
+    def install(self, using: str) -> None:
+        """Create what the backend needs in the database (extensions, indexes)."""
+
+
+class BasicProductSearch(ProductSearchBackend):
+    """
+    Case-insensitive substring matching, like DRF's `SearchFilter`: every word of the
+    term has to be in the name or the description. It needs no index and works on
+    any database, the catalog is scanned though, so it is meant for SQLite.
+    """
+
+    def search(self, queryset, term: str):
+        for word in term.split():
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+
+
+class PostgresProductSearch(ProductSearchBackend):
+    """
+    Full-text search over the `search_vector` column, with a trigram fallback.
+
+    The vector holds the name (weight A) and the description (weight B), normalized
+    with `normalize_search_text`. It uses the "simple" configuration: PostgreSQL has
+    no Farsi stemmer, and the English one would mangle the Farsi words and drop
+    nothing but English stop words. Products whose name is only similar to the term
+    (a typo, a plural) are found through the trigram index and ranked after the
+    full-text matches. Both conditions are index scans, on the GIN indexes that
+    `install` creates.
+    """
+
+    CONFIG = "simple"
+    VECTOR_INDEX = "shop_product_search_vector_idx"
+    TRIGRAM_INDEX = "shop_product_name_trgm_idx"
+
+    def search(self, queryset, term: str):
+        term = normalize_search_text(term).strip()
+        if not term:
+            return queryset
+        query = SearchQuery(term, config=self.CONFIG, search_type="websearch")
+        return (
+            queryset.filter(
+                Q(search_vector=query) | TrigramWordSimilar(F("name"), Value(term))
+            )
+            .annotate(
+                search_rank=SearchRank(F("search_vector"), query),
+                search_similarity=TrigramWordSimilarity(Value(term), "name"),
+            )
+            .order_by("-search_rank", "-search_similarity", "id")
+        )
+
+    def document(self, name: str, description: str | None):
+        return self._vector(
+            Value(normalize_search_text(name)),
+            Value(normalize_search_text(description)),
+        )
+
+    def update_vectors(self, queryset) -> int:
+        return queryset.update(
+            search_vector=self._vector(
+                NormalizeFarsi(F("name")), NormalizeFarsi(F("description"))
+            )
+        )
+
+    def _vector(self, name, description):
+        return SearchVector(name, weight="A", config=self.CONFIG) + SearchVector(
+            description, weight="B", config=self.CONFIG
+        )
+
+    def install(self, using: str) -> None:
+        from apps.shop.models.product import Product
+
+        table = Product._meta.db_table
+        with connections[using].cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.VECTOR_INDEX} "
+                f"ON {table} USING gin (search_vector)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.TRIGRAM_INDEX} "
+                f"ON {table} USING gin (name gin_trgm_ops)"
+            )
+
+
+class ProductSearch:
+    """
+    Resolves the `PRODUCT_SEARCH_BACKEND` setting: "postgres", "basic", the dotted
+    path of a `ProductSearchBackend` subclass, or "auto" for "postgres" on
+    PostgreSQL and "basic" anywhere else.
+    """
+
+    BACKENDS = {"postgres": PostgresProductSearch, "basic": BasicProductSearch}
+
+    @classmethod
+    def backend(cls, using: str = None) -> ProductSearchBackend:
+        name = settings.PRODUCT_SEARCH_BACKEND
+        if name == "auto":
+            vendor = (connections[using] if using else connection).vendor
+            name = "postgres" if vendor == "postgresql" else "basic"
+        backend_class = cls.BACKENDS.get(name) or import_string(name)
+        return backend_class()
@@ -1,8 +1,14 @@
 # product_service.py
 
+from django.db import transaction
+
 from apps.shop.models.product import Product
 from apps.shop.services.product.product_attributes_manager import ProductAttributeMixin
+from apps.shop.services.product.product_bitmap_index import ProductBitmapIndex
+from apps.shop.services.product.product_bulk_manager import ProductBulkMixin
+from apps.shop.services.product.product_cache import ProductCache
 from apps.shop.services.product.product_data import ProductData
+from apps.shop.services.product.product_facets import ProductFacetMixin
 from apps.shop.services.product.product_images_manager import ProductImageMixin
 from apps.shop.services.product.product_options_manager import ProductOptionMixin
 from apps.shop.services.product.product_repository import ProductRepository
@@ -15,6 +21,8 @@ class ProductService(
     ProductVariantMixin,
     ProductAttributeMixin,
     ProductImageMixin,
+    ProductBulkMixin,
+    ProductFacetMixin,
 ):
     """
     Handles operations related to product management including creating, updating,
@@ -23,10 +31,13 @@ class ProductService(
     This class serves as a service layer to handle complex logic for handling
     products in the system. It interacts with the underlying repositories and
     mixins to ensure that products are correctly created or updated along with
-    their associated data like variants, attributes, options, and images.
+    their associated data like variants, attributes, options, and images. Whole
+    catalogs are imported and exported in bulk through `ProductBulkMixin`, and the
+    facet counts of the product list come from `ProductFacetMixin`.
     """
 
     @classmethod
+    @transaction.atomic
     def create_product(cls, **data) -> Product:
         """High-level method to create a new product."""
         data, product_data = cls._extract_relevant_data(**data)
@@ -34,9 +45,12 @@ class ProductService(
         cls.manage_options(product_data)
         cls.manage_variants(product_data)
         cls.manage_attributes(product_data)
+        ProductBitmapIndex.reindex_products(product_data.product.id)
+        ProductCache.invalidate_product(product_data.product.id)
         return cls.retrieve_product_details(product_data.product.id)
 
     @classmethod
+    @transaction.atomic
     def update_product(cls, product: Product, **data) -> Product:
         """High-level method to update an existing product."""
         data, product_data = cls._extract_relevant_data(**data)
@@ -47,6 +61,8 @@ class ProductService(
         cls.manage_options(product_data)
         cls.manage_variants(product_data)
         cls.manage_attributes(product_data)
+        ProductBitmapIndex.reindex_products(product.id)
+        ProductCache.invalidate_product(product.id)
         return cls.retrieve_product_details(product.id)
 
     @staticmethod
@@ -54,6 +70,7 @@ class ProductService(
         return data, ProductData(
             options=data.pop("options", ProductData.options),
             attributes=data.pop("attributes", ProductData.attributes),
+            attribute_items=data.pop("attribute_items", ProductData.attribute_items),
             price=data.pop("price", ProductData.price),
             stock=data.pop("stock", ProductData.stock),
             sku=data.pop("sku", ProductData.sku),
@@ -1,93 +1,107 @@
+from dataclasses import dataclass
 from itertools import product as options_combination
 from typing import Any
 
+from django.db import transaction
+
 from apps.shop.models.product import ProductVariant
 from apps.shop.services.product.product_data import ProductData
 from apps.shop.services.product.product_repository import ProductRepository
 
 
-class ProductVariantMixin:
-    @staticmethod
-    def manage_variants(product_data: ProductData) -> None:
-        """Implement the logic for managing variants."""
+@dataclass
+class VariantSyncResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
 
-        # Fetch existing variants
-        existing_variants = list(
-            ProductVariant.objects.filter(product=product_data.product).values(
-                "id", "option1_id", "option2_id", "option3_id", "price", "stock", "sku"
-            )
-        )
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
 
-        # Get the IDs of items related to product options
-        items_id = ProductRepository.get_item_ids_by_product_id(product_data.product.id)
-        new_variants_combinations = list(options_combination(*items_id))
-        new_variants_to_create = []
-
-        # Create a map of existing variants for easy lookup
-        existing_variants_map = {
-            (
-                variant["option1_id"],
-                variant["option2_id"],
-                variant["option3_id"],
-            ): variant
-            for variant in existing_variants
+
+class ProductVariantMixin:
+    @staticmethod
+    @transaction.atomic
+    def manage_variants(product_data: ProductData) -> VariantSyncResult:
+        """
+        Sync the variants of a product with the combinations of its option items.
+
+        Existing variants are matched by their set of option items. Only the ones whose
+        items moved to another option slot, or whose price, stock or SKU differ from the
+        ones provided in `product_data`, are updated, with one statement. The missing
+        combinations are created with the provided values, and the variants of removed
+        combinations are deleted with one statement.
+        """
+
+        product = product_data.product
+        result = VariantSyncResult()
+        provided = {
+            field: getattr(product_data, field)
+            for field in ("price", "stock", "sku")
+            if getattr(product_data, field) is not None
         }
 
-        # Track variants to retain
-        variants_to_retain = set()
-
-        # Iterate over the new combinations and handle update or create
-        for variant in new_variants_combinations:
-            values_tuple = tuple(variant)
-            while len(values_tuple) < 3:
-                values_tuple += (None,)
-            option1, option2, option3 = values_tuple
-
-            existing_variant = existing_variants_map.get((option1, option2, option3))
-
-            if existing_variant:
-                # Retain the variant if it matches the new combination
-                variants_to_retain.add(existing_variant["id"])
-
-                # Update the existing variant with the same options
-                updated_variant = ProductVariant(
-                    id=existing_variant["id"],  # Keep the same ID to update
-                    product=product_data.product,
-                    option1_id=option1,
-                    option2_id=option2,
-                    option3_id=option3,
-                    price=existing_variant[
-                        "price"
-                    ],  # Retain existing price, stock, and sku
-                    stock=existing_variant["stock"],
-                    sku=existing_variant["sku"],
-                )
-            else:
-                # Create a new variant for the new combination
-                updated_variant = ProductVariant(
-                    product=product_data.product,
-                    option1_id=option1,
-                    option2_id=option2,
-                    option3_id=option3,
-                    price=product_data.price,  # Set new price, stock, and sku for new variants
-                    stock=product_data.stock,
-                    sku=product_data.sku,
+        # The wanted option slots of every combination, keyed by its set of items
+        items_id = ProductRepository.get_item_ids_by_product_id(product.id)
+        wanted = {}
+        for combination in options_combination(*items_id):
+            slots = tuple(combination) + (None,) * (3 - len(combination))
+            wanted[frozenset(combination)] = slots
+
+        variants_to_update = []
+        variant_ids_to_delete = []
+        existing = ProductVariant.objects.filter(product=product).values_list(
+            "id", "option1_id", "option2_id", "option3_id", *provided
+        )
+        for variant_id, *slots in existing:
+            slots, values = tuple(slots[:3]), slots[3:]
+            key = frozenset(item_id for item_id in slots if item_id is not None)
+            # pop the combination, so duplicates of it are deleted as well
+            wanted_slots = wanted.pop(key, None)
+            if wanted_slots is None:
+                variant_ids_to_delete.append(variant_id)
+            elif wanted_slots != slots or values != list(provided.values()):
+                option1, option2, option3 = wanted_slots
+                variants_to_update.append(
+                    ProductVariant(
+                        id=variant_id,
+                        option1_id=option1,
+                        option2_id=option2,
+                        option3_id=option3,
+                        **provided,
+                    )
                 )
 
-            new_variants_to_create.append(updated_variant)
+        # Delete first, so the updated and created rows can't clash with them
+        if variant_ids_to_delete:
+            ProductVariant.objects.filter(id__in=variant_ids_to_delete).delete()
+            result.deleted = len(variant_ids_to_delete)
 
-        # Bulk create new and updated variants
-        x = ProductVariant.objects.bulk_create(
-            new_variants_to_create, ignore_conflicts=True
-        )
+        if variants_to_update:
+            result.updated = ProductVariant.objects.bulk_update(
+                variants_to_update, ["option1", "option2", "option3", *provided]
+            )
 
-        # Identify and delete old variants that are no longer valid
-        variant_ids_to_delete = (
-            set(variant["id"] for variant in existing_variants) - variants_to_retain
-        )
+        if wanted:
+            created = ProductVariant.objects.bulk_create(
+                [
+                    ProductVariant(
+                        product=product,
+                        option1_id=option1,
+                        option2_id=option2,
+                        option3_id=option3,
+                        **{"price": 0, "stock": 0, "sku": "", **provided},
+                    )
+                    for option1, option2, option3 in wanted.values()
+                ]
+            )
+            result.created = len(created)
 
-        if variant_ids_to_delete:
-            ProductVariant.objects.filter(id__in=variant_ids_to_delete).delete()
+        # Keep the price and stock summary of the product in sync with its variants
+        if result.changed:
+            ProductRepository.refresh_variant_summary(product.id)
+        return result
 
     def create_product_variants(self, product_info: Any) -> None:
         # Implement the logic for creating product variants.
@@ -0,0 +1,15 @@
+from apps.shop.services.category_tree_cache import CategoryTreeCache
+from apps.shop.services.order.order_number_allocator import OrderNumberAllocator
+from apps.shop.services.product.product_search import ProductSearch
+
+
+def invalidate_category_tree(sender, instance, **kwargs):
+    CategoryTreeCache.invalidate()
+
+
+def install_product_search(sender, using, **kwargs):
+    ProductSearch.backend(using).install(using)
+
+
+def install_order_number_sequence(sender, using, **kwargs):
+    OrderNumberAllocator.install(using)
@@ -0,0 +1,47 @@
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.attribute.attribute_factory import AttributeFactory
+
+
+class AttributeConditionalGetTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.attribute = AttributeFactory()
+
+    def api_path(self) -> str:
+        return reverse("attributes:attribute-list")
+
+    def detail_path(self) -> str:
+        return reverse("attributes:attribute-detail", kwargs={"pk": self.attribute.id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def test_not_modified(self):
+        for path in (self.api_path(), self.detail_path()):
+            response = self.send_request(path)
+            self.assertIn("Last-Modified", response)
+            # the user, then one aggregate query instead of the page
+            with self.assertNumQueries(2):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertHTTPStatusCode(response, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_change_the_etag(self):
+        etag = self.send_request()["ETag"]
+        AttributeFactory()
+        self.assertNotEqual(self.send_request()["ETag"], etag)
+
+        etag = self.send_request(self.detail_path())["ETag"]
+        self.attribute.attribute_name = "renamed"
+        self.attribute.save()
+        self.assertNotEqual(self.send_request(self.detail_path())["ETag"], etag)
+
+    def test_missing_attribute(self):
+        for pk in (0, "abc"):
+            response = self.client.get(
+                reverse("attributes:attribute-detail", kwargs={"pk": pk})
+            )
+            self.assertHTTPStatusCode(response, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from apps.shop.demo.factory.cart.cart_factory import CartFactory
+from apps.shop.models.product import ProductImage, ProductVariantImage
+from apps.shop.serializers.cart_serializers import CartItemSerializer, CartSerializer
+from apps.shop.serializers.fast_serializers import (
+    FastCartItemSerializer,
+    FastCartSerializer,
+)
+from apps.shop.services.cart.cart_repository import CartRepository
+
+
+class FastCartSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cart_id, cls.cart_items = CartFactory.add_multiple_items(get_items=True)
+        variant = cls.cart_items[0].variant
+        variant_image, main_image = variant.product.media.order_by("id")[:2]
+        ProductImage.objects.filter(pk=main_image.pk).update(is_main=True)
+        ProductVariantImage.objects.create(product_image=variant_image, variant=variant)
+
+    def test_cart_item_serializer(self):
+        cart_items = CartRepository.get_cart_item_queryset().filter(
+            cart_id=self.cart_id
+        )
+        data = FastCartItemSerializer(cart_items, many=True).data
+        self.assertEqual(len(data), len(self.cart_items))
+        self.assertEqual(data, CartItemSerializer(cart_items, many=True).data)
+
+    def test_cart_serializer(self):
+        cart = CartRepository.get_cart_queryset().get(pk=self.cart_id)
+        self.assertEqual(FastCartSerializer(cart).data, CartSerializer(cart).data)
@@ -0,0 +1,58 @@
+from django.urls import reverse
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.cart.cart_factory import CartFactory
+from apps.shop.models.product import ProductImage, ProductVariantImage
+
+# cart + items (with variants, products and options) + variant images + product images
+CART_QUERIES = 4
+
+
+class CartQueriesTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cart_id, cls.cart_items = CartFactory.add_multiple_items(get_items=True)
+
+    def setUp(self):
+        super().setUp()
+        self.authorization_as_anonymous_user()
+
+    def api_path(self) -> str:
+        return reverse("carts:cart-detail", kwargs={"pk": self.cart_id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def test_retrieve_query_budget(self):
+        with self.assertNumQueries(CART_QUERIES):
+            response = self.send_request()
+        self.validate_response_body(response)
+        self.assertEqual(len(self.response_body["items"]), len(self.cart_items))
+
+        cart_id = CartFactory.add_one_item()
+        with self.assertNumQueries(CART_QUERIES):
+            self.send_request(reverse("carts:cart-detail", kwargs={"pk": cart_id}))
+
+    def test_list_items_query_budget(self):
+        with self.assertNumQueries(CART_QUERIES - 1):
+            response = self.send_request(
+                reverse("carts:items", kwargs={"cart_id": self.cart_id})
+            )
+        self.assertHTTPStatusCode(response)
+
+    def test_image_is_variant_image_then_main_image(self):
+        variant = self.cart_items[0].variant
+        variant_image, main_image = variant.product.media.order_by("id")[:2]
+        ProductImage.objects.filter(pk=main_image.pk).update(is_main=True)
+        ProductVariantImage.objects.create(product_image=variant_image, variant=variant)
+
+        response = self.send_request()
+        self.validate_response_body(response)
+        images = {
+            item["variant"]["id"]: item["image"] for item in self.response_body["items"]
+        }
+        self.assertEqual(images.pop(variant.id), variant_image.src.url)
+        self.assertTrue(images)
+        for image in images.values():
+            self.assertEqual(image, main_image.src.url)
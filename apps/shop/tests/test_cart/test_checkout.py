@@ -0,0 +1,150 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIPostTestCaseMixin
+from apps.shop.demo.factory.cart.cart_factory import CartFactory
+from apps.shop.models.cart import Cart, StockReservation
+from apps.shop.models.order import Order, OrderItem
+from apps.shop.services.cart.stock_reservation_service import StockReservationService
+from apps.shop.services.order.checkout_service import CheckoutService
+
+
+class CheckoutTest(APIPostTestCaseMixin):
+    def setUp(self):
+        super().setUp()
+        self.authorization_as_regular_user()
+        self.cart_id, self.cart_items = CartFactory.add_multiple_items(get_items=True)
+        self.payload = {
+            "shipping_address": {
+                "first_name": "John",
+                "last_name": "Doe",
+                "phone": "+15555555555",
+                "country": "Country",
+                "province": "Province",
+                "city": "City",
+                "zip": "12345",
+                "address1": "Street 1",
+            }
+        }
+
+    def api_path(self) -> str:
+        return reverse("carts:cart-checkout", kwargs={"pk": self.cart_id})
+
+    def validate_response_body(self, response, payload):
+        super().validate_response_body(response, payload)
+
+    def test_checkout(self):
+        variants = [item.variant for item in self.cart_items]
+        expected_total = sum(variant.price for variant in variants)
+
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_201_CREATED)
+
+        expected = response.json()
+        self.assertIsInstance(expected["order_number"], int)
+        self.assertEqual(Decimal(str(expected["total_price"])), expected_total)
+        self.assertEqual(
+            Decimal(str(expected["total_line_items_price"])), expected_total
+        )
+        self.assertEqual(len(expected["items"]), len(variants))
+        self.assertEqual(
+            expected["billing_address"]["address1"],
+            self.payload["shipping_address"]["address1"],
+        )
+        for item in expected["items"]:
+            self.assertEqual(item["quantity"], 1)
+            self.assertTrue(item["name"])
+
+        # the stock is taken and the cart is gone
+        for variant in variants:
+            stock = variant.stock
+            variant.refresh_from_db()
+            self.assertEqual(variant.stock, stock - 1)
+        self.assertFalse(Cart.objects.filter(pk=self.cart_id).exists())
+
+    def test_checkout_consumes_reservations(self):
+        variant = self.cart_items[0].variant
+        StockReservationService.reserve(self.cart_id, variant.id, 1)
+
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_201_CREATED)
+
+        stock = variant.stock
+        variant.refresh_from_db()
+        self.assertEqual(variant.reserved, 0)
+        self.assertEqual(variant.stock, stock - 1)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_checkout_is_idempotent(self):
+        response = self.send_request(self.payload, HTTP_IDEMPOTENCY_KEY="key-1")
+        self.assertHTTPStatusCode(response, status.HTTP_201_CREATED)
+
+        retry = self.send_request(self.payload, HTTP_IDEMPOTENCY_KEY="key-1")
+        self.assertHTTPStatusCode(retry, status.HTTP_200_OK)
+        self.assertEqual(retry.json()["id"], response.json()["id"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.count(), len(self.cart_items))
+
+    def test_retry_after_the_cart_is_gone(self):
+        response = self.send_request(self.payload, HTTP_IDEMPOTENCY_KEY="key-1")
+        order = Order.objects.get()
+
+        # the retry looked the key up before the first checkout committed
+        with mock.patch.object(
+            CheckoutService, "_get_order", side_effect=[None, order]
+        ):
+            retry = self.send_request(self.payload, HTTP_IDEMPOTENCY_KEY="key-1")
+        self.assertHTTPStatusCode(retry, status.HTTP_200_OK)
+        self.assertEqual(retry.json()["id"], response.json()["id"])
+
+    def test_invalid_idempotency_key(self):
+        for key in ("", "k" * 256):
+            response = self.send_request(self.payload, HTTP_IDEMPOTENCY_KEY=key)
+            self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_checkout_insufficient_stock(self):
+        variant = self.cart_items[0].variant
+        variant.stock = 0
+        variant.save(update_fields=["stock"])
+
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        # nothing is changed
+        self.assertFalse(Order.objects.exists())
+        self.assertTrue(Cart.objects.filter(pk=self.cart_id).exists())
+        for item in self.cart_items[1:]:
+            stock = item.variant.stock
+            item.variant.refresh_from_db()
+            self.assertEqual(item.variant.stock, stock)
+
+    def test_checkout_empty_cart(self):
+        self.cart_id = CartFactory.create_cart()
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_missing_cart(self):
+        Cart.objects.filter(pk=self.cart_id).delete()
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+    def test_checkout_requires_address(self):
+        response = self.send_request({})
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_by_anonymous_user(self):
+        self.authorization_as_anonymous_user()
+        response = self.send_request(self.payload)
+        self.assertHTTPStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_checkout", checkouts=3, lines=5, stdout=out)
+        self.assertIn("checkouts: 3, lines per cart: 5", out.getvalue())
+        self.assertFalse(Order.objects.exists())
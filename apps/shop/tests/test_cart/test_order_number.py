@@ -0,0 +1,96 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from apps.core.demo.factory.user_factory import UserFactory
+from apps.shop.models.order import Order, OrderAddress
+from apps.shop.services.order.order_number_allocator import OrderNumberAllocator
+
+
+def create_order(customer) -> Order:
+    address = OrderAddress.objects.create(
+        first_name="John",
+        last_name="Doe",
+        phone="+15555555555",
+        country="Country",
+        province="Province",
+        city="City",
+        zip="12345",
+        address1="Street 1",
+    )
+    return Order.objects.create(
+        customer=customer,
+        order_number=OrderNumberAllocator.next_number(),
+        shipping_address=address,
+        billing_address=address,
+    )
+
+
+class OrderNumberAllocatorTest(TestCase):
+    def setUp(self):
+        OrderNumberAllocator._block = iter(())
+
+    @override_settings(ORDER_NUMBER_START=5001)
+    def test_numbers_without_sequence(self):
+        customer = UserFactory.create()
+        numbers = [create_order(customer).order_number for _ in range(3)]
+        self.assertEqual(numbers, [5001, 5002, 5003])
+
+    @override_settings(ORDER_NUMBER_BLOCK_SIZE=10)
+    def test_blocks_are_not_shared_between_threads(self):
+        # a non-transactional counter standing in for the PostgreSQL sequence
+        sequence = itertools.count(1001, 10)
+        sequence_lock = threading.Lock()
+
+        def reserve_block():
+            with sequence_lock:
+                start = next(sequence)
+            return range(start, start + 10)
+
+        with (
+            mock.patch.object(OrderNumberAllocator, "uses_sequence", return_value=True),
+            mock.patch.object(
+                OrderNumberAllocator, "_reserve_block", side_effect=reserve_block
+            ),
+            ThreadPoolExecutor(max_workers=20) as executor,
+        ):
+            numbers = list(
+                executor.map(lambda _: OrderNumberAllocator.next_number(), range(1000))
+            )
+
+        self.assertEqual(len(set(numbers)), 1000)
+
+
+@skipUnless(connection.vendor == "postgresql", "needs a PostgreSQL sequence")
+class OrderNumberConcurrencyTest(TransactionTestCase):
+    def test_parallel_inserts_have_unique_numbers(self):
+        customer = UserFactory.create()
+
+        def insert_orders(count):
+            try:
+                return [create_order(customer).order_number for _ in range(count)]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            numbers = [
+                number
+                for worker_numbers in executor.map(insert_orders, [20] * 10)
+                for number in worker_numbers
+            ]
+
+        self.assertEqual(len(set(numbers)), 200)
+        self.assertEqual(Order.objects.count(), 200)
+
+    def test_install_moves_the_sequence_past_existing_numbers(self):
+        customer = UserFactory.create()
+        last = create_order(customer)
+        Order.objects.filter(pk=last.pk).update(order_number=last.order_number + 500)
+        OrderNumberAllocator.install()
+        OrderNumberAllocator._block = iter(())
+
+        self.assertGreater(OrderNumberAllocator.next_number(), last.order_number + 500)
@@ -0,0 +1,163 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.services.cart.redis_cart_store import RedisCartStore
+
+KEY_PREFIX = "test-cart"
+
+
+def redis_is_available() -> bool:
+    try:
+        return RedisCartStore.get_client().ping()
+    except Exception:
+        return False
+
+
+@skipUnless(redis_is_available(), "Redis server is not available")
+@override_settings(CART_STORE="redis", CART_REDIS_KEY_PREFIX=KEY_PREFIX)
+class RedisCartStoreTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.product = ProductFactory.customize(has_image=True, is_variable=True)
+        cls.variants = list(cls.product.variants.order_by("id"))
+
+    def setUp(self):
+        super().setUp()
+        self.authorization_as_anonymous_user()
+        self.cart_id = self.client.post(reverse("carts:cart-list")).json()["id"]
+        self.item_ids = {}
+
+    def tearDown(self):
+        client = RedisCartStore.get_client()
+        for key in client.scan_iter(f"{KEY_PREFIX}:*"):
+            client.delete(key)
+        super().tearDown()
+
+    def api_path(self) -> str:
+        return reverse("carts:cart-detail", kwargs={"pk": self.cart_id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+        self.assertEqual(self.response_body["id"], self.cart_id)
+
+    def add_item(self, variant, quantity=1):
+        response = self.client.post(
+            reverse("carts:items", kwargs={"cart_id": self.cart_id}),
+            data={"variant": variant.id, "quantity": quantity},
+            format="json",
+        )
+        if response.status_code == status.HTTP_201_CREATED:
+            self.item_ids[variant.id] = response.json()["id"]
+        return response
+
+    def item_path(self, variant):
+        return reverse(
+            "carts:item",
+            kwargs={"cart_id": self.cart_id, "pk": self.item_ids[variant.id]},
+        )
+
+    def test_writes_do_not_touch_cart_tables(self):
+        self.add_item(self.variants[0])
+        self.add_item(self.variants[1], 2)
+        self.client.patch(
+            self.item_path(self.variants[1]), {"quantity": 1}, format="json"
+        )
+        self.client.delete(self.item_path(self.variants[0]))
+
+        self.assertFalse(Cart.objects.filter(pk=self.cart_id).exists())
+        response = self.send_request()
+        self.validate_response_body(response)
+        self.assertEqual(
+            [(item["id"], item["quantity"]) for item in self.response_body["items"]],
+            [(self.item_ids[self.variants[1].id], 1)],
+        )
+
+    def test_duplicate_variant(self):
+        self.add_item(self.variants[0])
+        response = self.add_item(self.variants[0])
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_flush_keeps_the_response_shape(self):
+        for variant in self.variants[:3]:
+            self.add_item(variant, 2)
+        hot_response = self.send_request().json()
+
+        call_command("flush_carts", stdout=StringIO())
+        self.assertEqual(
+            CartItem.objects.filter(cart_id=self.cart_id).count(),
+            len(hot_response["items"]),
+        )
+
+        with override_settings(CART_STORE="database"):
+            stored_response = self.send_request().json()
+        # the items keep their id, and so their URL
+        self.assertEqual(stored_response, hot_response)
+
+    def test_flush_removed_items(self):
+        self.add_item(self.variants[0])
+        self.add_item(self.variants[1])
+        RedisCartStore.flush([self.cart_id])
+        self.client.delete(self.item_path(self.variants[0]))
+        RedisCartStore.flush()
+
+        self.assertEqual(
+            list(
+                CartItem.objects.filter(cart_id=self.cart_id).values_list(
+                    "variant_id", flat=True
+                )
+            ),
+            [self.variants[1].id],
+        )
+
+    def test_expired_cart_is_not_persisted(self):
+        self.add_item(self.variants[0])
+        RedisCartStore.get_client().delete(f"{KEY_PREFIX}:{self.cart_id}")
+        RedisCartStore.flush()
+
+        self.assertFalse(Cart.objects.filter(pk=self.cart_id).exists())
+        self.assertHTTPStatusCode(self.send_request(), status.HTTP_404_NOT_FOUND)
+
+    def test_stored_cart_is_loaded(self):
+        cart = Cart.objects.create()
+        CartItem.objects.create(cart=cart, variant=self.variants[0], quantity=3)
+
+        response = self.send_request(
+            reverse("carts:cart-detail", kwargs={"pk": cart.id})
+        )
+        self.assertHTTPStatusCode(response)
+        self.assertEqual(response.json()["items"][0]["quantity"], 3)
+
+    def test_destroy(self):
+        self.add_item(self.variants[0])
+        RedisCartStore.flush()
+        response = self.client.delete(self.api_path())
+        self.assertHTTPStatusCode(response, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Cart.objects.filter(pk=self.cart_id).exists())
+        self.assertHTTPStatusCode(self.send_request(), status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_item_id(self):
+        self.add_item(self.variants[0])
+        self.assertIsNone(RedisCartStore.get_item(self.cart_id, "abc"))
+
+    def test_stored_cart_keeps_its_item_ids(self):
+        self.add_item(self.variants[0])
+        RedisCartStore.flush([self.cart_id])
+        stored_id = CartItem.objects.get(cart_id=self.cart_id).id
+        self.assertEqual(stored_id, self.item_ids[self.variants[0].id])
+
+        # loaded again from the database once the Redis copy is gone
+        RedisCartStore.get_client().delete(f"{KEY_PREFIX}:{self.cart_id}")
+        response = self.client.patch(
+            self.item_path(self.variants[0]), {"quantity": 2}, format="json"
+        )
+        self.assertHTTPStatusCode(response)
+        self.assertEqual(response.json()["id"], stored_id)
@@ -0,0 +1,144 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.core.tests.mixin import APIPostTestCaseMixin
+from apps.shop.demo.factory.cart.cart_factory import CartFactory
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.cart import CartItem, StockReservation
+from apps.shop.services.cart.stock_reservation_service import (
+    InsufficientStockError,
+    StockReservationService,
+)
+
+INSUFFICIENT = "Quantity exceeds available stock!"
+
+
+class StockReservationTest(APIPostTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.variant = ProductFactory.customize(stock=3).variants.get()
+
+    def setUp(self):
+        super().setUp()
+        self.cart_id = CartFactory.create_cart()
+
+    def api_path(self) -> str:
+        return reverse("carts:items", kwargs={"cart_id": self.cart_id})
+
+    def validate_response_body(self, response, payload):
+        super().validate_response_body(response, payload)
+
+    def assertReserved(self, quantity):
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.reserved, quantity)
+        self.assertEqual(self.variant.stock, 3)
+
+    def test_reserve(self):
+        StockReservationService.reserve(self.cart_id, self.variant.id, 2)
+        self.assertReserved(2)
+        with self.assertRaises(InsufficientStockError):
+            StockReservationService.reserve(uuid.uuid4(), self.variant.id, 2)
+        self.assertReserved(2)
+
+        # changing the quantity only takes or gives back the difference
+        StockReservationService.reserve(self.cart_id, self.variant.id, 3)
+        self.assertReserved(3)
+        StockReservationService.reserve(self.cart_id, self.variant.id, 1)
+        self.assertReserved(1)
+
+    def test_release(self):
+        StockReservationService.reserve(self.cart_id, self.variant.id, 2)
+        StockReservationService.release(self.cart_id)
+        self.assertReserved(0)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_expired(self):
+        StockReservationService.reserve(self.cart_id, self.variant.id, 2)
+        StockReservationService.reserve(uuid.uuid4(), self.variant.id, 1)
+        StockReservation.objects.filter(cart_id=self.cart_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        call_command("release_stock_reservations", stdout=StringIO())
+        self.assertReserved(1)
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+    def test_expired_reservations_are_released_on_demand(self):
+        StockReservationService.reserve(self.cart_id, self.variant.id, 3)
+        StockReservation.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        StockReservationService.reserve(uuid.uuid4(), self.variant.id, 2)
+        self.assertReserved(2)
+
+    def test_cart_items_hold_stock(self):
+        response = self.send_request({"variant": self.variant.id, "quantity": 2})
+        self.assertHTTPStatusCode(response)
+        item_path = reverse(
+            "carts:item", kwargs={"cart_id": self.cart_id, "pk": response.json()["id"]}
+        )
+        self.assertReserved(2)
+
+        other_cart_path = reverse(
+            "carts:items", kwargs={"cart_id": CartFactory.create_cart()}
+        )
+        response = self.send_request(
+            {"variant": self.variant.id, "quantity": 2}, other_cart_path
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"non_field_errors": [INSUFFICIENT]})
+        self.assertEqual(self.client.get(other_cart_path).json(), [])
+
+        response = self.client.patch(item_path, {"quantity": 3}, format="json")
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        self.assertReserved(3)
+
+        self.client.delete(item_path)
+        self.assertReserved(0)
+
+    def test_update_is_validated_against_available_stock(self):
+        response = self.send_request({"variant": self.variant.id, "quantity": 1})
+        item_path = reverse(
+            "carts:item", kwargs={"cart_id": self.cart_id, "pk": response.json()["id"]}
+        )
+        StockReservationService.reserve(uuid.uuid4(), self.variant.id, 1)
+
+        response = self.client.patch(item_path, {"quantity": 3}, format="json")
+        self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"non_field_errors": [INSUFFICIENT]})
+        response = self.client.patch(item_path, {"quantity": 2}, format="json")
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+
+    def test_item_is_not_created_when_reserving_fails(self):
+        with mock.patch.object(
+            StockReservationService, "reserve", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.send_request({"variant": self.variant.id, "quantity": 1})
+        self.assertFalse(CartItem.objects.filter(cart_id=self.cart_id).exists())
+
+    def test_delete_cart_releases_stock(self):
+        self.send_request({"variant": self.variant.id, "quantity": 2})
+        self.client.delete(reverse("carts:cart-detail", kwargs={"pk": self.cart_id}))
+        self.assertReserved(0)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            "benchmark_stock_reservations",
+            buyers=20,
+            concurrency=1,
+            stock=5,
+            stdout=out,
+        )
+        self.assertIn("successful reservations: 5, reserved: 5", out.getvalue())
+        self.assertIn("oversold: no", out.getvalue())
@@ -0,0 +1,147 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.category.category_factory import CategoryFactory
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.category import Category
+
+
+class CategoryHierarchyTest(APIGetTestCaseMixin):
+    def setUp(self):
+        super().setUp()
+        # root > child > grandchild, and a second root
+        self.root = CategoryFactory()
+        self.child = CategoryFactory(parent=self.root)
+        self.grandchild = CategoryFactory(parent=self.child)
+        self.other_root = CategoryFactory()
+
+    def api_path(self) -> str:
+        return reverse("categories:category-category-tree")
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def detail_path(self, category) -> str:
+        return reverse("categories:category-detail", kwargs={"pk": category.id})
+
+    def test_path(self):
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f"{self.root.id}/{self.child.id}/{self.grandchild.id}/",
+        )
+
+    def test_parents_and_children_hierarchy(self):
+        response = self.send_request(self.detail_path(self.grandchild))
+        self.validate_response_body(response)
+        self.assertEqual(
+            self.response_body["parents_hierarchy"],
+            [
+                {"id": self.root.id, "name": self.root.name},
+                {"id": self.child.id, "name": self.child.name},
+            ],
+        )
+
+        response = self.send_request(self.detail_path(self.root))
+        self.validate_response_body(response)
+        self.assertEqual(
+            self.response_body["children_hierarchy"],
+            [
+                {
+                    "id": self.child.id,
+                    "name": self.child.name,
+                    "children": [
+                        {
+                            "id": self.grandchild.id,
+                            "name": self.grandchild.name,
+                            "children": [],
+                        }
+                    ],
+                }
+            ],
+        )
+
+    def test_list_loads_the_hierarchies_of_the_page_at_once(self):
+        for _ in range(12):
+            child = CategoryFactory(parent=CategoryFactory())
+            CategoryFactory(parent=child)
+        self.authorization_as_anonymous_user()
+
+        # count, page, images, ancestors and descendants
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("categories:category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 12)
+        for item in results:
+            category = Category.objects.get(pk=item["id"])
+            self.assertEqual(
+                item["parents_hierarchy"], category.get_parents_hierarchy()
+            )
+            self.assertEqual(
+                item["children_hierarchy"], category.get_children_hierarchy()
+            )
+
+    def test_tree_in_one_query(self):
+        self.authorization_as_anonymous_user()
+        with self.assertNumQueries(1):
+            response = self.send_request()
+        self.validate_response_body(response)
+        tree = self.response_body["categories_tree"]
+        self.assertEqual(
+            [node["id"] for node in tree], [self.root.id, self.other_root.id]
+        )
+        self.assertEqual(
+            tree[0]["children"][0]["children"][0]["id"], self.grandchild.id
+        )
+
+    def test_reparent_moves_descendants(self):
+        response = self.client.put(
+            self.detail_path(self.child),
+            data={"name": self.child.name, "parent": self.other_root.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f"{self.other_root.id}/{self.child.id}/{self.grandchild.id}/",
+        )
+
+    def test_cant_be_child_of_its_descendants(self):
+        response = self.client.put(
+            self.detail_path(self.root),
+            data={"name": self.root.name, "parent": self.grandchild.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_parent_makes_children_roots(self):
+        self.client.delete(self.detail_path(self.root))
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"{self.child.id}/{self.grandchild.id}/")
+
+    def test_filter_products_including_subcategories(self):
+        product = ProductFactory.customize()
+        product.category = self.grandchild
+        product.save()
+        ProductFactory.customize()
+
+        response = self.client.get(
+            reverse("products:product-list"), {"category": self.root.id}
+        )
+        results = response.json()["results"]
+        self.assertEqual([item["id"] for item in results], [product.id])
+
+    def test_rebuild_paths_command(self):
+        Category.objects.update(path="")
+        call_command("rebuild_category_paths", stdout=StringIO())
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f"{self.root.id}/{self.child.id}/{self.grandchild.id}/",
+        )
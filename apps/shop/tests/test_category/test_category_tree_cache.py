@@ -0,0 +1,107 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.category.category_factory import CategoryFactory
+from apps.shop.models.category import CategoryImage
+from apps.shop.services.category_tree_cache import CategoryTreeCache
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "category-tree-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CategoryTreeCacheTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.root = CategoryFactory()
+        cls.child = CategoryFactory(parent=cls.root)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authorization_as_anonymous_user()
+
+    def api_path(self) -> str:
+        return reverse("categories:category-category-tree")
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+        self.assertIn("ETag", response)
+        self.assertIsInstance(self.response_body["version"], int)
+        self.assertEqual(self.response_body["categories_tree"], payload)
+
+    def expected_tree(self, *roots):
+        return [
+            {"id": root.id, "name": root.name, "children": children}
+            for root, children in roots
+        ]
+
+    def test_tree_is_served_from_cache(self):
+        self.send_request()
+        with self.assertNumQueries(0):
+            response = self.send_request()
+        self.validate_response_body(
+            response,
+            self.expected_tree(
+                (
+                    self.root,
+                    [{"id": self.child.id, "name": self.child.name, "children": []}],
+                )
+            ),
+        )
+
+    def test_not_modified(self):
+        etag = self.send_request()["ETag"]
+        response = self.client.get(self.api_path(), HTTP_IF_NONE_MATCH=etag)
+        self.assertHTTPStatusCode(response, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_category_change_regenerates_tree(self):
+        etag = self.send_request()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            other_root = CategoryFactory()
+
+        response = self.client.get(self.api_path(), HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response["ETag"], etag)
+        self.validate_response_body(
+            response,
+            self.expected_tree(
+                (
+                    self.root,
+                    [{"id": self.child.id, "name": self.child.name, "children": []}],
+                ),
+                (other_root, []),
+            ),
+        )
+
+    def test_new_tree_replaces_the_old_one(self):
+        self.send_request()
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryFactory()
+        self.send_request()
+        self.assertEqual(
+            [key for key in cache._cache if "shop:categories:tree" in key],
+            [cache.make_and_validate_key(CategoryTreeCache.KEY)],
+        )
+
+    def test_category_image_change_regenerates_tree(self):
+        etag = self.send_request()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryImage.objects.create(category=self.root)
+        self.assertNotEqual(self.send_request()["ETag"], etag)
+
+    def test_not_modified_since(self):
+        last_modified = self.send_request()["Last-Modified"]
+        response = self.client.get(
+            self.api_path(), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["Last-Modified"], last_modified)
@@ -0,0 +1,148 @@
+from django.test import TestCase
+
+from apps.shop.models.attribute import Attribute, AttributeItem
+from apps.shop.models.product import ProductAttribute
+from apps.shop.serializers.product_serializers import ProductCreateSerializer
+from apps.shop.services.product.product_data import ProductData
+from apps.shop.services.product.product_service import ProductService
+
+
+class ProductAttributeSyncTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.attributes = Attribute.objects.bulk_create(
+            [Attribute(attribute_name=f"attribute-{n}") for n in range(30)]
+        )
+        AttributeItem.objects.bulk_create(
+            [
+                AttributeItem(attribute=attribute, item_name=f"item-{n}")
+                for attribute in cls.attributes
+                for n in range(3)
+            ]
+        )
+        cls.items = {}
+        for item in AttributeItem.objects.order_by("id"):
+            cls.items.setdefault(item.attribute_id, []).append(item.id)
+
+    def setUp(self):
+        self.product = ProductService.create_product(name="Laptop")
+
+    def sync(self, attributes):
+        ProductService.manage_attributes(
+            ProductData(product=self.product, attributes=attributes)
+        )
+
+    def payload(self, attributes, items=slice(0, 2)) -> list:
+        return [
+            {"attribute_id": attribute.id, "items_id": self.items[attribute.id][items]}
+            for attribute in attributes
+        ]
+
+    def current(self) -> dict:
+        return {
+            product_attribute.attribute_id: sorted(
+                product_attribute.items.values_list("id", flat=True)
+            )
+            for product_attribute in ProductAttribute.objects.filter(
+                product=self.product
+            )
+        }
+
+    def test_sync(self):
+        with self.assertNumQueries(4):
+            self.sync(self.payload(self.attributes))
+        self.assertEqual(
+            self.current(),
+            {
+                attribute.id: self.items[attribute.id][:2]
+                for attribute in self.attributes
+            },
+        )
+
+    def test_only_changed_links_are_written(self):
+        self.sync(self.payload(self.attributes))
+        rows = dict(
+            ProductAttribute.objects.filter(product=self.product).values_list(
+                "attribute_id", "id"
+            )
+        )
+
+        # drop the first attribute, and swap an item of the second one
+        payload = self.payload(self.attributes[1:])
+        payload[0]["items_id"] = self.items[self.attributes[1].id][1:]
+        with self.assertNumQueries(8):
+            self.sync(payload)
+
+        current = self.current()
+        self.assertNotIn(self.attributes[0].id, current)
+        self.assertEqual(
+            current[self.attributes[1].id], self.items[self.attributes[1].id][1:]
+        )
+        # the kept attributes keep their rows
+        self.assertEqual(
+            dict(
+                ProductAttribute.objects.filter(product=self.product).values_list(
+                    "attribute_id", "id"
+                )
+            ),
+            {key: value for key, value in rows.items() if key in current},
+        )
+
+        with self.assertNumQueries(3):
+            self.sync(payload)
+
+    def test_invalid_ids_are_ignored(self):
+        other_item = self.items[self.attributes[1].id][0]
+        self.sync(
+            [
+                {"attribute_id": self.attributes[0].id, "items_id": [other_item]},
+                {"attribute_id": 0, "items_id": []},
+            ]
+        )
+        self.assertEqual(self.current(), {self.attributes[0].id: []})
+
+    def test_attributes_without_items(self):
+        payload = self.payload(self.attributes[:2], items=slice(0, 0))
+        serializer = ProductCreateSerializer(
+            data={"name": "Laptop", "attributes": payload}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        self.sync(payload)
+        self.assertEqual(
+            self.current(), {attribute.id: [] for attribute in self.attributes[:2]}
+        )
+
+    def test_remove_all(self):
+        self.sync(self.payload(self.attributes))
+        self.sync(None)
+        self.assertEqual(self.current(), {})
+
+    def test_serializer_loads_the_attributes_once(self):
+        payload = self.payload(self.attributes)
+        serializer = ProductCreateSerializer(
+            data={"name": "Laptop", "attributes": payload}
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+        # the service reuses the loaded attributes and items
+        with self.assertNumQueries(3):
+            self.sync_validated(serializer.validated_data)
+        self.assertEqual(len(self.current()), 30)
+
+        payload[0]["items_id"].append(self.items[self.attributes[1].id][0])
+        serializer = ProductCreateSerializer(
+            data={"name": "Laptop", "attributes": payload}
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("attributes", serializer.errors)
+
+    def sync_validated(self, validated_data):
+        ProductService.manage_attributes(
+            ProductData(
+                product=self.product,
+                attributes=validated_data["attributes"],
+                attribute_items=validated_data["attribute_items"],
+            )
+        )
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.product import Product
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "product-cache-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductCacheTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.active_product = ProductFactory.customize(is_variable=True)
+        cls.draft_product = ProductFactory.customize(status=Product.STATUS_DRAFT)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authorization_as_anonymous_user()
+
+    def api_path(self) -> str:
+        return reverse("products:product-list")
+
+    def detail_path(self, product_id) -> str:
+        return reverse("products:product-detail", kwargs={"pk": product_id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def test_list_is_served_from_cache(self):
+        first = self.send_request()
+        with self.assertNumQueries(0):
+            second = self.send_request()
+        self.assertEqual(first.json(), second.json())
+
+    def test_retrieve_is_served_from_cache(self):
+        path = self.detail_path(self.active_product.id)
+        first = self.send_request(path)
+        with self.assertNumQueries(0):
+            second = self.send_request(path)
+        self.assertEqual(first.json(), second.json())
+
+    def test_invalid_product_id_is_not_cached(self):
+        response = self.client.get(self.detail_path("abc"))
+        self.assertHTTPStatusCode(response, 404)
+        self.assertIsNone(cache.get("version:shop:product:abc"))
+        self.assertIsNone(cache.get("changed:shop:product:abc"))
+
+        # the namespaces of valid ids expire
+        self.send_request(self.detail_path(self.active_product.id))
+        key = f"version:shop:product:{self.active_product.id}"
+        self.assertIsNotNone(cache._expire_info[cache.make_and_validate_key(key)])
+
+    def test_cache_is_keyed_by_query_params(self):
+        self.send_request()
+        response = self.client.get(self.api_path(), {"status": "draft"})
+        self.assertEqual(response.json()["count"], 0)
+
+    def test_staff_and_public_lists_are_separated(self):
+        public = self.send_request().json()
+        self.authorization_as_admin_user()
+        staff = self.send_request().json()
+        self.assertEqual(staff["count"], public["count"] + 1)
+
+    def test_update_product_invalidates_list_and_detail(self):
+        self.send_request()
+        self.send_request(self.detail_path(self.active_product.id))
+
+        self.authorization_as_admin_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                self.detail_path(self.active_product.id),
+                data={"name": "renamed product", "status": Product.STATUS_ACTIVE},
+                format="json",
+            )
+        self.authorization_as_anonymous_user()
+
+        names = [product["name"] for product in self.send_request().json()["results"]]
+        self.assertIn("renamed product", names)
+        detail = self.send_request(self.detail_path(self.active_product.id)).json()
+        self.assertEqual(detail["name"], "renamed product")
+
+    def test_update_variant_invalidates_detail(self):
+        path = self.detail_path(self.active_product.id)
+        self.send_request(path)
+        variant = self.active_product.variants.first()
+
+        self.authorization_as_admin_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                reverse("variants:variant-detail", kwargs={"pk": variant.id}),
+                data={"price": 42, "stock": 7},
+                format="json",
+            )
+        self.authorization_as_anonymous_user()
+
+        variants = self.send_request(path).json()["variants"]
+        updated = next(item for item in variants if item["id"] == variant.id)
+        self.assertEqual(updated["price"], 42)
+        self.assertEqual(updated["stock"], 7)
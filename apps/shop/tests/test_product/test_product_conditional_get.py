@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.product import Product
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "product-conditional-get-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductConditionalGetTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.product = ProductFactory.customize()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authorization_as_anonymous_user()
+
+    def api_path(self) -> str:
+        return reverse("products:product-list")
+
+    def detail_path(self) -> str:
+        return reverse("products:product-detail", kwargs={"pk": self.product.id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+
+    def update_product(self):
+        self.authorization_as_admin_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                self.detail_path(),
+                data={"name": "renamed product", "status": Product.STATUS_ACTIVE},
+                format="json",
+            )
+        self.authorization_as_anonymous_user()
+
+    def test_validators(self):
+        self.validate_response_body(self.send_request())
+        self.validate_response_body(self.send_request(self.detail_path()))
+
+    def test_not_modified(self):
+        for path in (self.api_path(), self.detail_path()):
+            etag = self.send_request(path)["ETag"]
+            with self.assertNumQueries(0):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+            self.assertHTTPStatusCode(response, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_not_modified_since(self):
+        last_modified = self.send_request(self.detail_path())["Last-Modified"]
+        response = self.client.get(
+            self.detail_path(), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_changes_validators(self):
+        list_etag = self.send_request()["ETag"]
+        detail_etag = self.send_request(self.detail_path())["ETag"]
+        self.update_product()
+
+        response = self.client.get(self.api_path(), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], list_etag)
+        response = self.client.get(self.detail_path(), HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(response.json()["name"], "renamed product")
+
+    def test_etag_depends_on_the_request(self):
+        etag = self.send_request()["ETag"]
+        self.assertNotEqual(
+            self.client.get(self.api_path(), {"status": "draft"})["ETag"], etag
+        )
+        self.authorization_as_admin_user()
+        self.assertNotEqual(self.send_request()["ETag"], etag)
+
+    def test_stale_if_modified_since(self):
+        response = self.client.get(
+            self.detail_path(), HTTP_IF_MODIFIED_SINCE=http_date(0)
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.product import ProductVariantImage
+from apps.shop.serializers.fast_serializers import (
+    FastProductSerializer,
+    FastProductVariantSerializer,
+)
+from apps.shop.serializers.product_serializers import (
+    ProductListSerializer,
+    ProductSerializer,
+    ProductVariantSerializer,
+)
+from apps.shop.services.product.product_repository import ProductRepository
+
+
+class FastProductSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [
+            ProductFactory.customize(
+                is_variable=True, has_image=True, has_attributes=True
+            ),
+            ProductFactory.customize(has_image=True),
+            ProductFactory.customize(),
+        ]
+        product = cls.products[0]
+        image = product.media.first()
+        image.is_main = True
+        image.save()
+        ProductVariantImage.objects.create(
+            product_image=image, variant=product.variants.first()
+        )
+
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def assertParity(self, serializer_class, context: dict, related_fields=None):
+        context = {"request": self.request, **context}
+        products = ProductRepository.get_product_queryset(self.request, related_fields)
+        expected = serializer_class(products, many=True, context=context).data
+        data = FastProductSerializer(
+            products, many=True, context=context, serializer_class=serializer_class
+        ).data
+
+        self.assertEqual(len(data), len(self.products))
+        for fast, drf in zip(data, expected):
+            self.assertEqual(list(fast), list(drf))
+            self.assertEqual(fast, drf)
+
+    def test_product_serializer(self):
+        self.assertParity(ProductSerializer, {})
+
+    def test_sparse_fields(self):
+        self.assertParity(
+            ProductSerializer,
+            {"fields": ["id", "name", "options", "total_stock"]},
+            {"options"},
+        )
+
+    def test_list_serializer(self):
+        self.assertParity(ProductListSerializer, {"expand": []}, {"main_image"})
+        self.assertParity(
+            ProductListSerializer,
+            {"expand": ["variants", "attributes", "images"]},
+            {"main_image", "variants", "attributes", "images"},
+        )
+
+    def test_variant_serializer(self):
+        variants = self.products[0].variants.all()
+        for context in ({}, {"request": self.request}):
+            self.assertEqual(
+                FastProductVariantSerializer(variants, many=True, context=context).data,
+                ProductVariantSerializer(variants, many=True, context=context).data,
+            )
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_serializers", iterations=2, stdout=out)
+        self.assertIn("products: 3", out.getvalue())
@@ -0,0 +1,110 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.shop.models.product import Product, ProductAttribute
+from apps.shop.services.product.product_bitmap_index import ProductBitmapIndex
+from apps.shop.services.product.product_service import ProductService
+from apps.shop.tests.test_product.test_product_filter import test_facet_product
+
+
+@override_settings(PRODUCT_BITMAP_INDEX=True)
+class BitmapIndexTest(test_facet_product.FacetProductTest):
+    """The filter tests of `FacetProductTest` run again through the index."""
+
+    def setUp(self):
+        super().setUp()
+        ProductBitmapIndex.reset()
+
+    def tearDown(self):
+        ProductBitmapIndex.reset()
+        super().tearDown()
+
+    def test_match(self):
+        self.assertEqual(
+            ProductBitmapIndex.match_attribute_items(
+                [[self.cotton.id, self.wool.id], [self.slim.id]]
+            ),
+            [self.shirt.id],
+        )
+        self.assertEqual(
+            ProductBitmapIndex.match_option_items([[("color", "red")]]),
+            [self.shirt.id, self.sweater.id],
+        )
+        self.assertEqual(ProductBitmapIndex.match_option_items([[("color", "x")]]), [])
+
+    def test_disabled(self):
+        with override_settings(PRODUCT_BITMAP_INDEX=False):
+            self.assertIsNone(ProductBitmapIndex.match_attribute_items([[1]]))
+
+    def test_large_results_fall_back_to_joins(self):
+        with mock.patch.object(ProductBitmapIndex, "MAX_MATCHED_IDS", 1):
+            self.assertIsNone(
+                ProductBitmapIndex.match_option_items([[("color", "red")]])
+            )
+            self.assertEqual(
+                self.product_ids(options="color:red"), {self.shirt.id, self.sweater.id}
+            )
+
+    def test_service_writes_are_indexed_on_commit(self):
+        ProductBitmapIndex.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductService.update_product(
+                self.sandals,
+                options=[{"option_name": "color", "items": ["red"]}],
+                attributes=[
+                    {"attribute_id": self.wool.attribute_id, "items_id": [self.wool.id]}
+                ],
+            )
+        self.assertEqual(
+            ProductBitmapIndex.match_option_items([[("color", "red")]]),
+            [self.shirt.id, self.sweater.id, self.sandals.id],
+        )
+        self.assertEqual(
+            ProductBitmapIndex.match_attribute_items([[self.wool.id]]),
+            [self.sweater.id, self.sandals.id],
+        )
+
+    def test_reindex_replaces_the_previous_keys(self):
+        ProductBitmapIndex.rebuild()
+        for color in ["teal", "red"]:
+            with self.captureOnCommitCallbacks(execute=True):
+                ProductService.update_product(
+                    self.sandals, options=[{"option_name": "color", "items": [color]}]
+                )
+        self.assertNotIn(("color", "teal"), ProductBitmapIndex._option_items)
+        self.assertEqual(
+            ProductBitmapIndex._product_keys[self.sandals.id][1], [("color", "red")]
+        )
+        self.assertEqual(
+            ProductBitmapIndex.match_option_items([[("color", "red")]]),
+            [self.shirt.id, self.sweater.id, self.sandals.id],
+        )
+
+    def test_writes_of_other_processes_are_polled(self):
+        ProductBitmapIndex.rebuild()
+        # written without the service, like another process would
+        ProductAttribute.objects.get(
+            product=self.sweater, attribute_id=self.wool.attribute_id
+        ).items.set([self.cotton])
+        Product.objects.filter(pk=self.sweater.pk).update(updated_at=timezone.now())
+
+        self.assertEqual(
+            ProductBitmapIndex.match_attribute_items([[self.cotton.id]]),
+            [self.shirt.id],
+        )
+        ProductBitmapIndex._next_refresh = 0
+        self.assertEqual(
+            ProductBitmapIndex.match_attribute_items([[self.cotton.id]]),
+            [self.shirt.id, self.sweater.id],
+        )
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_bitmap_index", products=1000, queries=10, stdout=out)
+        self.assertIn("products: 1000", out.getvalue())
+        call_command("benchmark_bitmap_index", database=True, queries=10, stdout=out)
+        self.assertIn("rebuild from the database", out.getvalue())
@@ -0,0 +1,149 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.shop.models.attribute import Attribute, AttributeItem
+from apps.shop.models.category import Category
+from apps.shop.models.product import Product
+from apps.shop.services.product.product_service import ProductService
+
+
+class FacetProductTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shirts = Category.objects.create(name="Shirts")
+        cls.shoes = Category.objects.create(name="Shoes")
+        material = Attribute.objects.create(attribute_name="material")
+        fit = Attribute.objects.create(attribute_name="fit")
+        cls.cotton = AttributeItem.objects.create(
+            attribute=material, item_name="cotton"
+        )
+        cls.wool = AttributeItem.objects.create(attribute=material, item_name="wool")
+        cls.slim = AttributeItem.objects.create(attribute=fit, item_name="slim")
+
+        cls.shirt = ProductService.create_product(
+            name="Shirt",
+            status=Product.STATUS_ACTIVE,
+            category=cls.shirts,
+            price=20,
+            options=[
+                {"option_name": "color", "items": ["red", "blue"]},
+                {"option_name": "size", "items": ["S"]},
+            ],
+            attributes=[
+                {"attribute_id": material.id, "items_id": [cls.cotton.id]},
+                {"attribute_id": fit.id, "items_id": [cls.slim.id]},
+            ],
+        )
+        cls.sweater = ProductService.create_product(
+            name="Sweater",
+            status=Product.STATUS_ACTIVE,
+            category=cls.shirts,
+            price=75,
+            options=[{"option_name": "color", "items": ["red"]}],
+            attributes=[{"attribute_id": material.id, "items_id": [cls.wool.id]}],
+        )
+        cls.sandals = ProductService.create_product(
+            name="Sandals", status=Product.STATUS_ACTIVE, category=cls.shoes, price=5
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_list(self, **params) -> dict:
+        response = self.client.get(reverse("products:product-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def product_ids(self, **params) -> set:
+        return {product["id"] for product in self.get_list(**params)["results"]}
+
+    def test_facets(self):
+        facets = self.get_list(facets="")["facets"]
+        self.assertEqual(
+            facets["attributes"],
+            [
+                {
+                    "attribute_id": self.slim.attribute_id,
+                    "attribute_name": "fit",
+                    "items": [
+                        {"item_id": self.slim.id, "item_name": "slim", "count": 1}
+                    ],
+                },
+                {
+                    "attribute_id": self.cotton.attribute_id,
+                    "attribute_name": "material",
+                    "items": [
+                        {"item_id": self.cotton.id, "item_name": "cotton", "count": 1},
+                        {"item_id": self.wool.id, "item_name": "wool", "count": 1},
+                    ],
+                },
+            ],
+        )
+        self.assertEqual(
+            facets["options"],
+            [
+                {
+                    "option_name": "color",
+                    "items": [
+                        {"item_name": "blue", "count": 1},
+                        {"item_name": "red", "count": 2},
+                    ],
+                },
+                {"option_name": "size", "items": [{"item_name": "S", "count": 1}]},
+            ],
+        )
+        self.assertEqual(
+            facets["category"],
+            [
+                {"category_id": self.shirts.id, "category_name": "Shirts", "count": 2},
+                {"category_id": self.shoes.id, "category_name": "Shoes", "count": 1},
+            ],
+        )
+        self.assertEqual(
+            [bucket["count"] for bucket in facets["price"]], [1, 1, 1, 0, 0, 0]
+        )
+        self.assertEqual(facets["price"][-1]["max_price"], None)
+
+    def test_facets_of_the_filtered_list(self):
+        facets = self.get_list(category=self.shirts.id, facets="category,price")[
+            "facets"
+        ]
+        self.assertEqual(set(facets), {"category", "price"})
+        self.assertEqual(facets["category"][0]["count"], 2)
+        self.assertEqual(sum(bucket["count"] for bucket in facets["price"]), 2)
+
+    def test_no_facets_by_default(self):
+        self.assertNotIn("facets", self.get_list())
+
+    def test_facets_are_bounded_aggregate_queries(self):
+        with CaptureQueriesContext(connection) as without_facets:
+            self.get_list()
+        cache.clear()
+        with CaptureQueriesContext(connection) as with_facets:
+            self.get_list(facets="")
+        self.assertEqual(len(with_facets) - len(without_facets), 4)
+
+    def test_filter_attribute_items(self):
+        self.assertEqual(
+            self.product_ids(attribute_items=f"{self.cotton.id},{self.wool.id}"),
+            {self.shirt.id, self.sweater.id},
+        )
+        self.assertEqual(
+            self.product_ids(attribute_items=f"{self.wool.id},{self.slim.id}"), set()
+        )
+        self.assertEqual(self.product_ids(attribute_items="0"), set())
+        self.assertEqual(
+            self.product_ids(attribute_items=f"²,{self.cotton.id}"), {self.shirt.id}
+        )
+
+    def test_filter_options(self):
+        self.assertEqual(
+            self.product_ids(options="color:red"), {self.shirt.id, self.sweater.id}
+        )
+        self.assertEqual(
+            self.product_ids(options="color:blue,color:red,size:S"), {self.shirt.id}
+        )
@@ -0,0 +1,116 @@
+import json
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.shop.models.product import Product
+from apps.shop.services.product.product_search import (
+    BasicProductSearch,
+    PostgresProductSearch,
+    ProductSearch,
+    normalize_search_text,
+)
+from apps.shop.services.product.product_service import ProductService
+
+
+class SearchProductTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shirt = ProductService.create_product(
+            name="Cotton Shirt",
+            description="A light summer shirt",
+            status=Product.STATUS_ACTIVE,
+        )
+        cls.trousers = ProductService.create_product(
+            name="Linen Trousers",
+            description="Goes well with a cotton shirt",
+            status=Product.STATUS_ACTIVE,
+        )
+        cls.farsi = ProductService.create_product(
+            name="کیف چرمی",
+            description="کیف دستی زنانه",
+            status=Product.STATUS_ACTIVE,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, term: str, **params) -> list[int]:
+        response = self.client.get(
+            reverse("products:product-list"), {"search": term, **params}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product["id"] for product in response.json()["results"]]
+
+    def test_search(self):
+        self.assertCountEqual(self.search("cotton"), [self.shirt.id, self.trousers.id])
+        self.assertEqual(self.search("linen cotton"), [self.trousers.id])
+        self.assertEqual(self.search("چرمی"), [self.farsi.id])
+        self.assertEqual(self.search("jacket"), [])
+
+    def test_empty_search(self):
+        self.assertEqual(len(self.search(" ")), 3)
+
+    def test_ordering_overrides_relevance(self):
+        self.assertEqual(
+            self.search("shirt", ordering="-name"), [self.trousers.id, self.shirt.id]
+        )
+
+    def test_normalize_search_text(self):
+        # Arabic yeh and kaf, a zero-width non-joiner, diacritics and Farsi digits
+        self.assertEqual(normalize_search_text("كيف"), "کیف")
+        self.assertEqual(normalize_search_text("می‌خواهم"), "می خواهم")
+        self.assertEqual(normalize_search_text("كِتابـ"), "کتاب")
+        self.assertEqual(normalize_search_text("۱۲٣"), "123")
+        self.assertEqual(normalize_search_text(None), "")
+
+    def test_backend_setting(self):
+        with override_settings(PRODUCT_SEARCH_BACKEND="auto"):
+            backend_class = (
+                PostgresProductSearch
+                if connection.vendor == "postgresql"
+                else BasicProductSearch
+            )
+            self.assertIsInstance(ProductSearch.backend(), backend_class)
+        with override_settings(PRODUCT_SEARCH_BACKEND="postgres"):
+            self.assertIsInstance(ProductSearch.backend(), PostgresProductSearch)
+        with override_settings(
+            PRODUCT_SEARCH_BACKEND=(
+                "apps.shop.services.product.product_search.BasicProductSearch"
+            )
+        ):
+            self.assertIsInstance(ProductSearch.backend(), BasicProductSearch)
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command("rebuild_search_vectors", stdout=out)
+        self.assertIn("3 products", out.getvalue())
+
+
+@skipUnless(connection.vendor == "postgresql", "full-text search needs PostgreSQL")
+class PostgresSearchProductTest(SearchProductTest):
+    def test_name_matches_rank_first(self):
+        self.assertEqual(self.search("shirt"), [self.shirt.id, self.trousers.id])
+
+    def test_typo(self):
+        self.assertEqual(self.search("trousrs"), [self.trousers.id])
+
+    def test_arabic_characters(self):
+        self.assertEqual(self.search("كيف"), [self.farsi.id])
+
+    def test_vector_is_updated_on_save(self):
+        self.shirt.name = "Wool Sweater"
+        self.shirt.save()
+        self.assertEqual(self.search("sweater"), [self.shirt.id])
+
+    def test_vector_is_written_on_import(self):
+        lines = [json.dumps({"name": "Silk Scarf", "status": "active"}) + "\n"]
+        ProductService.import_products(lines, "jsonl")
+        self.assertEqual(Product.objects.filter(search_vector__isnull=False).count(), 4)
+        self.assertEqual(len(self.search("scarf")), 1)
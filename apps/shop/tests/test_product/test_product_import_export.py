@@ -0,0 +1,212 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIPostTestCaseMixin
+from apps.shop.demo.factory.category.category_factory import CategoryFactory
+from apps.shop.models.attribute import Attribute, AttributeItem
+from apps.shop.models.product import Product, ProductVariant
+from apps.shop.services.product.product_service import ProductService
+
+
+class ProductImportExportTest(APIPostTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = CategoryFactory(slug="shirts")
+        cls.attribute = Attribute.objects.create(attribute_name="material")
+        AttributeItem.objects.bulk_create(
+            [
+                AttributeItem(attribute=cls.attribute, item_name=name)
+                for name in ["cotton", "wool"]
+            ]
+        )
+
+    def api_path(self) -> str:
+        return reverse("products:product-import-products")
+
+    def validate_response_body(self, response, payload):
+        super().validate_response_body(response, payload)
+
+    @staticmethod
+    def record(**fields) -> dict:
+        return {
+            "name": "T-Shirt",
+            "status": "active",
+            "category": "shirts",
+            "price": "10.00",
+            "stock": 5,
+            "sku": "TS",
+            "options": [
+                {"option_name": "color", "items": ["red", "blue"]},
+                {"option_name": "size", "items": ["S", "M"]},
+            ],
+            "attributes": [{"attribute": "material", "items": ["cotton"]}],
+            "variants": [{"options": ["red", "S"], "price": "12.50", "stock": 1}],
+            **fields,
+        }
+
+    def import_jsonl(self, records, **kwargs):
+        lines = [json.dumps(record) + "\n" for record in records]
+        return ProductService.import_products(lines, "jsonl", **kwargs)
+
+    def test_import(self):
+        with self.assertNumQueries(11):
+            result = self.import_jsonl(
+                [self.record(slug=f"t-shirt-{n}") for n in range(3)], chunk_size=10
+            )
+        self.assertEqual((result.created, result.skipped, result.errors), (3, 0, []))
+
+        product = Product.objects.get(slug="t-shirt-0")
+        self.assertEqual(product.category, self.category)
+        self.assertIsNotNone(product.published_at)
+        self.assertEqual(product.min_price, Decimal("10.00"))
+        self.assertEqual(product.max_price, Decimal("12.50"))
+        self.assertEqual(product.total_stock, 1 + 5 * 3)
+        self.assertEqual(product.options.count(), 2)
+        self.assertEqual(
+            list(
+                product.productattribute_set.get().items.values_list(
+                    "item_name", flat=True
+                )
+            ),
+            ["cotton"],
+        )
+
+        variant = ProductVariant.objects.get(
+            product=product, option1__item_name="red", option2__item_name="S"
+        )
+        self.assertEqual((variant.price, variant.stock), (Decimal("12.50"), 1))
+        self.assertEqual(product.variants.count(), 4)
+
+    def test_import_reports_invalid_records(self):
+        result = self.import_jsonl(
+            [
+                self.record(),
+                self.record(name=""),
+                self.record(category="unknown"),
+                self.record(attributes=[{"attribute": "material", "items": ["silk"]}]),
+                self.record(stock=-1),
+                self.record(status="hidden"),
+            ]
+        )
+        self.assertEqual((result.created, result.skipped), (1, 5))
+        self.assertEqual([line for line, _ in result.errors], [2, 3, 4, 5, 6])
+        self.assertEqual(result.errors[-1][1], 'Unknown status "hidden".')
+
+    def test_import_reports_values_of_the_wrong_type(self):
+        records = [
+            self.record(category=["shirts"]),
+            self.record(status=["active"]),
+            self.record(attributes=[{"attribute": ["material"]}]),
+            self.record(attributes=[{"attribute": "material", "items": 5}]),
+            self.record(attributes=[{"attribute": "material", "items": [["cotton"]]}]),
+            self.record(options=[{"option_name": ["color"], "items": ["red"]}]),
+            self.record(variants=[{"options": 5}]),
+            self.record(variants=[{"options": ["red", "S"], "sku": ["TS"]}]),
+            self.record(price="NaN"),
+            self.record(stock=1e400),
+        ]
+        result = self.import_jsonl(records)
+        self.assertEqual((result.created, result.skipped), (0, len(records)))
+        self.assertEqual(
+            [line for line, _ in result.errors], list(range(1, len(records) + 1))
+        )
+
+    def test_import_allocates_slugs(self):
+        result = self.import_jsonl([self.record(), self.record()])
+        self.assertEqual(result.created, 2)
+        self.assertEqual(
+            sorted(Product.objects.values_list("slug", flat=True)),
+            ["t-shirt", "t-shirt-1"],
+        )
+
+    def test_import_existing_slug(self):
+        self.import_jsonl([self.record(slug="t-shirt")])
+
+        result = self.import_jsonl([self.record(slug="t-shirt", name="Renamed")])
+        self.assertEqual((result.created, result.skipped), (0, 1))
+
+        result = self.import_jsonl(
+            [self.record(slug="t-shirt", name="Renamed", price="20")],
+            update_existing=True,
+        )
+        self.assertEqual(result.updated, 1)
+        product = Product.objects.get(slug="t-shirt")
+        self.assertEqual(product.name, "Renamed")
+        self.assertEqual(product.min_price, Decimal("12.50"))
+        self.assertEqual(product.max_price, Decimal("20.00"))
+
+    def test_export_round_trip(self):
+        self.import_jsonl([self.record(slug="t-shirt")])
+
+        for file_format in ProductService.FILE_FORMATS:
+            exported = "".join(ProductService.export_products(file_format))
+            Product.objects.all().delete()
+
+            result = ProductService.import_products(
+                StringIO(exported, newline=""), file_format
+            )
+            self.assertEqual((result.created, result.errors), (1, []))
+            self.assertEqual(
+                "".join(ProductService.export_products(file_format)), exported
+            )
+
+    def test_import_endpoint(self):
+        upload = SimpleUploadedFile(
+            "products.jsonl", json.dumps(self.record()).encode("utf-8")
+        )
+        response = self.client.post(self.api_path(), {"file": upload})
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(response.json()["created"], 1)
+
+    def test_import_endpoint_with_unreadable_file(self):
+        csv_file = "name,description\nT-Shirt,%s\n" % ("x" * 200_000)
+        for name, content in [
+            ("products.jsonl", b"\xff\xfe not utf-8"),
+            ("products.csv", csv_file.encode("utf-8")),
+        ]:
+            upload = SimpleUploadedFile(name, content)
+            response = self.client.post(self.api_path(), {"file": upload})
+            self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("Line ", response.json()["file"])
+        self.assertFalse(Product.objects.exists())
+
+    def test_import_endpoint_by_regular_user(self):
+        self.authorization_as_regular_user()
+        upload = SimpleUploadedFile("products.jsonl", b"")
+        response = self.client.post(self.api_path(), {"file": upload})
+        self.assertHTTPStatusCode(response, status.HTTP_403_FORBIDDEN)
+
+    def test_export_endpoint(self):
+        self.import_jsonl([self.record(slug="t-shirt")])
+        response = self.client.get(
+            reverse("products:product-export-products"), {"file_format": "jsonl"}
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        records = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(records[0])["slug"], "t-shirt")
+
+    def test_commands(self):
+        self.import_jsonl([self.record(slug="t-shirt")])
+        out = StringIO()
+        call_command("export_products", format="jsonl", stdout=out)
+        Product.objects.all().delete()
+
+        path = self.tmp_path("products.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(out.getvalue())
+        out = StringIO()
+        call_command("import_products", path, stdout=out, stderr=StringIO())
+        self.assertIn("Created 1, updated 0, skipped 0 products.", out.getvalue())
+
+    def tmp_path(self, name: str) -> str:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return f"{directory.name}/{name}"
@@ -0,0 +1,88 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.shop.models.product import ProductOption, ProductOptionItem
+from apps.shop.services.product.product_data import ProductData
+from apps.shop.services.product.product_service import ProductService
+
+
+class ProductOptionSyncTest(TestCase):
+    def setUp(self):
+        self.product = ProductService.create_product(
+            name="T-Shirt",
+            options=[
+                {"option_name": "color", "items": ["red", "blue"]},
+                {"option_name": "size", "items": ["S", "M"]},
+            ],
+        )
+
+    def sync(self, options):
+        ProductService.manage_options(
+            ProductData(product=self.product, options=options)
+        )
+
+    def current_options(self) -> dict:
+        options = {}
+        for option_name, item_name in ProductOptionItem.objects.filter(
+            option__product=self.product
+        ).values_list("option__option_name", "item_name"):
+            options.setdefault(option_name, set()).add(item_name)
+        return options
+
+    def test_reconcile(self):
+        item_id = ProductOptionItem.objects.get(item_name="red").id
+        self.sync(
+            [
+                {"option_name": "color", "items": ["red", "green"]},
+                {"option_name": "material", "items": ["cotton"]},
+            ]
+        )
+        self.assertEqual(
+            self.current_options(),
+            {"color": {"red", "green"}, "material": {"cotton"}},
+        )
+        # the kept items keep their rows
+        self.assertEqual(ProductOptionItem.objects.get(item_name="red").id, item_id)
+
+    def test_constant_number_of_queries(self):
+        def count_queries(options) -> int:
+            with CaptureQueriesContext(connection) as queries:
+                self.sync(options)
+            return len(queries)
+
+        one_option = count_queries(
+            [
+                {"option_name": "color", "items": ["red", "green"]},
+                {"option_name": "size", "items": ["S", "M"]},
+            ]
+        )
+        all_options = count_queries(
+            [
+                {"option_name": "color", "items": ["red", "black"]},
+                {"option_name": "size", "items": ["L", "XL", "XXL"]},
+                {"option_name": "fit", "items": ["slim", "regular"]},
+            ]
+        )
+        self.assertEqual(all_options, one_option + 1)  # the new option is inserted
+
+        with self.assertNumQueries(1):
+            self.sync(
+                [
+                    {"option_name": "color", "items": ["red", "black"]},
+                    {"option_name": "size", "items": ["L", "XL", "XXL"]},
+                    {"option_name": "fit", "items": ["slim", "regular"]},
+                ]
+            )
+
+    def test_max_options(self):
+        with self.assertRaises(ValidationError):
+            self.sync(
+                [{"option_name": f"option-{n}", "items": ["a"]} for n in range(4)]
+            )
+        self.assertEqual(ProductOption.objects.filter(product=self.product).count(), 2)
+
+    def test_remove_all_options(self):
+        self.sync(None)
+        self.assertEqual(self.current_options(), {})
@@ -0,0 +1,78 @@
+from django.urls import reverse
+from rest_framework import status
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.attribute.attribute_factory import AttributeFactory
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.attribute import Attribute
+from apps.shop.paginations import DefaultPagination
+
+
+class KeysetPaginationTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.products_count = DefaultPagination.page_size + 3
+        cls.products = [ProductFactory.customize() for _ in range(cls.products_count)]
+
+    def api_path(self) -> str:
+        return reverse("products:product-list")
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+        self.assertEqual(
+            set(self.response_body.keys()), {"next", "previous", "results"}
+        )
+
+    def test_page_number_pagination_is_the_default(self):
+        response = self.send_request()
+        self.assertHTTPStatusCode(response)
+        self.assertEqual(response.json()["count"], self.products_count)
+
+    def test_walk_all_pages_forward_and_back(self):
+        response = self.client.get(self.api_path(), {"pagination": "cursor"})
+        self.validate_response_body(response)
+        self.assertIsNone(self.response_body["previous"])
+        first_page = [product["id"] for product in self.response_body["results"]]
+        self.assertEqual(len(first_page), DefaultPagination.page_size)
+
+        response = self.send_request(self.response_body["next"])
+        self.validate_response_body(response)
+        self.assertIsNone(self.response_body["next"])
+        second_page = [product["id"] for product in self.response_body["results"]]
+        self.assertEqual(len(second_page), 3)
+
+        # every product shows up exactly once, newest first
+        expected = [product.id for product in reversed(self.products)]
+        self.assertEqual(first_page + second_page, expected)
+
+        response = self.send_request(self.response_body["previous"])
+        self.validate_response_body(response)
+        self.assertEqual(
+            [product["id"] for product in self.response_body["results"]], first_page
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            self.api_path(), {"pagination": "cursor", "cursor": "not-a-cursor"}
+        )
+        self.assertHTTPStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_ordering_or_search(self):
+        for params in ({"ordering": "name"}, {"search": "shirt"}):
+            response = self.client.get(
+                self.api_path(), {"pagination": "cursor", **params}
+            )
+            self.assertHTTPStatusCode(response, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("pagination", response.json())
+
+    def test_attributes_keyset_pagination(self):
+        AttributeFactory.generate_multiple()
+        response = self.client.get(
+            reverse("attributes:attribute-list"), {"pagination": "cursor"}
+        )
+        self.validate_response_body(response)
+        self.assertEqual(
+            len(self.response_body["results"]),
+            min(Attribute.objects.count(), DefaultPagination.page_size),
+        )
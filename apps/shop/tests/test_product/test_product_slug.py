@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from apps.core.services.slug_service import SlugService
+from apps.shop.models.category import Category
+from apps.shop.models.product import Product
+
+
+class SlugServiceTest(TestCase):
+    def test_product_slugs(self):
+        slugs = [Product.objects.create(name="T-Shirt").slug for _ in range(3)]
+        self.assertEqual(slugs, ["t-shirt", "t-shirt-1", "t-shirt-2"])
+
+    def test_explicit_slug_is_kept(self):
+        product = Product.objects.create(name="T-Shirt", slug="custom")
+        self.assertEqual(product.slug, "custom")
+
+    def test_unicode_slug(self):
+        product = Product.objects.create(name="پیراهن مردانه")
+        self.assertEqual(product.slug, "پیراهن-مردانه")
+
+    def test_one_query_regardless_of_collisions(self):
+        Product.objects.bulk_create(
+            [Product(name="T-Shirt", slug="t-shirt")]
+            + [Product(name="T-Shirt", slug=f"t-shirt-{n}") for n in range(1, 200)]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(SlugService.allocate(Product, "T-Shirt"), "t-shirt-200")
+
+    def test_next_suffix_after_the_highest(self):
+        for slug in ["t-shirt", "t-shirt-3", "t-shirt-blue", "t-shirt-10"]:
+            Product.objects.create(name="T-Shirt", slug=slug)
+        self.assertEqual(SlugService.allocate(Product, "T-Shirt"), "t-shirt-11")
+
+    def test_base_is_reused_when_free(self):
+        Product.objects.create(name="T-Shirt", slug="t-shirt-1")
+        self.assertEqual(SlugService.allocate(Product, "T-Shirt"), "t-shirt")
+
+    def test_allocate_many(self):
+        Product.objects.create(name="Shirt")
+        with self.assertNumQueries(1):
+            slugs = SlugService.allocate_many(
+                Product, ["Shirt", "Hat", "Shirt", "Hat"], reserved={"hat-1"}
+            )
+        self.assertEqual(slugs, ["shirt-1", "hat", "shirt-2", "hat-2"])
+
+    def test_long_name(self):
+        product = Product.objects.create(name="a" * 300)
+        self.assertLessEqual(len(product.slug), 255)
+        self.assertEqual(
+            Product.objects.create(name="a" * 300).slug, f"{product.slug}-1"
+        )
+
+    def test_retry_when_the_slug_is_taken_concurrently(self):
+        Product.objects.create(name="T-Shirt")
+        # a stale allocation, as if another writer took the slug after the query ran
+        with mock.patch.object(
+            SlugService, "allocate", side_effect=["t-shirt", "t-shirt-1"]
+        ):
+            product = Product.objects.create(name="T-Shirt")
+        self.assertEqual(product.slug, "t-shirt-1")
+
+    def test_other_integrity_errors_are_raised(self):
+        with self.assertRaises(IntegrityError):
+            SlugService.save_with_slug(
+                Product(name="T-Shirt", slug="t-shirt"),
+                mock.Mock(side_effect=IntegrityError),
+            )
+
+    def test_category_slugs(self):
+        Category.objects.create(name="Shoes!")
+        category = Category.objects.create(name="Shoes?")
+        self.assertEqual(category.slug, "shoes-1")
+        self.assertEqual(category.path, f"{category.pk}/")
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+
+
+class ProductSparseFieldsTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.products = [
+            ProductFactory.customize(is_variable=True, has_image=True) for _ in range(3)
+        ]
+        for product in cls.products:
+            product.media.filter(pk=product.media.first().pk).update(is_main=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def api_path(self) -> str:
+        return reverse("products:product-list")
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+
+    def get_products(self, query: str) -> list:
+        response = self.send_request(f"{self.api_path()}?{query}")
+        self.validate_response_body(response)
+        return self.response_body["results"]
+
+    def test_fields(self):
+        for product in self.get_products("fields=id,name,price,unknown"):
+            self.assertEqual(set(product), {"id", "name", "price"})
+
+    def test_fields_on_retrieve(self):
+        path = reverse("products:product-detail", kwargs={"pk": self.products[0].pk})
+        response = self.send_request(f"{path}?fields=id,options")
+        self.validate_response_body(response)
+        self.assertEqual(set(self.response_body), {"id", "options"})
+        self.assertEqual(len(self.response_body["options"]), 3)
+
+    def test_compact(self):
+        for product in self.get_products("expand="):
+            self.assertEqual(
+                set(product),
+                {
+                    "id",
+                    "name",
+                    "slug",
+                    "status",
+                    "category",
+                    "price",
+                    "total_stock",
+                    "main_image",
+                    "published_at",
+                },
+            )
+            self.assertEqual(set(product["main_image"]), {"id", "src", "alt"})
+
+    def test_expand(self):
+        products = self.get_products("expand=variants&fields=id,variants,main_image")
+        for product in products:
+            self.assertEqual(set(product), {"id", "variants", "main_image"})
+            self.assertTrue(product["variants"])
+
+    def test_unused_relations_are_not_prefetched(self):
+        # the user, the count, the products and the main images
+        with self.assertNumQueries(4):
+            self.get_products("expand=")
+        cache.clear()
+        with self.assertNumQueries(3):
+            self.get_products("fields=id,name,price")
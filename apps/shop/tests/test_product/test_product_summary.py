@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.core.tests.mixin import APIGetTestCaseMixin
+from apps.shop.demo.factory.product.product_factory import ProductFactory
+from apps.shop.models.product import Product
+
+
+class ProductSummaryTest(APIGetTestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.product = ProductFactory.customize(is_variable=True, stock=5)
+        cls.variants = list(cls.product.variants.order_by("id"))
+        cls.cheap_product = ProductFactory.customize(stock=1)
+
+    def api_path(self) -> str:
+        return reverse("products:product-detail", kwargs={"pk": self.product.id})
+
+    def validate_response_body(self, response, payload: dict = None):
+        super().validate_response_body(response, payload)
+        self.assertEqual(self.response_body["price"], payload["price"])
+        self.assertEqual(self.response_body["total_stock"], payload["total_stock"])
+
+    def update_variant(self, variant, price, stock):
+        return self.client.put(
+            reverse("variants:variant-detail", kwargs={"pk": variant.id}),
+            data={"price": price, "stock": stock},
+            format="json",
+        )
+
+    def test_summary_is_set_on_create(self):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_stock, 5 * len(self.variants))
+        self.assertEqual(self.product.min_price, self.product.max_price)
+
+    def test_summary_follows_variant_update(self):
+        self.update_variant(self.variants[0], 1, 100)
+        self.update_variant(self.variants[1], 999, 0)
+
+        response = self.send_request()
+        self.validate_response_body(
+            response,
+            {
+                "price": {"min_price": 1, "max_price": 999},
+                "total_stock": 100 + 5 * (len(self.variants) - 2),
+            },
+        )
+
+    def test_filter_and_order_by_price(self):
+        self.update_variant(self.variants[0], 5000, 5)
+        response = self.client.get(
+            reverse("products:product-list"), {"variants__price__gt": 4999}
+        )
+        results = response.json()["results"]
+        self.assertEqual([product["id"] for product in results], [self.product.id])
+
+        response = self.client.get(
+            reverse("products:product-list"), {"ordering": "-max_price"}
+        )
+        self.assertEqual(response.json()["results"][0]["id"], self.product.id)
+
+    def test_order_by_variant_fields(self):
+        self.update_variant(self.variants[0], 5000, 500)
+        list_path = reverse("products:product-list")
+        for ordering in ("-variants__price", "-variants__stock"):
+            response = self.client.get(list_path, {"ordering": ordering})
+            self.assertEqual(response.json()["results"][0]["id"], self.product.id)
+        response = self.client.get(list_path, {"ordering": "variants__stock"})
+        self.assertEqual(response.json()["results"][0]["id"], self.cheap_product.id)
+
+    def test_rebuild_command(self):
+        Product.objects.update(min_price=None, max_price=None, total_stock=0)
+        call_command("rebuild_product_summaries", stdout=StringIO())
+        self.cheap_product.refresh_from_db()
+        self.assertEqual(self.cheap_product.total_stock, 1)
+        self.assertIsNotNone(self.cheap_product.min_price)
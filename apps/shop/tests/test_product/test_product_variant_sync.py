@@ -0,0 +1,115 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from apps.shop.models.product import ProductVariant
+from apps.shop.services.product.product_data import ProductData
+from apps.shop.services.product.product_service import ProductService
+
+
+class ProductVariantSyncTest(TestCase):
+    def setUp(self):
+        self.options = [
+            {"option_name": "color", "items": [f"color-{n}" for n in range(10)]},
+            {"option_name": "size", "items": [f"size-{n}" for n in range(10)]},
+            {"option_name": "material", "items": [f"material-{n}" for n in range(10)]},
+        ]
+        self.product = ProductService.create_product(
+            name="T-Shirt", price=10, stock=5, options=self.options
+        )
+
+    def variants(self):
+        return ProductVariant.objects.filter(product=self.product)
+
+    def sync(self, **data):
+        product_data = ProductData(product=self.product, **data)
+        ProductService.manage_options(product_data)
+        return ProductService.manage_variants(product_data)
+
+    def test_create(self):
+        self.assertEqual(self.variants().count(), 1000)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_stock, 5000)
+
+    def test_resync_without_changes(self):
+        with self.assertNumQueries(4):  # 2 of them are the savepoint
+            result = ProductService.manage_variants(ProductData(product=self.product))
+        self.assertEqual((result.created, result.updated, result.deleted), (0, 0, 0))
+
+    def test_existing_variants_are_kept(self):
+        variant = self.variants().first()
+        variant.price, variant.stock = 99, 1
+        variant.save()
+
+        self.options[0]["items"].append("color-10")
+        result = self.sync(options=self.options)
+        self.assertEqual((result.created, result.updated, result.deleted), (100, 0, 0))
+
+        variant.refresh_from_db()
+        self.assertEqual((variant.price, variant.stock), (99, 1))
+
+    def test_provided_values_update_existing_variants(self):
+        variant = self.variants().first()
+        variant.price = 20
+        variant.save()
+
+        self.options[0]["items"].append("color-10")
+        result = self.sync(options=self.options, price=20, stock=2)
+        # the first variant only differs by its stock
+        self.assertEqual(
+            (result.created, result.updated, result.deleted), (100, 1000, 0)
+        )
+        self.assertEqual(self.variants().filter(price=20, stock=2).count(), 1100)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_stock, 2200)
+
+        variant.stock = 2
+        variant.sku = "TS"
+        variant.save()
+        result = self.sync(options=self.options, price=20, stock=2)
+        self.assertEqual((result.created, result.updated, result.deleted), (0, 0, 0))
+        variant.refresh_from_db()
+        self.assertEqual(variant.sku, "TS")
+
+    def test_removed_combinations_are_deleted(self):
+        self.options[0]["items"].remove("color-0")
+        result = self.sync(options=self.options)
+        self.assertEqual(result.deleted, 0)  # cascaded with the option item
+        self.assertEqual(self.variants().count(), 900)
+
+        self.options.pop()
+        result = self.sync(options=self.options, stock=1)
+        self.assertEqual((result.created, result.deleted), (90, 0))
+        self.assertEqual(self.variants().count(), 90)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_stock, 90)
+
+    def test_moved_options_and_duplicates(self):
+        variant = self.variants().first()
+        options = (variant.option1_id, variant.option2_id, variant.option3_id)
+        # the same items in other slots, and a stale variant without options
+        ProductVariant.objects.filter(pk=variant.pk).update(
+            option1_id=options[2], option2_id=options[0], option3_id=options[1]
+        )
+        ProductVariant.objects.create(product=self.product, price=1, stock=1)
+
+        result = ProductService.manage_variants(ProductData(product=self.product))
+        self.assertEqual((result.created, result.updated, result.deleted), (0, 1, 1))
+        variant.refresh_from_db()
+        self.assertEqual(
+            (variant.option1_id, variant.option2_id, variant.option3_id), options
+        )
+
+    def test_unique_option_combination(self):
+        variant = self.variants().first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ProductVariant.objects.create(
+                product=self.product,
+                option1=variant.option1,
+                option2=variant.option2,
+                option3=variant.option3,
+                stock=1,
+            )
+
+        simple = ProductService.create_product(name="Hat", price=10, stock=5)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ProductVariant.objects.create(product=simple, stock=1)
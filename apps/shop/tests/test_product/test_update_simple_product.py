@@ -56,13 +56,24 @@ class UpdateSimpleProductTest(APIUpdateTestCaseMixin, ProductAssertMixin):
 
     def test_update(self):
         """
-        If a product variant already exists, its price, stock, and SKU will not be changed.
-        To update these fields, you must update the variant through the variants' endpoint.
+        The price, stock, and SKU of the existing variants only change when they are
+        provided, then every variant gets them.
 
         If a product variant is new, the provided price, stock, and SKU will be used to create the new variant.
         """
+        variant = self.simple_product.variants.get()
         response = self.send_request(self.new_payload)
         self.validate_response_body(response, self.new_payload)
+        self.assertEqual(self.simple_product.variants.get().price, variant.price)
+
+    def test_update_variant_values(self):
+        payload = {**self.new_payload, "price": "12.50", "stock": 7, "sku": "SKU-1"}
+        response = self.send_request(payload)
+        self.assertHTTPStatusCode(response, status.HTTP_200_OK)
+        variant = self.simple_product.variants.get()
+        self.assertEqual(
+            (str(variant.price), variant.stock, variant.sku), ("12.50", 7, "SKU-1")
+        )
 
     def test_update_with_add_new_options(self):
         payload = self.new_payload.copy()
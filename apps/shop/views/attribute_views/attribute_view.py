@@ -11,6 +11,8 @@ from apps.shop.serializers.attribute_serializers import (
     AttributeSerializer,
     AttributeItemSerializer,
 )
+from apps.shop.services.product.product_cache import ProductCache
+from apps.shop.views.mixins import ConditionalGetMixin
 
 
 @extend_schema_view(
@@ -20,7 +22,7 @@ from apps.shop.serializers.attribute_serializers import (
     update=extend_schema(tags=["Attribute"], summary="Update an attribute"),
     destroy=extend_schema(tags=["Attribute"], summary="Deletes an attribute"),
 )
-class AttributeViewSet(viewsets.ModelViewSet):
+class AttributeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     # TODO write test for check attributes is order by created-at
     queryset = Attribute.objects.all().order_by("-created_at")
     serializer_class = AttributeSerializer
@@ -40,6 +42,14 @@ class AttributeViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         return self.ACTION_PERMISSIONS.get(self.action, super().get_permissions())
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        ProductCache.invalidate_attributes()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        ProductCache.invalidate_attributes()
+
 
 @extend_schema_view(
     create=extend_schema(
@@ -54,7 +64,7 @@ class AttributeViewSet(viewsets.ModelViewSet):
     update=extend_schema(tags=["Attribute Item"], summary="Update an attribute item"),
     destroy=extend_schema(tags=["Attribute Item"], summary="Deletes an attribute item"),
 )
-class AttributeItemViewSet(viewsets.ModelViewSet):
+class AttributeItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = AttributeItemSerializer
     permission_classes = [IsAdminUser]
     http_method_names = ["post", "get", "put", "delete"]
@@ -98,3 +108,11 @@ class AttributeItemViewSet(viewsets.ModelViewSet):
                 {"detail": "This attribute item already exists."}
             )
         return item
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        ProductCache.invalidate_attributes()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        ProductCache.invalidate_attributes()
@@ -1,17 +1,36 @@
-from django.db import IntegrityError
+import uuid
+
+from django.db import IntegrityError, transaction
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 from rest_framework import status
-from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from apps.shop.models.cart import Cart, CartItem
+from apps.shop.models.order import Order
 from apps.shop.serializers.cart_serializers import (
     CartSerializer,
     AddCartItemSerializer,
     UpdateCartItemSerializer,
     CartItemSerializer,
 )
+from apps.shop.serializers.fast_serializers import (
+    FastCartItemSerializer,
+    FastCartSerializer,
+)
+from apps.shop.serializers.order_serializers import CheckoutSerializer, OrderSerializer
+from apps.shop.services.cart.cart_repository import CartRepository
+from apps.shop.services.cart.redis_cart_store import RedisCartStore
+from apps.shop.services.cart.stock_reservation_service import (
+    InsufficientStockError,
+    StockReservationService,
+)
+from apps.shop.services.order.checkout_service import CheckoutError, CheckoutService
+
+INSUFFICIENT_STOCK_MESSAGE = "Quantity exceeds available stock!"
 
 
 @extend_schema_view(
@@ -55,7 +74,25 @@ class CartItemViewSet(ModelViewSet):
 
     def get_queryset(self):
         cart_id = self.kwargs.get("cart_id")
-        return CartItem.objects.select_related("variant").filter(cart_id=cart_id).all()
+        if RedisCartStore.is_enabled():
+            return RedisCartStore.get_items(cart_id) or []
+        return CartRepository.get_cart_item_queryset().filter(cart_id=cart_id)
+
+    def get_object(self):
+        if not RedisCartStore.is_enabled():
+            return super().get_object()
+
+        cart_item = RedisCartStore.get_item(self.kwargs["cart_id"], self.kwargs["pk"])
+        if cart_item is None:
+            raise NotFound
+        self.check_object_permissions(self.request, cart_item)
+        return cart_item
+
+    def list(self, request, *args, **kwargs):
+        return Response(FastCartItemSerializer(self.get_queryset(), many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(FastCartItemSerializer(self.get_object()).data)
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -77,11 +114,24 @@ class CartItemViewSet(ModelViewSet):
         variant = payload["variant"]
         quantity = payload["quantity"]
 
+        # the item and the stock it holds are committed together
         try:
-            cart_item = CartItem.objects.create(
-                cart_id=cart_id, variant_id=variant.id, quantity=quantity
-            )
+            with transaction.atomic():
+                StockReservationService.reserve(cart_id, variant.id, quantity)
+                if RedisCartStore.is_enabled():
+                    cart_item = RedisCartStore.add_item(cart_id, variant, quantity)
+                    if cart_item is None:
+                        transaction.set_rollback(True)
+                else:
+                    cart_item = CartItem.objects.create(
+                        cart_id=cart_id, variant_id=variant.id, quantity=quantity
+                    )
+        except InsufficientStockError:
+            raise ValidationError(INSUFFICIENT_STOCK_MESSAGE)
         except IntegrityError:
+            cart_item = None
+
+        if cart_item is None:
             return Response(
                 {"detail": "This variant already exist in the cart."},
                 status=status.HTTP_400_BAD_REQUEST,  # todo change status code to 409
@@ -91,24 +141,147 @@ class CartItemViewSet(ModelViewSet):
         response_serializer = CartItemSerializer(cart_item)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        cart_item = serializer.instance
+        quantity = serializer.validated_data["quantity"]
+        try:
+            StockReservationService.reserve(
+                cart_item.cart_id, cart_item.variant_id, quantity
+            )
+        except InsufficientStockError:
+            raise ValidationError(INSUFFICIENT_STOCK_MESSAGE)
+
+        if RedisCartStore.is_enabled():
+            RedisCartStore.update_item(cart_item, quantity)
+        else:
+            super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        if RedisCartStore.is_enabled():
+            RedisCartStore.remove_item(instance)
+        else:
+            super().perform_destroy(instance)
+        StockReservationService.release(instance.cart_id, [instance.variant_id])
+
 
 @extend_schema_view(
     create=extend_schema(tags=["Cart"], summary="Create a new cart"),
     retrieve=extend_schema(tags=["Cart"], summary="Retrieve a cart"),
     list=extend_schema(tags=["Cart"], summary="Retrieve a list of carts"),
     destroy=extend_schema(tags=["Cart"], summary="Deletes a cart"),
+    checkout=extend_schema(
+        tags=["Cart"],
+        summary="Check out a cart",
+        request=CheckoutSerializer,
+        responses=OrderSerializer,
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                str,
+                OpenApiParameter.HEADER,
+                description="Retrying a checkout with the same key returns the same order.",
+            )
+        ],
+    ),
 )
 class CartViewSet(ModelViewSet):
     serializer_class = CartSerializer
-    queryset = Cart.objects.prefetch_related("items__variant").all()
+    queryset = CartRepository.get_cart_queryset()
     http_method_names = ["post", "get", "delete"]
 
     ACTION_PERMISSIONS = {
         "list": [IsAdminUser()],
+        "checkout": [IsAuthenticated()],
     }
 
     def get_permissions(self):
         return self.ACTION_PERMISSIONS.get(self.action, super().get_permissions())
 
+    # The list of carts is an admin view, it is always read from the database.
+
+    def create(self, request, *args, **kwargs):
+        if not RedisCartStore.is_enabled():
+            return super().create(request, *args, **kwargs)
+
+        cart_id = RedisCartStore.create_cart()
+        return Response(self.get_hot_cart_data(cart_id), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not RedisCartStore.is_enabled():
+            return Response(FastCartSerializer(self.get_object()).data)
+
+        return Response(self.get_hot_cart_data(self.kwargs["pk"]))
+
+    def destroy(self, request, *args, **kwargs):
+        if not RedisCartStore.is_enabled():
+            return super().destroy(request, *args, **kwargs)
+
+        if not RedisCartStore.delete_cart(self.kwargs["pk"]):
+            raise NotFound
+        StockReservationService.release(self.kwargs["pk"])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        cart_id = instance.id
+        super().perform_destroy(instance)
+        StockReservationService.release(cart_id)
+
+    @action(detail=True, methods=["post"])
+    def checkout(self, request, pk=None):
+        try:
+            cart_id = uuid.UUID(str(pk))
+        except ValueError:
+            raise NotFound
+
+        idempotency_key = request.headers.get("Idempotency-Key")
+        max_length = Order._meta.get_field("idempotency_key").max_length
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= max_length:
+            raise ValidationError(
+                {"Idempotency-Key": f"Send 1 to {max_length} characters."}
+            )
+
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            order, created = CheckoutService.checkout(
+                cart_id,
+                request.user,
+                idempotency_key=idempotency_key,
+                **serializer.validated_data,
+            )
+        except Cart.DoesNotExist:
+            raise NotFound
+        except InsufficientStockError:
+            raise ValidationError(INSUFFICIENT_STOCK_MESSAGE)
+        except CheckoutError as e:
+            raise ValidationError(str(e))
+
+        order = (
+            Order.objects.select_related("shipping_address", "billing_address")
+            .prefetch_related("items")
+            .get(pk=order.pk)
+        )
+        return Response(
+            OrderSerializer(order).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def get_hot_cart_data(cart_id) -> dict:
+        """Serialize a cart of the Redis store in the same shape as `CartSerializer`."""
+
+        items = RedisCartStore.get_items(cart_id)
+        if items is None:
+            raise NotFound
+        return {
+            "id": str(uuid.UUID(str(cart_id))),
+            "items": FastCartItemSerializer(items, many=True).data,
+            "total_price": sum(item.quantity * item.variant.price for item in items),
+        }
+
 
 # TODO check the stock of items before save the order
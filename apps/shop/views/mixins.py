@@ -0,0 +1,91 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.core.services.cache_service import CacheService
+
+
+class ConditionalGetMixin:
+    """
+    `ETag` and `Last-Modified` on the `list` and `retrieve` actions of a viewset, and
+    `304 Not Modified` when the copy of the client is current.
+
+    The validators are worked out before the body is built. By default they come from
+    `max(updated_at)` and the row count of the filtered queryset, in one aggregate
+    query, which fits the views that render the rows of one table. Views that render
+    related rows too override `get_validators` with `get_version_validators`, the
+    cache namespaces that their writes invalidate, and need no query at all.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, build_response, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build_response(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_validators(self) -> tuple[str, int | None]:
+        """Return the ETag and the last modification time (a Unix timestamp)."""
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            try:
+                queryset = queryset.filter(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )
+            except (TypeError, ValueError, ValidationError):
+                # like `get_object_or_404`, a lookup value of the wrong type is a 404
+                raise Http404
+        summary = queryset.order_by().aggregate(
+            count=Count("pk"), updated_at=Max("updated_at")
+        )
+        updated_at = summary["updated_at"]
+        return (
+            self.build_etag(summary["count"], updated_at and updated_at.isoformat()),
+            int(updated_at.timestamp()) if updated_at else None,
+        )
+
+    def get_version_validators(self, *namespaces: str) -> tuple[str, int]:
+        """Validators that change whenever one of the cache namespaces is bumped."""
+
+        return (
+            self.build_etag(*[CacheService.get_version(name) for name in namespaces]),
+            CacheService.get_changed_at(*namespaces),
+        )
+
+    def build_etag(self, *parts) -> str:
+        # The body also depends on the request: the filters and the page, draft
+        # products are only visible to staff, and image URLs contain the host.
+        request = self.request
+        digest = hashlib.md5(
+            repr(
+                [
+                    type(self).__name__,
+                    self.action,
+                    sorted(self.kwargs.items()),
+                    sorted(request.query_params.lists()),
+                    request.user.is_staff,
+                    request.get_host(),
+                    *parts,
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+        # weak: the same data may be rendered with different bytes
+        return f'W/"{digest}"'
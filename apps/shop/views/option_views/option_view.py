@@ -9,6 +9,7 @@ from apps.shop.models.option import Option, OptionItem
 from apps.shop.paginations import DefaultPagination
 from apps.shop.serializers import option_serializers
 from apps.shop.serializers.option_serializers import OptionItemSerializer
+from apps.shop.views.mixins import ConditionalGetMixin
 
 
 @extend_schema_view(
@@ -29,7 +30,7 @@ from apps.shop.serializers.option_serializers import OptionItemSerializer
     update=extend_schema(tags=["Option"], summary="Update an option"),
     destroy=extend_schema(tags=["Option"], summary="Deletes an option"),
 )
-class OptionViewSet(viewsets.ModelViewSet):
+class OptionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = option_serializers.OptionSerializer
     permission_classes = [IsAdminUser]
     http_method_names = ["post", "get", "put", "delete"]
@@ -68,7 +69,7 @@ class OptionViewSet(viewsets.ModelViewSet):
     update=extend_schema(tags=["Option Item"], summary="Update an option item"),
     destroy=extend_schema(tags=["Option Item"], summary="Deletes an option item"),
 )
-class OptionItemViewSet(viewsets.ModelViewSet):
+class OptionItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = option_serializers.OptionItemSerializer
     permission_classes = [IsAdminUser]
     http_method_names = ["post", "get", "put", "delete"]
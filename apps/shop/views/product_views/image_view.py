@@ -6,7 +6,9 @@ from rest_framework.response import Response
 
 from apps.shop.models.product import ProductImage
 from apps.shop.serializers.product_serializers import ProductImageSerializer
+from apps.shop.services.product.product_cache import ProductCache
 from apps.shop.services.product.product_service import ProductService
+from apps.shop.views.mixins import ConditionalGetMixin
 
 
 @extend_schema_view(
@@ -53,7 +55,7 @@ from apps.shop.services.product.product_service import ProductService
         ],
     ),
 )
-class ProductImageViewSet(viewsets.ModelViewSet):
+class ProductImageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ProductImageSerializer
     permission_classes = [IsAdminUser]
     parser_classes = [MultiPartParser, FormParser]
@@ -67,6 +69,11 @@ class ProductImageViewSet(viewsets.ModelViewSet):
         product_id = self.kwargs.get("product_id")
         return ProductImage.objects.filter(product_id=product_id)
 
+    def get_validators(self):
+        return self.get_version_validators(
+            ProductCache.product_namespace(self.kwargs["product_id"])
+        )
+
     def create(self, request, *args, **kwargs):
         """Upload images for a specific product."""
         serializer = self.get_serializer(data=request.data)
@@ -81,4 +88,14 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         product_id = self.kwargs.get("product_id")
         images_data = serializer.validated_data
-        return ProductService.upload_product_images(product_id, **images_data)
+        images = ProductService.upload_product_images(product_id, **images_data)
+        ProductCache.invalidate_product(product_id)
+        return images
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        ProductCache.invalidate_product(self.kwargs.get("product_id"))
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        ProductCache.invalidate_product(self.kwargs.get("product_id"))
@@ -1,51 +1,115 @@
+import io
+
 from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema_view, extend_schema
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
-from apps.shop.filters.product_filter import ProductFilter
+from apps.shop.filters.product_filter import (
+    ProductFilter,
+    ProductOrderingFilter,
+    ProductSearchFilter,
+)
 from apps.shop.paginations import DefaultPagination
 from apps.shop.serializers import product_serializers
+from apps.shop.serializers.fast_serializers import (
+    FastProductSerializer,
+    FastProductVariantSerializer,
+)
+from apps.shop.services.product.product_bulk_manager import ProductImportError
+from apps.shop.services.product.product_cache import ProductCache
 from apps.shop.services.product.product_service import ProductService
+from apps.shop.views.mixins import ConditionalGetMixin
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        str,
+        description="Comma separated fields to return, e.g. `id,name,price`.",
+    ),
+    OpenApiParameter(
+        "expand",
+        str,
+        description="Return the compact representation with these nested relations, "
+        "e.g. `variants,options`. Leave it empty for none.",
+    ),
+]
 
 
 @extend_schema_view(
     create=extend_schema(tags=["Product"], summary="Create a new product"),
-    retrieve=extend_schema(tags=["Product"], summary="Retrieve a single product."),
-    list=extend_schema(tags=["Product"], summary="Retrieve a list of products"),
+    retrieve=extend_schema(
+        tags=["Product"],
+        summary="Retrieve a single product.",
+        parameters=SPARSE_FIELDSET_PARAMETERS,
+    ),
+    list=extend_schema(
+        tags=["Product"],
+        summary="Retrieve a list of products",
+        parameters=[
+            *SPARSE_FIELDSET_PARAMETERS,
+            OpenApiParameter(
+                "facets",
+                str,
+                description="Add the counts of these facets of the filtered products "
+                "to the response: `attributes,options,category,price`. "
+                "Leave it empty for all of them.",
+            ),
+        ],
+    ),
     update=extend_schema(tags=["Product"], summary="Update a product"),
     partial_update=extend_schema(tags=["Product"], summary="Partial update a product"),
     destroy=extend_schema(tags=["Product"], summary="Deletes a product"),
     list_variants=extend_schema(
         tags=["Product Variant"], summary="Retrieves a list of product variants"
     ),
+    import_products=extend_schema(
+        tags=["Product"],
+        summary="Import products from a CSV or JSON Lines file",
+        request={"multipart/form-data": product_serializers.ProductImportSerializer},
+    ),
+    export_products=extend_schema(
+        tags=["Product"],
+        summary="Export all products as CSV or JSON Lines",
+        parameters=[
+            OpenApiParameter("file_format", str, enum=["csv", "jsonl"], default="csv")
+        ],
+    ),
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = product_serializers.ProductSerializer
     permission_classes = [IsAdminUser]
     # TODO add test case for search, filter, ordering and pagination
-    filter_backends = [SearchFilter, DjangoFilterBackend, OrderingFilter]
-    search_fields = ["name", "description"]
+    # Search results are ranked by relevance, unless `?ordering=` is given
+    filter_backends = [ProductSearchFilter, DjangoFilterBackend, ProductOrderingFilter]
     filterset_class = ProductFilter
     ordering_fields = [
         "name",
         "created_at",
         "update_at",
         "published_at",
-        "variants__stock",
-        "variants__price",
-    ]
+        "min_price",
+        "max_price",
+        "total_stock",
+    ]  # and `variants__price`, `variants__stock`, see `ProductOrderingFilter`
     pagination_class = DefaultPagination
 
     ACTION_SERIALIZERS = {
         "create": product_serializers.ProductCreateSerializer,
         "update": product_serializers.ProductUpdateSerializer,
+        "import_products": product_serializers.ProductImportSerializer,
     }
 
+    EXPORT_CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+    # Actions that accept `?fields=` and `?expand=`
+    SPARSE_ACTIONS = ("list", "retrieve")
+
     ACTION_PERMISSIONS = {
         "list": [AllowAny()],
         "retrieve": [AllowAny()],
@@ -53,13 +117,94 @@ class ProductViewSet(viewsets.ModelViewSet):
     }
 
     def get_serializer_class(self):
+        if self.action in self.SPARSE_ACTIONS and "expand" in self.request.query_params:
+            return product_serializers.ProductListSerializer
         return self.ACTION_SERIALIZERS.get(self.action, self.serializer_class)
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.SPARSE_ACTIONS:
+            context["fields"] = self._query_param_list("fields")
+            context["expand"] = self._query_param_list("expand")
+        return context
+
+    def _query_param_list(self, name: str):
+        """Return a comma separated query parameter as a list, or None if it's missing."""
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(",") if item.strip()]
+
     def get_permissions(self):
         return self.ACTION_PERMISSIONS.get(self.action, super().get_permissions())
 
     def get_queryset(self):
-        return ProductService.get_product_queryset(self.request)
+        related_fields = None
+        if self.action in self.SPARSE_ACTIONS:
+            # Prefetch only the relations the serializer renders
+            related_fields = self.get_serializer_class().rendered_fields(
+                self.get_serializer_context()
+            )
+        return ProductService.get_product_queryset(self.request, related_fields)
+
+    def get_fast_serializer(self, *args, **kwargs):
+        """Return the read-only serializer that renders the list and detail responses."""
+        return FastProductSerializer(
+            *args,
+            context=self.get_serializer_context(),
+            serializer_class=self.get_serializer_class(),
+            **kwargs,
+        )
+
+    def get_validators(self):
+        # every write that changes a product payload bumps these namespaces
+        if self.action == "retrieve":
+            return self.get_version_validators(
+                ProductCache.product_namespace(self.product_id()),
+                ProductCache.ATTRIBUTES_NAMESPACE,
+            )
+        return self.get_version_validators(
+            ProductCache.CATALOG_NAMESPACE, ProductCache.ATTRIBUTES_NAMESPACE
+        )
+
+    def product_id(self) -> int:
+        """The product id of the URL, rejected before it is used in cache keys."""
+        pk = self.kwargs["pk"]
+        if not (pk.isascii() and pk.isdecimal()):
+            raise Http404
+        return int(pk)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self._cached_list, request)
+
+    def _cached_list(self, request):
+        data = ProductCache.get_or_set(
+            ProductCache.list_key(request), self._build_list_data
+        )
+        return Response(data)
+
+    def _build_list_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return self.get_fast_serializer(queryset, many=True).data
+        serializer = self.get_fast_serializer(page, many=True)
+        data = self.get_paginated_response(serializer.data).data
+        facets = self._query_param_list("facets")
+        if facets is not None:
+            # counted over the whole filtered list, not only the page
+            data["facets"] = ProductService.get_facets(queryset, facets or None)
+        return data
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self._cached_retrieve, request, **kwargs)
+
+    def _cached_retrieve(self, request, pk):
+        data = ProductCache.get_or_set(
+            ProductCache.detail_key(request, self.product_id()),
+            lambda: self.get_fast_serializer(self.get_object()).data,
+        )
+        return Response(data)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -97,6 +242,11 @@ class ProductViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError({"detail": str(e)})
         return product
 
+    def perform_destroy(self, instance):
+        product_id = instance.id
+        super().perform_destroy(instance)
+        ProductCache.invalidate_product(product_id)
+
     # ----------------
     # --- variants ---
     # ----------------
@@ -107,8 +257,50 @@ class ProductViewSet(viewsets.ModelViewSet):
 
         product = self.get_object()
         variants = product.variants.all()
-        serializer = product_serializers.ProductVariantSerializer(variants, many=True)
+        serializer = FastProductVariantSerializer(variants, many=True)
         return Response(serializer.data)
 
+    # -----------------------
+    # --- import / export ---
+    # -----------------------
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_products(self, request):
+        """Import a catalog file and report what was created, updated and skipped."""
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            result = ProductService.import_products(
+                io.TextIOWrapper(data["file"].file, encoding="utf-8", newline=""),
+                data["file_format"],
+                update_existing=data["update_existing"],
+            )
+        except ProductImportError as e:
+            raise serializers.ValidationError({"file": str(e)})
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_products(self, request):
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in self.EXPORT_CONTENT_TYPES:
+            raise serializers.ValidationError(
+                {"file_format": "Choose one of: csv, jsonl."}
+            )
+        response = StreamingHttpResponse(
+            ProductService.export_products(file_format),
+            content_type=self.EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="products.{file_format}"'
+        )
+        return response
+
 
 # TODO remove product images after product was removed.
@@ -1,3 +1,4 @@
+from django.db import transaction
 from drf_spectacular.utils import extend_schema_view, extend_schema
 from rest_framework import mixins
 from rest_framework.permissions import IsAdminUser, AllowAny
@@ -6,6 +7,8 @@ from rest_framework.viewsets import GenericViewSet
 
 from apps.shop.models.product import ProductVariant, ProductVariantImage
 from apps.shop.serializers import product_serializers
+from apps.shop.services.product.product_cache import ProductCache
+from apps.shop.services.product.product_repository import ProductRepository
 
 
 @extend_schema_view(
@@ -37,6 +40,7 @@ class VariantViewSet(
     def get_permissions(self):
         return self.ACTION_PERMISSIONS.get(self.action, super().get_permissions())
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         # Get the variant instance
         partial = kwargs.pop("partial", False)
@@ -47,6 +51,8 @@ class VariantViewSet(
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
 
+        ProductRepository.refresh_variant_summary(instance.product_id)
+
         # Process images_id
         images_id = request.data.get("images_id", [])
         if images_id:
@@ -65,4 +71,11 @@ class VariantViewSet(
             # todo add tests too
             ProductVariantImage.objects.filter(variant=instance).delete()
 
+        ProductCache.invalidate_product(instance.product_id)
         return Response(serializer.data)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        ProductRepository.refresh_variant_summary(instance.product_id)
+        ProductCache.invalidate_product(instance.product_id)
@@ -48,6 +48,10 @@ class EnvironmentVariables:
             "EMAIL_HOST_USER", default="no-reply@example.com"
         )
         self.EMAIL_HOST_PASSWORD = env.str("EMAIL_HOST_PASSWORD", default="<password>")
+        self.EMAIL_DELIVERY = env.str("EMAIL_DELIVERY", default="sync")
+        self.EMAIL_QUEUE_MAX_ATTEMPTS = env.int("EMAIL_QUEUE_MAX_ATTEMPTS", default=5)
+        self.EMAIL_QUEUE_RETRY_DELAY = env.int("EMAIL_QUEUE_RETRY_DELAY", default=30)
+        self.EMAIL_QUEUE_LEASE = env.int("EMAIL_QUEUE_LEASE", default=300)
 
         # -----------
         # --- OTP ---
@@ -62,6 +66,45 @@ class EnvironmentVariables:
 
         self.REDIS_URL = env.str("REDIS_URL", default="redis://localhost:6379/")
 
+        # ------------------
+        # --- Cart Store ---
+        # ------------------
+
+        self.CART_STORE = env.str("CART_STORE", default="database")
+        self.CART_REDIS_TTL = env.int("CART_REDIS_TTL", default=60 * 60 * 24 * 7)
+        self.STOCK_RESERVATION_TTL = env.int("STOCK_RESERVATION_TTL", default=60 * 15)
+
+        # --------------
+        # --- Orders ---
+        # --------------
+
+        self.ORDER_NUMBER_START = env.int("ORDER_NUMBER_START", default=1001)
+        self.ORDER_NUMBER_BLOCK_SIZE = env.int("ORDER_NUMBER_BLOCK_SIZE", default=1)
+
+        # ----------------------
+        # --- Product search ---
+        # ----------------------
+
+        self.PRODUCT_SEARCH_BACKEND = env.str("PRODUCT_SEARCH_BACKEND", default="auto")
+        self.PRODUCT_PRICE_FACET_BOUNDS = env.list(
+            "PRODUCT_PRICE_FACET_BOUNDS", cast=int, default=[10, 50, 100, 500, 1000]
+        )
+        self.PRODUCT_BITMAP_INDEX = env.bool("PRODUCT_BITMAP_INDEX", default=False)
+
+        # -----------------------
+        # --- Request metrics ---
+        # -----------------------
+
+        self.REQUEST_METRICS_SAMPLE_RATE = env.float(
+            "REQUEST_METRICS_SAMPLE_RATE", default=0.0
+        )
+        self.REQUEST_METRICS_SERVER_TIMING = env.bool(
+            "REQUEST_METRICS_SERVER_TIMING", default=False
+        )
+        self.REQUEST_QUERY_BUDGET_ACTION = env.str(
+            "REQUEST_QUERY_BUDGET_ACTION", default="log"
+        )
+
         # -------------
         # --- Media ---
         # -------------
@@ -73,6 +73,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so the timings cover the other middleware
+    "apps.core.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -182,6 +184,14 @@ SITE_ID = 1
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# "sync": emails are sent during the request.
+# "queue": emails are stored in the `EmailJob` table and sent by the
+# `send_queued_emails` command, failed ones are retried with a growing delay.
+EMAIL_DELIVERY = env.EMAIL_DELIVERY
+EMAIL_QUEUE_MAX_ATTEMPTS = env.EMAIL_QUEUE_MAX_ATTEMPTS
+EMAIL_QUEUE_RETRY_DELAY = env.EMAIL_QUEUE_RETRY_DELAY  # in seconds, doubled per attempt
+EMAIL_QUEUE_LEASE = env.EMAIL_QUEUE_LEASE  # in seconds a worker has to send a claimed job
+
 # ----------------------
 # --- REST FRAMEWORK ---
 # ----------------------
@@ -240,6 +250,81 @@ CACHES = {
     }
 }
 
+# ------------------
+# --- Cart Store ---
+# ------------------
+
+# "database": carts are read and written in the `Cart`/`CartItem` tables.
+# "redis": active carts are kept in Redis and flushed to the tables by the
+# `flush_carts` command and at checkout.
+CART_STORE = env.CART_STORE
+CART_REDIS_URL = env.REDIS_URL
+CART_REDIS_KEY_PREFIX = "cart"
+CART_REDIS_TTL = env.CART_REDIS_TTL  # in seconds, renewed on every write
+
+# Stock held by a cart item, in seconds, renewed when the item changes.
+# Expired reservations are released by the `release_stock_reservations` command.
+STOCK_RESERVATION_TTL = env.STOCK_RESERVATION_TTL
+
+# --------------
+# --- Orders ---
+# --------------
+
+# Order numbers come from a PostgreSQL sequence that starts at ORDER_NUMBER_START.
+# With a block size > 1 every process takes that many numbers at once, so numbers
+# are unique but not in order of checkout across processes.
+ORDER_NUMBER_START = env.ORDER_NUMBER_START
+ORDER_NUMBER_BLOCK_SIZE = env.ORDER_NUMBER_BLOCK_SIZE
+
+# ----------------------
+# --- Product search ---
+# ----------------------
+
+# "auto": full-text search on PostgreSQL and substring matching anywhere else.
+# "postgres", "basic" or the dotted path of a `ProductSearchBackend` subclass.
+PRODUCT_SEARCH_BACKEND = env.PRODUCT_SEARCH_BACKEND
+
+# Bounds of the price facet buckets of the product list: 0-10, 10-50, ..., 1000+
+PRODUCT_PRICE_FACET_BOUNDS = env.PRODUCT_PRICE_FACET_BOUNDS
+
+# Filter the product list by attribute and option items with an in-process bitmap
+# index (see `ProductBitmapIndex`), instead of joins. Install the `bitmap-index` extra
+# (`pyroaring`) with it, the fallback on `set` takes ~10x the memory.
+PRODUCT_BITMAP_INDEX = env.PRODUCT_BITMAP_INDEX
+
+# -----------------------
+# --- Request metrics ---
+# -----------------------
+
+# Query count, DB time and view time per view action (see `RequestMetrics`), for a
+# share of the requests. Reported at `metrics/requests/` for admin users.
+REQUEST_METRICS_SAMPLE_RATE = env.REQUEST_METRICS_SAMPLE_RATE
+REQUEST_METRICS_SERVER_TIMING = env.REQUEST_METRICS_SERVER_TIMING
+
+# Most queries a sampled request of the endpoint may run. Over budget it is logged,
+# or with "raise" fails the request, which the tests use to catch N+1 queries.
+REQUEST_QUERY_BUDGET_ACTION = env.REQUEST_QUERY_BUDGET_ACTION
+REQUEST_QUERY_BUDGETS = {
+    "ProductViewSet.list": 15,
+    "ProductViewSet.retrieve": 10,
+    "ProductViewSet.list_variants": 10,
+    "ProductImageViewSet.list": 7,
+    "CategoryViewSet.list": 7,
+    "CategoryViewSet.retrieve": 6,
+    "CategoryViewSet.category_tree": 2,
+    "AttributeViewSet.list": 5,
+    "AttributeItemViewSet.list": 6,
+    "OptionViewSet.list": 5,
+    "OptionItemViewSet.list": 6,
+    "CartViewSet.list": 6,
+    "CartViewSet.retrieve": 6,
+    "CartViewSet.checkout": 22,
+    "CartItemViewSet.list": 5,
+    "CartItemViewSet.retrieve": 5,
+    "CartItemViewSet.create": 20,
+    "CartItemViewSet.partial_update": 13,
+}
+
 # -------------
 # --- Media ---
 # -------------
@@ -306,6 +391,18 @@ if "test" in sys.argv:
 
     MIGRATION_MODULES = DisableMigrations()
 
+    # 4. Check the Query Budgets of Every Request
+    REQUEST_METRICS_SAMPLE_RATE = 1.0
+    REQUEST_METRICS_SERVER_TIMING = True
+    REQUEST_QUERY_BUDGET_ACTION = "raise"
+
+    # 5. Don't Share Cached Responses Between Tests
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        }
+    }
+
 # ------------------
 # --- PRODUCTION ---
 # ------------------
@@ -23,6 +23,7 @@ from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.routers import DefaultRouter
 
+from apps.core.views.metrics_views.request_metrics_view import RequestMetricsViewSet
 from apps.core.views.user_views.user_view import UserViewSet
 
 urlpatterns = [
@@ -36,6 +37,7 @@ urlpatterns = [
 
 router = DefaultRouter()
 router.register("users", UserViewSet, basename="user")
+router.register("metrics/requests", RequestMetricsViewSet, basename="request-metrics")
 urlpatterns += router.urls
 urlpatterns += debug_toolbar_urls()
 